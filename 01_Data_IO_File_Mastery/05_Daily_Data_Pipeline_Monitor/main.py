@@ -1,11 +1,20 @@
+import argparse
 from pathlib import Path
+from time import perf_counter
 from src.utils import setup_logging, get_today_date, log_action
 from src.file_handler import check_file_exists, read_csv, move_to_processed
 from src.monitor import run_monitor_pipeline
 from src.report_generator import generate_report
+from src.history_store import append_run
+from src.metrics import peak_rss_mb, write_prometheus
 
 
 def main() :
+    parser = argparse.ArgumentParser(description="Daily data pipeline monitor")
+    parser.add_argument("--prometheus", type=Path, default=None,
+                        help="Optional path for Prometheus text-format metrics (e.g. metrics/monitor.prom)")
+    args = parser.parse_args()
+    run_start = perf_counter()
 
     # 1. Specify the main directory
     BASE_DIR = Path(__file__).resolve().parent
@@ -13,6 +22,7 @@ def main() :
     PROCESSED_DIR = BASE_DIR / "data" / "processd"
     REPORT_DIR = BASE_DIR / "data" / "reports"
     LOG_PATH = BASE_DIR / "logs" / "pipeline.log"
+    HISTORY_DB = BASE_DIR / "data" / "history" / "monitor_history.db"
 
     # 2. Setup logging
     setup_logging(LOG_PATH)
@@ -21,15 +31,28 @@ def main() :
     # 3. Run the monitoring process
     monitor_result = run_monitor_pipeline(RAW_DIR)
 
-    # 4. Save the monitoring results report to CSV
+    # 4. If the file is valid, move it to the processed/ folder (timed per file).
+    for detail in monitor_result.get("details", []):
+        move_start = perf_counter()
+        if detail["status"] == "OK":
+            file_path = RAW_DIR / detail["file_name"]
+            move_to_processed(file_path, PROCESSED_DIR)
+        detail["move_seconds"] = round(perf_counter() - move_start, 6)
+
+    # 5. Run-level metrics
+    monitor_result["run_seconds"] = round(perf_counter() - run_start, 6)
+    monitor_result["peak_rss_mb"] = peak_rss_mb()
+    log_action(f"Total waktu run: {monitor_result['run_seconds']} detik, peak RSS: {monitor_result['peak_rss_mb']} MB")
+
+    # 6. Save the monitoring results report to CSV
     report_path = generate_report(REPORT_DIR, monitor_result)
 
-    # If the file is valid, move it to the processed/ folder.
-    if "details" in monitor_result: 
-        for detail in monitor_result["details"] :
-            if detail["status"] == "OK":
-                file_path = RAW_DIR / detail["file_name"]
-                move_to_processed(file_path, PROCESSED_DIR)
+    # 7. Append the results to the historical store (SQLite)
+    append_run(HISTORY_DB, monitor_result)
+
+    # 8. Optional Prometheus export
+    if args.prometheus:
+        write_prometheus(args.prometheus, monitor_result)
 
     log_action(f"Pipeline selesai. Laporan disimpan di {report_path}")
     log_action("Selesai...")
@@ -37,4 +60,3 @@ def main() :
 
 if __name__ == "__main__" :
     main()
-
@@ -0,0 +1,31 @@
+# Query History.Py - CLI kecil untuk menjawab pertanyaan tren dari history monitoring.
+import argparse
+from pathlib import Path
+from src.history_store import failure_rate, row_count_drift
+
+
+def main():
+    BASE_DIR = Path(__file__).resolve().parent
+    parser = argparse.ArgumentParser(description="Query history daily pipeline monitor")
+    parser.add_argument("--db", type=Path, default=BASE_DIR / "data" / "history" / "monitor_history.db")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    failure_parser = subparsers.add_parser("failure-rate", help="Tingkat kegagalan per pola file")
+    failure_parser.add_argument("--days", type=int, default=30)
+
+    drift_parser = subparsers.add_parser("drift", help="Perubahan jumlah baris per pola file")
+    drift_parser.add_argument("--days", type=int, default=30)
+    drift_parser.add_argument("--pattern", default=None, help="Contoh: sales_*.csv")
+
+    args = parser.parse_args()
+
+    if args.command == "failure-rate":
+        result = failure_rate(args.db, args.days)
+    else:
+        result = row_count_drift(args.db, args.days, args.pattern)
+
+    print(result.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
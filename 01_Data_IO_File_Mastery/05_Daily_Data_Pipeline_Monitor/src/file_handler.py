@@ -22,7 +22,21 @@ def read_csv(file_path:Path) -> pd.DataFrame:
     except Exception as error:
         print(f"Gagal membaca file CSV: {error}")
         return pd.DataFrame()
-    
+
+# Membaca file CSV per chunk (semua kolom sebagai teks) agar memori tetap terbatas.
+# File kosong (0 byte) tidak menghasilkan chunk, sehingga dilaporkan sebagai WARNING seperti file tanpa baris.
+# Error parsing di tengah file diteruskan ke pemanggil, supaya file tidak dianggap lengkap.
+def read_csv_chunks(file_path: Path, chunksize: int = 100_000):
+    try:
+        for chunk in pd.read_csv(file_path, dtype=str, chunksize=chunksize):
+            yield chunk
+    except pd.errors.EmptyDataError as error:
+        print(f"File CSV kosong: {error}")
+        return
+    except Exception as error:
+        print(f"Gagal membaca file CSV: {error}")
+        raise
+
 #  Memindahkan file dari folder raw ke folder processed. Jika file tujuan sudah ada, akan diganti dengan versi baru.
 def move_to_processed(file_path:Path, processed_dir:Path) -> bool:
     try:
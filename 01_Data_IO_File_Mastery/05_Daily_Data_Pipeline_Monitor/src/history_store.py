@@ -0,0 +1,127 @@
+# History Store.Py module
+import re
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
+from pathlib import Path
+import pandas as pd
+from src.utils import log_action
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS monitor_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    file_pattern TEXT NOT NULL,
+    status TEXT NOT NULL,
+    reason TEXT,
+    rows INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_history_date
+    ON monitor_history (run_date, file_pattern, status, rows);
+CREATE INDEX IF NOT EXISTS idx_history_pattern_date
+    ON monitor_history (file_pattern, run_date, status, rows);
+"""
+
+
+# Mengubah nama file harian menjadi pola, contoh: sales_2025-10-17.csv -> sales_*.csv
+def file_pattern(file_name: str) -> str:
+    return re.sub(r"\d+(?:[-_.]\d+)*", "*", file_name)
+
+
+# Membuka koneksi SQLite dan memastikan tabel serta index tersedia.
+def connect_store(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+# Menambahkan hasil monitoring satu run ke store historis (append-only).
+def append_run(db_path: Path, monitor_result: dict, run_date: str = None) -> int:
+    now = datetime.now()
+    run_date = run_date or now.strftime("%Y-%m-%d")
+    run_id = now.strftime("%Y-%m-%dT%H:%M:%S")
+
+    details = monitor_result.get("details", [])
+    records = [
+        (
+            run_id,
+            run_date,
+            detail["file_name"],
+            file_pattern(detail["file_name"]),
+            detail["status"],
+            detail.get("reason"),
+            int(detail.get("rows", 0)),
+        )
+        for detail in details
+    ]
+    if not records:
+        log_action("Tidak ada hasil monitoring untuk disimpan ke history")
+        return 0
+
+    try:
+        with closing(connect_store(db_path)) as conn, conn:
+            conn.executemany(
+                "INSERT INTO monitor_history "
+                "(run_id, run_date, file_name, file_pattern, status, reason, rows) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                records,
+            )
+        log_action(f"{len(records)} hasil monitoring ditambahkan ke history: {db_path}")
+        return len(records)
+    except Exception as error:
+        log_action(f"Gagal menyimpan history monitoring: {error}")
+        return 0
+
+
+def _since(days: int) -> str:
+    return (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+# Tingkat kegagalan per pola file selama N hari terakhir.
+def failure_rate(db_path: Path, days: int = 30) -> pd.DataFrame:
+    query = """
+        SELECT file_pattern,
+               COUNT(*) AS checks,
+               SUM(status = 'FAILED') AS failed,
+               ROUND(1.0 * SUM(status = 'FAILED') / COUNT(*), 4) AS failure_rate
+        FROM monitor_history
+        WHERE run_date >= ?
+        GROUP BY file_pattern
+        ORDER BY failure_rate DESC, file_pattern
+    """
+    with closing(connect_store(db_path)) as conn:
+        return pd.read_sql_query(query, conn, params=(_since(days),))
+
+
+# Perubahan jumlah baris per pola file per hari dibanding hari sebelumnya.
+def row_count_drift(db_path: Path, days: int = 30, pattern: str = None) -> pd.DataFrame:
+    where = "run_date >= ? AND status = 'OK'"
+    params = [_since(days)]
+    if pattern:
+        where = "file_pattern = ? AND " + where
+        params.insert(0, pattern)
+
+    query = f"""
+        WITH daily AS (
+            SELECT file_pattern, run_date, SUM(rows) AS rows
+            FROM monitor_history
+            WHERE {where}
+            GROUP BY file_pattern, run_date
+        )
+        SELECT file_pattern,
+               run_date,
+               rows,
+               LAG(rows) OVER (PARTITION BY file_pattern ORDER BY run_date) AS prev_rows
+        FROM daily
+    """
+
+    with closing(connect_store(db_path)) as conn:
+        df = pd.read_sql_query(query, conn, params=params)
+
+    df["drift"] = df["rows"] - df["prev_rows"]
+    df["drift_pct"] = (df["drift"] / df["prev_rows"]).round(4)
+    return df
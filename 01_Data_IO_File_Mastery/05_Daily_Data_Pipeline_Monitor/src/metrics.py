@@ -0,0 +1,77 @@
+# Metrics.Py module
+import os
+import sys
+from pathlib import Path
+from src.utils import log_action
+
+try:
+    import resource
+except ImportError:  # Windows tidak memiliki modul resource
+    resource = None
+
+
+# Mengembalikan puncak pemakaian memori (RSS) proses ini dalam MB.
+def peak_rss_mb() -> float:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KB, macOS melaporkan byte
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 2)
+
+
+# Menghitung throughput baris per detik dari waktu baca + validasi.
+def rows_per_second(rows: int, seconds: float) -> float:
+    return round(rows / seconds, 2) if seconds > 0 else 0.0
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Menyimpan metrik monitoring dalam format teks Prometheus (untuk textfile collector).
+def write_prometheus(metrics_path: Path, monitor_result: dict) -> Path:
+    file_metrics = [
+        ("monitor_file_bytes_read", "Bytes read per file", "bytes_read"),
+        ("monitor_file_rows", "Rows read per file", "rows"),
+        ("monitor_file_rows_per_second", "Read + validate throughput per file", "rows_per_sec"),
+    ]
+    stage_keys = ["exists_seconds", "read_seconds", "validate_seconds", "move_seconds"]
+    details = monitor_result.get("details", [])
+
+    lines = []
+    for name, help_text, key in file_metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for detail in details:
+            labels = f'file="{_escape(detail["file_name"])}",status="{detail["status"]}"'
+            lines.append(f"{name}{{{labels}}} {detail.get(key, 0)}")
+
+    lines.append("# HELP monitor_file_stage_seconds Wall time per file and stage")
+    lines.append("# TYPE monitor_file_stage_seconds gauge")
+    for detail in details:
+        for key in stage_keys:
+            stage = key.replace("_seconds", "")
+            labels = f'file="{_escape(detail["file_name"])}",stage="{stage}"'
+            lines.append(f"monitor_file_stage_seconds{{{labels}}} {detail.get(key, 0)}")
+
+    lines.append("# HELP monitor_run_seconds Total wall time of the monitor run")
+    lines.append("# TYPE monitor_run_seconds gauge")
+    lines.append(f"monitor_run_seconds {monitor_result.get('run_seconds', 0)}")
+
+    if monitor_result.get("peak_rss_mb") is not None:
+        lines.append("# HELP monitor_peak_rss_bytes Peak resident memory of the monitor run")
+        lines.append("# TYPE monitor_peak_rss_bytes gauge")
+        lines.append(f"monitor_peak_rss_bytes {int(monitor_result['peak_rss_mb'] * 1024 * 1024)}")
+
+    try:
+        metrics_path.parent.mkdir(parents=True, exist_ok=True)
+        # Tulis ke file sementara lalu rename agar collector tidak membaca file setengah jadi
+        tmp_path = metrics_path.with_suffix(metrics_path.suffix + ".tmp")
+        tmp_path.write_text("\n".join(lines) + "\n")
+        os.replace(tmp_path, metrics_path)
+        log_action(f"Metrik Prometheus disimpan: {metrics_path}")
+        return metrics_path
+    except Exception as error:
+        log_action(f"Gagal menyimpan metrik Prometheus: {error}")
+        return None
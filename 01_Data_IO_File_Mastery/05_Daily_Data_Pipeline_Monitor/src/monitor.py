@@ -1,8 +1,17 @@
 from pathlib import Path
+from time import perf_counter
 import pandas as pd
-from src.file_handler import check_file_exists, read_csv
+from src.file_handler import check_file_exists, read_csv_chunks
+from src.profiler import new_column_profile, update_column_profile, finalize_column_profile
+from src.metrics import rows_per_second
 from src.utils import log_action
 
+EXPECTED_COLUMNS = ["date", "product", "quantity", "price", "total", "region"]
+
+
+# Mengembalikan daftar kolom wajib yang tidak ada pada header file.
+def find_missing_columns(columns) -> list:
+    return [col for col in EXPECTED_COLUMNS if col not in columns]
 
 # Memvalidasi isi DataFrame hasil pembacaan file CSV.
 def validate_file(df: pd.DataFrame) -> dict:
@@ -10,8 +19,7 @@ def validate_file(df: pd.DataFrame) -> dict:
         log_action("File CSV kosong, tidak ada data untuk diproses.")
         return {"status": "WARNING", "missing_columns" : [], "rows": 0}
     
-    expected_cols = ["date", "product", "quantity", "price", "total", "region" ]
-    missing_cols = [col for col in expected_cols if col not in df.columns]
+    missing_cols = find_missing_columns(df.columns)
 
     if missing_cols :
         log_action(f" Kolom berikut hilang dari data: {missing_cols}")
@@ -20,21 +28,77 @@ def validate_file(df: pd.DataFrame) -> dict:
     log_action(f"File valid. Jumlah baris : {len(df)} Kolom: {list(df.columns)}")
     return {"status": "OK", "missing_columns" : [], "rows": len(df)}
 
+# Membaca file per chunk: validasi kolom, hitung baris, dan profil kualitas data dalam satu pass.
+def validate_and_profile(file_path: Path, chunksize: int = 100_000) -> dict:
+    columns = None
+    rows = 0
+    profiles = {}
+    read_seconds = 0.0
+    validate_seconds = 0.0
+
+    chunks = read_csv_chunks(file_path, chunksize)
+    while True:
+        start = perf_counter()
+        try:
+            chunk = next(chunks, None)
+        except Exception as error:
+            # file rusak di tengah jalan: jangan validasi/profil sebagian file sebagai file lengkap
+            read_seconds += perf_counter() - start
+            log_action(f"Gagal membaca file setelah {rows} baris: {error}")
+            return {"status": "FAILED", "missing_columns": [], "rows": rows, "profile": [],
+                    "error": str(error), "read_seconds": round(read_seconds, 6),
+                    "validate_seconds": round(validate_seconds, 6)}
+        read_seconds += perf_counter() - start
+        if chunk is None:
+            break
+
+        start = perf_counter()
+        if columns is None:
+            columns = list(chunk.columns)
+            profiles = {col: new_column_profile(col) for col in columns}
+        rows += len(chunk)
+        for col in columns:
+            update_column_profile(profiles[col], chunk[col])
+        validate_seconds += perf_counter() - start
+
+    profile = [finalize_column_profile(p) for p in profiles.values()]
+    timings = {"read_seconds": round(read_seconds, 6), "validate_seconds": round(validate_seconds, 6)}
+
+    if not rows:
+        log_action("File CSV kosong, tidak ada data untuk diproses.")
+        return {"status": "WARNING", "missing_columns": [], "rows": 0, "profile": profile, **timings}
+
+    missing_cols = find_missing_columns(columns)
+    if missing_cols:
+        log_action(f" Kolom berikut hilang dari data: {missing_cols}")
+        return {"status": "FAILED", "missing_columns": missing_cols, "rows": rows, "profile": profile, **timings}
+
+    log_action(f"File valid. Jumlah baris : {rows} Kolom: {columns}")
+    return {"status": "OK", "missing_columns": [], "rows": rows, "profile": profile, **timings}
+
 # Check status daily pipeline
-def check_pipeline_status(file_path: Path) -> dict:
-    if not check_file_exists(file_path):
+def check_pipeline_status(file_path: Path, chunksize: int = 100_000) -> dict:
+    start = perf_counter()
+    exists = check_file_exists(file_path)
+    exists_seconds = round(perf_counter() - start, 6)
+
+    if not exists:
         return {
             "status" : "FAILED",
             "reason" : f"File not found: {file_path.name}",
-            "rows" : 0
+            "rows" : 0,
+            "profile" : [],
+            "metrics" : {"bytes_read": 0, "exists_seconds": exists_seconds,
+                         "read_seconds": 0.0, "validate_seconds": 0.0, "rows_per_sec": 0.0}
         }
     
-    df = read_csv(file_path)
-    result = validate_file(df)
+    result = validate_and_profile(file_path, chunksize)
 
     # Merge validation results into reports
     status = result["status"]
-    if status == "OK":
+    if result.get("error"):
+        reason = f"File gagal dibaca setelah {result['rows']} baris: {result['error']}"
+    elif status == "OK":
         reason = "File valid dan siap diproses"
     elif status == "WARNING":
         reason = "File kosong, tidak ada data yang dapat diproses."
@@ -44,11 +108,19 @@ def check_pipeline_status(file_path: Path) -> dict:
     return {
         "status" : status,
         "reason" : reason,
-        "rows" : result["rows"]
+        "rows" : result["rows"],
+        "profile" : result["profile"],
+        "metrics" : {
+            "bytes_read" : file_path.stat().st_size,
+            "exists_seconds" : exists_seconds,
+            "read_seconds" : result["read_seconds"],
+            "validate_seconds" : result["validate_seconds"],
+            "rows_per_sec" : rows_per_second(result["rows"], result["read_seconds"] + result["validate_seconds"])
+        }
     }
 
 # Runs automatic check for all files in the raw folder.
-def run_monitor_pipeline(raw_dir: Path) -> dict:
+def run_monitor_pipeline(raw_dir: Path, chunksize: int = 100_000) -> dict:
     log_action("Memulai monitoring pipeline harian...")
 
     if not raw_dir.exists():
@@ -63,12 +135,14 @@ def run_monitor_pipeline(raw_dir: Path) -> dict:
     result = []
     for file_path in csv_files:
         log_action(f"Memeriksa file: {file_path.name}")
-        status_info = check_pipeline_status(file_path)
+        status_info = check_pipeline_status(file_path, chunksize)
         result.append({
             "file_name": file_path.name,
             "status" : status_info["status"],
             "reason" : status_info["reason"],
-            "rows": status_info["rows"]
+            "rows": status_info["rows"],
+            **status_info["metrics"],
+            "profile": status_info["profile"]
         })
 
     log_action("Monitoring selesai untuk semua file di folder raw")
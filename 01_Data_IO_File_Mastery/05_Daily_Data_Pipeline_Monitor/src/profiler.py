@@ -0,0 +1,103 @@
+# Profiler.Py module
+import numpy as np
+import pandas as pd
+
+# Kolom numerik yang dihitung tingkat gagal parse-nya
+NUMERIC_COLUMNS = ["quantity", "price", "total"]
+
+# Jumlah hash terkecil yang disimpan sketch KMV (k-minimum values) per kolom
+SKETCH_SIZE = 1024
+
+_HASH_SPACE = float(2 ** 64)
+
+
+# Membuat state profil kosong untuk satu kolom.
+def new_column_profile(column: str) -> dict:
+    return {
+        "column": column,
+        "rows": 0,
+        "null_count": 0,
+        "min": None,
+        "max": None,
+        "parse_failures": 0,
+        "hashes": np.array([], dtype=np.uint64),
+    }
+
+
+# Menyimpan hanya k hash terkecil yang unik, sehingga memori sketch tetap konstan.
+def _keep_smallest(hashes: np.ndarray, k: int = SKETCH_SIZE) -> np.ndarray:
+    hashes = np.unique(hashes)
+    return hashes[:k]
+
+
+def _pick(current, candidate, func):
+    if candidate is None:
+        return current
+    if current is None:
+        return candidate
+    return func(current, candidate)
+
+
+# Memperbarui profil kolom dengan satu chunk data (series dibaca sebagai string).
+def update_column_profile(profile: dict, series: pd.Series) -> dict:
+    non_null = series.dropna()
+    profile["rows"] += len(series)
+    profile["null_count"] += len(series) - len(non_null)
+
+    if non_null.empty:
+        return profile
+
+    if profile["column"] in NUMERIC_COLUMNS:
+        values = pd.to_numeric(non_null, errors="coerce")
+        profile["parse_failures"] += int(values.isna().sum())
+        values = values.dropna()
+        chunk_min = values.min() if not values.empty else None
+        chunk_max = values.max() if not values.empty else None
+    else:
+        chunk_min, chunk_max = non_null.min(), non_null.max()
+
+    profile["min"] = _pick(profile["min"], chunk_min, min)
+    profile["max"] = _pick(profile["max"], chunk_max, max)
+
+    hashes = pd.util.hash_pandas_object(non_null, index=False).to_numpy()
+    profile["hashes"] = _keep_smallest(np.concatenate([profile["hashes"], hashes]))
+    return profile
+
+
+# Menggabungkan dua profil kolom (misalnya dari worker atau file berbeda).
+def merge_column_profiles(left: dict, right: dict) -> dict:
+    merged = new_column_profile(left["column"])
+    for key in ("rows", "null_count", "parse_failures"):
+        merged[key] = left[key] + right[key]
+    merged["min"] = _pick(left["min"], right["min"], min)
+    merged["max"] = _pick(left["max"], right["max"], max)
+    merged["hashes"] = _keep_smallest(np.concatenate([left["hashes"], right["hashes"]]))
+    return merged
+
+
+# Estimasi jumlah nilai unik dari sketch KMV (eksak bila nilai unik < k).
+def estimate_distinct(hashes: np.ndarray, k: int = SKETCH_SIZE) -> int:
+    if len(hashes) < k:
+        return int(len(hashes))
+    kth_fraction = (float(hashes[k - 1]) + 1.0) / _HASH_SPACE
+    return int(round((k - 1) / kth_fraction))
+
+
+# Mengubah state profil kolom menjadi baris ringkasan untuk laporan.
+def finalize_column_profile(profile: dict) -> dict:
+    rows = profile["rows"]
+    non_null = rows - profile["null_count"]
+    is_numeric = profile["column"] in NUMERIC_COLUMNS
+    return {
+        "column": profile["column"],
+        "rows": rows,
+        "null_count": profile["null_count"],
+        "null_rate": round(profile["null_count"] / rows, 4) if rows else 0.0,
+        "min": profile["min"],
+        "max": profile["max"],
+        "approx_distinct": estimate_distinct(profile["hashes"]),
+        "parse_failures": profile["parse_failures"] if is_numeric else None,
+        "parse_failure_rate": (
+            round(profile["parse_failures"] / non_null, 4) if is_numeric and non_null else None
+        ),
+    }
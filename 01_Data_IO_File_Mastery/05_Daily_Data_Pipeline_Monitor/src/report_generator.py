@@ -31,8 +31,14 @@ def generate_report(report_dir: Path, monitor_result: dict) -> Path :
         }])
 
     else :
-        df = pd.DataFrame(details)
+        df = pd.DataFrame([{k: v for k, v in d.items() if k != "profile"} for d in details])
         df["date"] = today
+        generate_profile_report(report_dir, details, today)
+
+    # Run-level metrics (same value for every row of this run)
+    for key in ("run_seconds", "peak_rss_mb"):
+        if key in monitor_result:
+            df[key] = monitor_result[key]
 
     # Save report to CSV file
     try:
@@ -41,4 +47,24 @@ def generate_report(report_dir: Path, monitor_result: dict) -> Path :
         return report_path
     except Exception as error:
         log_action(f"Gagal menyimpan laporan monitoring: {error}")
-        return None
\ No newline at end of file
+        return None
+
+# Menyimpan profil kualitas data per kolom (null, min/max, distinct, gagal parse) untuk setiap file.
+def generate_profile_report(report_dir: Path, details: list, today: str) -> Path :
+    rows = []
+    for detail in details:
+        for column_stats in detail.get("profile", []):
+            rows.append({"date": today, "file_name": detail["file_name"], **column_stats})
+
+    if not rows:
+        log_action("Tidak ada profil data untuk disimpan")
+        return None
+
+    profile_path = report_dir / f"pipeline_profile_{today}.csv"
+    try:
+        pd.DataFrame(rows).to_csv(profile_path, index=False)
+        log_action(f"Profil kualitas data berhasil disimpan: {profile_path}")
+        return profile_path
+    except Exception as error:
+        log_action(f"Gagal menyimpan profil kualitas data: {error}")
+        return None
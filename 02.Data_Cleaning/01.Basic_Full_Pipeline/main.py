@@ -6,8 +6,6 @@
 import os
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import MinMaxScaler
 
 # ============================================================
 # 1. PREPARE FOLDERS 
@@ -98,6 +96,7 @@ for col in numeric_cols:
     merge_df[col] = np.where(merge_df[col] < lower, lower, np.where(merge_df[col] >  upper, upper, merge_df[col]))
 
 # --- Isolation Forest for Anomaly Flag
+from sklearn.ensemble import IsolationForest
 iso = IsolationForest(contamination=0.02, random_state=42)
 merge_df['anomaly_flag'] = iso.fit_predict(merge_df[numeric_cols])
 
@@ -114,6 +113,7 @@ for col in ['Price', 'Quantity', 'Revenue']:
 # 8. NORMALIZATION (0-1)
 # ============================================================
 log_info("Normalizing numeric colums ...")
+from sklearn.preprocessing import MinMaxScaler
 scaler = MinMaxScaler()
 merge_df[numeric_cols] = scaler.fit_transform(merge_df[numeric_cols])
 
@@ -3,12 +3,17 @@
 # Author: Arul
 # ============================================================
 
+import time
+IMPORT_START = time.perf_counter()
+
 import os
+import sys
+import argparse
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import MinMaxScaler
 
+# sklearn is imported inside the stages that use it; importing this module has no side effects
+IMPORT_SECONDS = time.perf_counter() - IMPORT_START
 
 
 # ============================================================
@@ -18,8 +23,9 @@ data_folder = "data"
 output_folder = "output"
 logs_folder = "logs"
 
-os.makedirs(output_folder, exist_ok=True)
-os.makedirs(logs_folder, exist_ok=True)
+def prepare_folders():
+    os.makedirs(output_folder, exist_ok=True)
+    os.makedirs(logs_folder, exist_ok=True)
 
 # ============================================================
 # 2. DEFINE HELPER FUNCTION FOR LOGGING
@@ -120,6 +126,8 @@ def detect_outliers_and_anomalies (df) :
 
     # --- Isolation Forest for Anomaly Flag ---
     if len(numeric_cols) > 0 :
+        from sklearn.ensemble import IsolationForest
+
         iso = IsolationForest(contamination=0.02, random_state=42)
         df['anomaly_flag'] = iso.fit_predict(df[numeric_cols])
         anomalies = (df['anomaly_flag'] == -1).sum()
@@ -148,6 +156,8 @@ def convert_and_normalize(df):
             df[col] = pd.to_numeric(df[col], errors='coerce')
 
     log_info("Normalizing numeric columns ...")
+    from sklearn.preprocessing import MinMaxScaler
+
     numeric_cols = df.select_dtypes(include=['int64', 'float64', 'float32', 'int32']).columns
     scaler = MinMaxScaler()
     df[numeric_cols] = scaler.fit_transform(df[numeric_cols])
@@ -178,7 +188,24 @@ def save_results(df, output_folder, duplicates_removed) :
 # 9. MAIN PIPELINE
 # ============================================================
 
+# --- Check the input files without creating folders or writing logs ---
+def dry_run():
+    required_col = ['Date', 'Product', 'Price', 'Quantity', 'Revenue']
+    all_files = [file for file in os.listdir(data_folder) if file.endswith(".csv")] if os.path.isdir(data_folder) else []
+    if not all_files:
+        print(f"No CSV file found in {data_folder} folder")
+        return False
+
+    for file in all_files:
+        header = pd.read_csv(os.path.join(data_folder, file), nrows=0).columns
+        missing_col = [col for col in required_col if col not in header]
+        print(f"{file}: " + (f"will be skipped (missing columns: {missing_col})" if missing_col else "ok"))
+    print(f"Module imports took {IMPORT_SECONDS:.3f}s, dry run finished in {time.perf_counter() - IMPORT_START:.3f}s")
+    return True
+
 def main_pipeline():
+    prepare_folders()
+    log_info(f"Module imports took {IMPORT_SECONDS:.3f}s")
     df = load_files(data_folder)
     df = handle_missing(df)
     df, dup_removed = handle_duplicates(df)
@@ -188,4 +215,10 @@ def main_pipeline():
     log_info("Pipeline completed successfully!")
 
 if __name__== '__main__':
+    parser = argparse.ArgumentParser(description="Modular cleaning pipeline")
+    parser.add_argument("--dry-run", action="store_true", help="Check the input files and exit")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        sys.exit(0 if dry_run() else 1)
     main_pipeline()
\ No newline at end of file
@@ -3,13 +3,19 @@
 # Author: Arul
 # ============================================================
 
+import time
+IMPORT_START = time.perf_counter()
+
 import os
+import sys
+import argparse
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import MinMaxScaler
 import logging
 
+# sklearn is imported inside the stages that use it; importing this module has no side effects
+IMPORT_SECONDS = time.perf_counter() - IMPORT_START
+
 # ============================================================
 # 1. PREPARE FOLDERS 
 # ============================================================
@@ -17,9 +23,6 @@ data_folder = 'data'
 output_folder = 'output'
 logs_folder = 'logs'
 
-os.makedirs(output_folder, exist_ok=True)
-os.makedirs(logs_folder, exist_ok=True)
-
 # ============================================================
 # 2. DEFINE HELPER FUNCTION FOR LOGGING
 # ============================================================
@@ -34,19 +37,23 @@ def log_info (message) :
 # 3. SETUP LOGGING SYSTEM
 # ============================================================
 
-log_path = os.path.join(logs_folder, "pipeline.log")
-logging.basicConfig(
-    filename=log_path,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S"
-)
+def setup_logging():
+    os.makedirs(output_folder, exist_ok=True)
+    os.makedirs(logs_folder, exist_ok=True)
+
+    log_path = os.path.join(logs_folder, "pipeline.log")
+    logging.basicConfig(
+        filename=log_path,
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S"
+    )
 
-console = logging.StreamHandler()
-console.setLevel (logging.INFO)
-formatter = logging.Formatter("%(levelname)s - %(message)s")
-console.setFormatter(formatter)
-logging.getLogger().addHandler(console)
+    console = logging.StreamHandler()
+    console.setLevel (logging.INFO)
+    formatter = logging.Formatter("%(levelname)s - %(message)s")
+    console.setFormatter(formatter)
+    logging.getLogger().addHandler(console)
 
 
 # ============================================================
@@ -150,6 +157,8 @@ def detect_outliers_and_anomalies(df) :
 
         # --- Isolation Forest for anomaly flag ---
         if len(num_col) > 0 :
+            from sklearn.ensemble import IsolationForest
+
             iso = IsolationForest(contamination=0.02, random_state=42)
             df['anomaly_flag'] = iso.fit_predict(df[num_col])
             anomalies = (df['anomaly_flag'] == -1).sum()
@@ -181,6 +190,8 @@ def convert_and_normalize_data (df):
                 df[col] = pd.to_numeric(df[col], errors="coerce")
 
         log_info("Normalizing numeric columns ...") 
+        from sklearn.preprocessing import MinMaxScaler
+
         num_cols = df.select_dtypes(include = ['int64', 'float64', 'int32', 'float32']).columns
         scaler = MinMaxScaler()
         df[num_cols] = scaler.fit_transform(df[num_cols])
@@ -220,7 +231,24 @@ def save_result (df, output_folder, duplicate_removed):
 # ============================================================
 # 7. MAIN PIPELINE
 # ============================================================
+# --- Check the input files without creating folders or writing logs ---
+def dry_run():
+    required_cols = ['Date', 'Product', 'Price', 'Quantity', 'Revenue']
+    all_files = [file for file in os.listdir(data_folder) if file.endswith(".csv")] if os.path.isdir(data_folder) else []
+    if not all_files:
+        print(f"No CSV files found in {data_folder} folder")
+        return False
+
+    for file in all_files:
+        header = pd.read_csv(os.path.join(data_folder, file), nrows=0).columns
+        missing = [col for col in required_cols if col not in header]
+        print(f"{file}: " + (f"will be skipped (missing columns: {missing})" if missing else "ok"))
+    print(f"Module imports took {IMPORT_SECONDS:.3f}s, dry run finished in {time.perf_counter() - IMPORT_START:.3f}s")
+    return True
+
 def main_pipeline() :
+    setup_logging()
+    logging.info(f"Module imports took {IMPORT_SECONDS:.3f}s")
     logging.info("=== Starting Logged Full Pipeline ===")
     log_info("=== Starting Logged Full Pipeline ===")
 
@@ -241,6 +269,12 @@ def main_pipeline() :
 
 
 if __name__ == "__main__" :
+    parser = argparse.ArgumentParser(description="Logged cleaning pipeline")
+    parser.add_argument("--dry-run", action="store_true", help="Check the input files and exit")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        sys.exit(0 if dry_run() else 1)
     main_pipeline()
 
     
@@ -2,18 +2,28 @@
 # Mini Project 4: Configurable Full Pipeline (Dynamic Settings)
 # Author: Arul
 # ============================================================
+import time
+IMPORT_START = time.perf_counter()
+
 import os 
+import glob
 import json
+import argparse
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import MinMaxScaler, StandardScaler
+import sys
 import logging
 
+# Loading, the stage cache and stage profiling are shared with the production pipeline (05)
+PRODUCTION_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "05.Production-Ready_Pipeline"))
+sys.path.insert(0, PRODUCTION_DIR)
+from src.log_info import log_info
+from src.loader import REQUIRED_COLS, find_valid_files, read_files_parallel, concat_frames, column_footprint, estimate_footprint, log_footprint
+from src.stage_cache import run_stages, file_fingerprints, code_version
+from src.profiling import StageProfiler
 
-def log_info(message):
-    print(f"\033[94m[INFO]\033[0m {message}")
-    logging.info(message)
+# sklearn is imported inside the stages that use it, so disabled stages cost nothing at startup
+IMPORT_SECONDS = time.perf_counter() - IMPORT_START
 
 # ============================================================
 # 1. LOAD CONFIG FILE
@@ -52,38 +62,37 @@ def setup_environment(config):
 
     logging.info("=== Pipeline Initialized ===")
     log_info(f"Environment setup and  logging ready.")
+    logging.info(f"Module imports took {IMPORT_SECONDS:.3f}s")
 
 # ============================================================
 # 2. CORE PIPELINE FUNCTION (To Be Impelmented)
 # ============================================================
 
 #  --- Load Files ---
-def load_files(folder_path):
+def check_memory_budget(files, plan=None, budget_mb=0):
+    # Runs before any file is fully parsed; this pipeline has no out-of-core mode, so it stops here
+    if budget_mb <= 0:
+        return
+    footprint = estimate_footprint(files, plan)
+    log_footprint(footprint, "Estimated")
+    estimated_mb = footprint.sum() / 1024 ** 2
+    if estimated_mb > budget_mb:
+        logging.warning(f"Estimated frame size {estimated_mb:.2f} MB exceeds memory budget {budget_mb:.2f} MB")
+        raise MemoryError(f"Estimated frame size {estimated_mb:.2f} MB exceeds memory budget {budget_mb:.2f} MB "
+                          f"(raise memory_budget_mb or use the chunked mode of the production pipeline)")
+
+def load_files(folder_path, workers=0, plan=None, budget_mb=0, min_parallel_mb=64):
     try:
-        all_files = [file for file in os.listdir(folder_path) if file.endswith(".csv")]
-        if not all_files:
-            raise FileNotFoundError("No CSV files found in data folder")
-        
-
-        dataframes = []
-        for file in all_files:
-            file_path = os.path.join(folder_path, file)
-            logging.info(f"Loading {file}")
-            log_info(f"Loading {file}")
-            df = pd.read_csv(file_path)
-
-            required_cols = ['Date', 'Product', 'Price', 'Quantity', 'Revenue']
-            missing = [col for col in required_cols if col not in df.columns]
-            if missing :
-                log_info(f"Skipping {file} (missing columns: {missing})")
-                logging.info(f"Skipping {file} (missing columns: {missing})")
-                continue
+        # Header-only validation first, so skipped files are never fully parsed
+        valid_files = find_valid_files(folder_path)
+        if not valid_files:
+            raise FileNotFoundError("No CSV files with the required columns found in data folder")
 
-            dataframes.append(df)
-
-        merged_file = pd.concat(dataframes, ignore_index=True)
+        check_memory_budget(valid_files, plan, budget_mb)
+        merged_file = concat_frames(read_files_parallel(valid_files, workers, plan, min_parallel_mb))
         log_info(f"Total merged rows: {len(merged_file)}")
         logging.info(f"Total merged rows: {len(merged_file)}")
+        log_footprint(column_footprint(merged_file), "Loaded")
         return merged_file
     
     except Exception as error:
@@ -96,7 +105,7 @@ def handle_missing(df) :
     try:
         before_handle = df.isna().sum().sum()
         for col in df.columns:
-            if df[col].dtype == 'object':
+            if not pd.api.types.is_numeric_dtype(df[col]):
                 mode_val = df[col].mode()[0]
                 df[col] = df[col].fillna(mode_val)
             else: 
@@ -135,27 +144,30 @@ def detect_outliers_and_anomalies (df, config) :
     try:
         num_col = df.select_dtypes(include = ['int64', 'float64', 'int32', 'float32']).columns
 
-        for col in num_col: 
-            Q1 = df[col].quantile(0.25)
-            Q3 = df[col].quantile(0.75)
-            IQR = Q3 - Q1
-
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-
-            df[col] = np.where(df[col] < lower_bound, lower_bound, np.where(df[col] > upper_bound, upper_bound, df[col]))
+        # All quartiles in one call on the 2-D array, then clip every column in place
+        factor = float(config["parameters"].get("iqr_factor", 1.5))
+        values = df[num_col].to_numpy(dtype="float64", copy=True)
+        Q1, Q3 = np.nanquantile(values, [0.25, 0.75], axis=0)
+        IQR = Q3 - Q1
+        lower_bound = Q1 - factor * IQR
+        upper_bound = Q3 + factor * IQR
 
-            outliers = df[(df[col] < lower_bound) | (df[col] > upper_bound)]
+        outliers = ((values < lower_bound) | (values > upper_bound)).sum(axis=0)
+        np.clip(values, lower_bound, upper_bound, out=values)
+        df[num_col] = values
 
-            if len(outliers) > 0 :
-                log_info(f"Outliers detected in column {col}: {len(outliers)} rows")
-                logging.info(f"Outliers detected in column {col} : {len(outliers)} rows")
+        for col, n_out in zip(num_col, outliers):
+            if n_out > 0 :
+                log_info(f"Outliers detected in column {col}: {n_out} rows")
+                logging.info(f"Outliers detected in column {col} : {n_out} rows")
 
             else :
                 log_info(f"No outliers detected in column {col}")
                 logging.info(f"No outliers detected in column {col}")
 
         if len (num_col) > 0 :
+            from sklearn.ensemble import IsolationForest
+
             contamination = float(config["parameters"]["isolation_forest_contamination"])
             random_state = config["parameters"]["random_state"]
             iso= IsolationForest(contamination = contamination, random_state = random_state)
@@ -174,6 +186,8 @@ def detect_outliers_and_anomalies (df, config) :
 # --- Normalize Data ---
 def normalize_data(df, method="minmax"):
     try:
+        from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
         if method == "minmax":
             scaler = MinMaxScaler()
         elif method == "standard":
@@ -183,12 +197,12 @@ def normalize_data(df, method="minmax"):
         
         # --- Date Time ---
 
-        if "Date" in df.columns:
+        if "Date" in df.columns and not pd.api.types.is_datetime64_any_dtype(df['Date']):
             df['Date'] = pd.to_datetime(df['Date'], errors="coerce")
         
         # --- Numeric Cols ---
         for col in ['Price', 'Quantity', 'Revenue'] :
-            if col in df.columns:
+            if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
                 df[col] = pd.to_numeric(df[col], errors="coerce")
             
 
@@ -227,6 +241,7 @@ def save_results(df, config, dup_removed):
         logging.info(f"Saved cleaned data to {output_path}")
         log_info(f"Saved summary to {summary_path}")
         logging.info(f"Saved summary to {summary_path}")
+        return summary_path
 
     except FileNotFoundError as error:
         log_info(f"Error saving results: {error}")
@@ -234,17 +249,113 @@ def save_results(df, config, dup_removed):
         exit()
 
 # ============================================================
-# 3. Main Pipeline
+# 3. STAGES, CACHE KEYS AND PROFILING (src.stage_cache / src.profiling)
+# ============================================================
+def cache_base_payload(config):
+    # Input file fingerprints + code version: any change invalidates every stage
+    sources = [os.path.abspath(__file__)] + [os.path.join(PRODUCTION_DIR, "src", f"{name}.py")
+                                             for name in ("loader", "stage_cache", "profiling")]
+    return {"inputs": file_fingerprints(config["folders"]["data"]), "code_version": code_version(sources)}
+
+def pipeline_stages(config, profiler):
+    settings, params = config["settings"], config["parameters"]
+
+    def load_stage_fn(_):
+        return load_files(config['folders']['data'], int(params.get('load_workers', 0)),
+                          config.get('dtype_plan'), float(params.get('memory_budget_mb', 0)),
+                          float(params.get('load_parallel_min_mb', 64))), {}
+
+    def missing_stage(df):
+        return (handle_missing(df) if settings["handle_missing"] else df), {}
+
+    def duplicates_stage(df):
+        if not settings["handle_duplicates"]:
+            return df, {"dup_removed": 0}
+        df, dup_removed = handle_duplicates(df)
+        return df, {"dup_removed": int(dup_removed)}
+
+    def outliers_stage(df):
+        return (detect_outliers_and_anomalies(df, config) if settings["detect_outliers_and_anomalies"] else df), {}
+
+    def normalize_stage(df):
+        return (normalize_data(df, settings['normalization']) if settings["normalization"] else df), {}
+
+    # each stage is keyed only on the settings it reads (load_workers or memory_budget_mb keep the cache)
+    outlier_params = {key: params.get(key) for key in ("iqr_factor", "isolation_forest_contamination", "random_state")}
+    stages = [
+        ("load_files", {"data": config["folders"]["data"], "dtype_plan": config.get("dtype_plan")}, load_stage_fn),
+        ("handle_missing", {"enabled": settings["handle_missing"]}, missing_stage),
+        ("handle_duplicates", {"enabled": settings["handle_duplicates"]}, duplicates_stage),
+        ("detect_outliers_and_anomalies", {"enabled": settings["detect_outliers_and_anomalies"],
+                                           "parameters": outlier_params}, outliers_stage),
+        ("normalize_data", {"normalization": settings["normalization"]}, normalize_stage),
+    ]
+    return [(name, config_slice, profiler.wrap(name, fn)) for name, config_slice, fn in stages]
+
+# ============================================================
+# 4. CONFIG VALIDATION AND DRY RUN (no folders, no log file, no sklearn)
 # ===========================================================
+def validate_config(config):
+    problems = []
+    for section, keys in (("folders", ("data", "output", "logs")),
+                          ("settings", ("handle_missing", "handle_duplicates", "detect_outliers_and_anomalies", "normalization")),
+                          ("parameters", ("isolation_forest_contamination", "random_state"))):
+        if not isinstance(config.get(section), dict):
+            problems.append(f"missing section '{section}'")
+            continue
+        problems += [f"missing {section}.{key}" for key in keys if key not in config[section]]
+
+    normalization = config.get("settings", {}).get("normalization")
+    if normalization is not None and normalization not in ("minmax", "standard"):
+        problems.append(f"settings.normalization is '{normalization}', expected 'minmax' or 'standard'")
+    try:
+        float(config.get("parameters", {}).get("isolation_forest_contamination", 0.02))
+    except (TypeError, ValueError):
+        problems.append("parameters.isolation_forest_contamination is not a number")
+    return problems
+
+
+def dry_run(config, list_files=True):
+    problems = validate_config(config)
+    if not problems and list_files:
+        data_folder = config["folders"]["data"]
+        files = sorted(glob.glob(os.path.join(data_folder, "*.csv")))
+        if not files:
+            problems.append(f"No CSV files found in {data_folder}")
+        for file_path in files:
+            missing = [col for col in REQUIRED_COLS if col not in pd.read_csv(file_path, nrows=0).columns]
+            print(f"{os.path.basename(file_path)}: " + (f"will be skipped (missing columns: {missing})" if missing else "ok"))
+
+    for problem in problems:
+        print(f"[CONFIG ERROR] {problem}")
+    if problems:
+        return False
+
+    print("Config is valid.")
+    if list_files:
+        settings = config["settings"]
+        stages = ["load_files"] + [name for name in ("handle_missing", "handle_duplicates", "detect_outliers_and_anomalies")
+                                   if settings[name]] + ["normalize_data", "save_results"]
+        print("Stages: " + " -> ".join(stages))
+    print(f"Module imports took {IMPORT_SECONDS:.3f}s, dry run finished in {time.perf_counter() - IMPORT_START:.3f}s")
+    return True
 
-def main() :
-    config = load_config()
+
+# ============================================================
+# 5. Main Pipeline
+# ===========================================================
+
+def main(config_path="config.json") :
+    config = load_config(config_path)
     setup_environment (config)
 
     try :
         log_info("=== Pipeline Started ===")
         logging.info("=== Pipeline Started ===")
-        df = load_files(config['folders']['data'])
+        profiler = StageProfiler(cprofile=config["settings"].get("profile", False),
+                                 profile_folder=os.path.join(config["folders"]["logs"], "profiles"))
+        df, meta = run_stages(pipeline_stages(config, profiler), cache_base_payload(config),
+                              config["folders"].get("cache", "cache"), config["settings"].get("use_cache", False))
 
         if not isinstance(df, pd.DataFrame):
             log_info("Load_files did not return a DataFrame. Pipeline stopped.")
@@ -256,23 +367,11 @@ def main() :
             logging.error("No data loaded. Pipeline stopped.")
             return
 
-         
-        if config["settings"] ["handle_missing"]:
-            df = handle_missing(df)
-
-        if config["settings"] ["handle_duplicates"]:
-            df, dup_removed = handle_duplicates(df)
-        
-        else :
-            dup_removed = 0
-
-        if config["settings"]["detect_outliers_and_anomalies"]:
-            df = detect_outliers_and_anomalies(df, config)
-
-        if config["settings"]["normalization"]:
-            df = normalize_data(df, config['settings']['normalization'])
-
-        save_results(df, config, dup_removed)
+        dup_removed = meta.get("dup_removed", 0)
+        with profiler.stage("save_results", df) as record:
+            summary_path = save_results(df, config, dup_removed)
+            record["rows_out"] = len(df)
+        profiler.write_report(summary_path)
         
         logging.info("=== Pipeline Completed ===")
         log_info("=== Pipeline Completed ===")
@@ -283,4 +382,14 @@ def main() :
 
 
 if __name__ == "__main__" :
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Configurable cleaning pipeline")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--validate-config", action="store_true", help="Check the config and exit")
+    parser.add_argument("--dry-run", action="store_true", help="Check the config and input files, list the stages, and exit")
+    args = parser.parse_args()
+
+    if args.validate_config or args.dry_run:
+        with open(args.config) as file:
+            config = json.load(file)
+        sys.exit(0 if dry_run(config, list_files=args.dry_run) else 1)
+    main(args.config)
\ No newline at end of file
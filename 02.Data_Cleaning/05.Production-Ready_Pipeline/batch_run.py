@@ -0,0 +1,188 @@
+# ============================================================
+# Batch runner: several pipeline configs at once
+#   python batch_run.py --configs client_a.json client_b.json --workers 2
+#   Jobs run in a process pool of long-lived workers (pandas and main.py are
+#   imported once per worker, not once per job; sklearn is imported by the
+#   first job that reaches a stage using it and then stays loaded in that
+#   worker). Every job gets
+#   its own log file; the batch writes one consolidated timing summary to
+#   logs/batch/batch_summary_<ts>.json / .txt.
+# ============================================================
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import contextlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+BASE_DIR = Path(__file__).resolve().parent
+pipeline = None
+
+
+# ============================================================
+# WORKER SIDE
+# ============================================================
+def _init_worker():
+    global pipeline
+    sys.path.insert(0, str(BASE_DIR))
+    import main as pipeline_module
+    pipeline = pipeline_module
+
+
+def _reset_logging():
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+
+def _run_job(job_name, config_path, batch_folder):
+    config_path = Path(config_path).resolve()
+    log_path = Path(batch_folder) / f"{job_name}.log"
+    console_path = Path(batch_folder) / f"{job_name}.console.txt"
+    result = {"job": job_name, "config": str(config_path), "pid": os.getpid(),
+              "status": "ok", "error": None, "summary_path": None, "stages": []}
+
+    # relative folders in a config resolve against the config's own directory
+    previous_cwd = os.getcwd()
+    os.chdir(config_path.parent)
+
+    # the job log takes the place of logs/pipeline.log.txt (setup_environment keeps an existing file handler)
+    _reset_logging()
+    file_handler = logging.FileHandler(log_path)
+    file_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s", "%Y-%m-%d %H:%M:%S"))
+    logging.getLogger().addHandler(file_handler)
+    logging.getLogger().setLevel(logging.INFO)
+
+    wall, cpu = time.perf_counter(), time.process_time()
+    with open(console_path, "w") as console, contextlib.redirect_stdout(console), contextlib.redirect_stderr(console):
+        try:
+            run = pipeline.main(str(config_path))
+            if run is None:
+                result["status"] = "no_output"
+            else:
+                result["summary_path"] = os.path.abspath(run["summary_path"]) if run["summary_path"] else None
+                result["stages"] = run["stages"]
+        except SystemExit:
+            # main() calls exit() after logging the error
+            result["status"] = "failed"
+            result["error"] = f"pipeline exited, see {log_path.name}"
+        except Exception as error:
+            result["status"] = "failed"
+            result["error"] = f"{type(error).__name__}: {error}"
+            logging.exception("Batch job failed")
+        finally:
+            _reset_logging()
+            os.chdir(previous_cwd)
+
+    result["wall_seconds"] = round(time.perf_counter() - wall, 4)
+    result["cpu_seconds"] = round(time.process_time() - cpu, 4)
+    return result
+
+
+# ============================================================
+# DRIVER SIDE
+# ============================================================
+def job_names(config_paths):
+    names, seen = [], {}
+    for path in config_paths:
+        name = Path(path).stem
+        seen[name] = seen.get(name, 0) + 1
+        names.append(name if seen[name] == 1 else f"{name}_{seen[name]}")
+    return names
+
+
+# --- Output files are named by second-resolution timestamps, so shared output folders can collide ---
+def warn_shared_outputs(config_paths):
+    owners = {}
+    for path in config_paths:
+        path = Path(path).resolve()
+        with open(path) as file:
+            folders = json.load(file)["folders"]
+        for key in ("output", "history", "cache"):
+            folder = (path.parent / folders.get(key, key)).resolve()
+            owners.setdefault((key, folder), []).append(path.name)
+    for (key, folder), names in owners.items():
+        if len(names) > 1:
+            print(f"[WARNING] {', '.join(names)} share the {key} folder {folder}")
+
+
+def summary_table(results, batch_seconds):
+    header = f"{'Job':<28} {'Status':<10} {'Wall s':>9} {'CPU s':>9} {'PID':>8}"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(f"{result['job']:<28} {result['status']:<10} {result['wall_seconds']:>9.3f} "
+                     f"{result['cpu_seconds']:>9.3f} {result['pid']:>8}")
+    job_seconds = sum(result["wall_seconds"] for result in results)
+    lines.append("")
+    lines.append(f"Batch wall time: {batch_seconds:.3f}s, sum of job wall times: {job_seconds:.3f}s "
+                 f"(speedup {job_seconds / batch_seconds if batch_seconds > 0 else 0:.2f}x)")
+
+    # stage x job wall-time matrix
+    stages = []
+    for result in results:
+        stages += [record["stage"] for record in result["stages"] if record["stage"] not in stages]
+    if stages:
+        lines.append("")
+        lines.append("Stage wall seconds per job:")
+        lines.append(f"{'Stage':<30} " + " ".join(f"{result['job'][:14]:>14}" for result in results))
+        for stage in stages:
+            cells = []
+            for result in results:
+                seconds = sum(r["wall_seconds"] for r in result["stages"] if r["stage"] == stage)
+                cells.append(f"{seconds:>14.3f}" if any(r["stage"] == stage for r in result["stages"]) else f"{'-':>14}")
+            lines.append(f"{stage:<30} " + " ".join(cells))
+    return "\n".join(lines)
+
+
+def run_batch(config_paths, workers=0, log_folder="logs/batch"):
+    created_at = time.strftime("%Y-%m-%d_%H.%M.%S")
+    batch_folder = (BASE_DIR / log_folder / created_at).resolve()
+    batch_folder.mkdir(parents=True, exist_ok=True)
+    warn_shared_outputs(config_paths)
+
+    workers = workers or min(len(config_paths), os.cpu_count() or 1)
+    names = job_names(config_paths)
+    print(f"Running {len(config_paths)} configs on {workers} worker(s), job logs in {batch_folder}")
+
+    start = time.perf_counter()
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {pool.submit(_run_job, name, path, str(batch_folder)): name
+                   for name, path in zip(names, config_paths)}
+        for future in as_completed(futures):
+            result = future.result()
+            results[result["job"]] = result
+            print(f"[{result['status'].upper()}] {result['job']} in {result['wall_seconds']:.2f}s (pid {result['pid']})"
+                  + (f" - {result['error']}" if result["error"] else ""))
+    batch_seconds = time.perf_counter() - start
+
+    ordered = [results[name] for name in names]
+    table = summary_table(ordered, batch_seconds)
+    with open(batch_folder / f"batch_summary_{created_at}.txt", "w") as file:
+        file.write(table + "\n")
+    with open(batch_folder / f"batch_summary_{created_at}.json", "w") as file:
+        json.dump({"created_at": created_at, "workers": workers, "batch_seconds": round(batch_seconds, 4),
+                   "jobs": ordered}, file, indent=2, default=str)
+    print("\n" + table)
+    print(f"\nSaved batch summary to {batch_folder}")
+    return ordered
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the production pipeline for several configs concurrently")
+    parser.add_argument("--configs", nargs="+", required=True, help="Config JSON files, one job each")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: one per config, up to CPU count)")
+    parser.add_argument("--log-folder", default="logs/batch", help="Where job logs and the batch summary go")
+    args = parser.parse_args()
+
+    results = run_batch(args.configs, args.workers, args.log_folder)
+    if any(result["status"] == "failed" for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# ============================================================
+# Scaling benchmark for the production cleaning pipeline
+#   generate : seeded synthetic sales CSVs (src.synthetic)
+#   run      : time every stage (load, missing, duplicates, outliers/IForest,
+#              normalize, save) per dataset size, one fresh process per size,
+#              and write the results to benchmarks/results/benchmark_<ts>.json
+# ============================================================
+import os
+import sys
+import json
+import time
+import argparse
+import shutil
+import platform
+import subprocess
+import contextlib
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # not available on Windows; peak RSS is reported as null
+    resource = None
+
+BASE_DIR = Path(__file__).resolve().parent
+BENCH_DIR = BASE_DIR / "benchmarks"
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def dataset_folder(args, rows):
+    name = f"rows{rows}_files{args.files}_seed{args.seed}_m{args.missing_rate}_d{args.duplicate_rate}_o{args.outlier_rate}"
+    return BENCH_DIR / "data" / name
+
+
+def generate(args, rows):
+    from src.synthetic import write_sales_files
+
+    folder = dataset_folder(args, rows)
+    if folder.exists() and any(folder.glob("*.csv")):
+        return folder
+    print(f"Generating {rows} rows into {folder}")
+    write_sales_files(folder, rows, files=args.files, seed=args.seed,
+                      missing_rate=args.missing_rate, duplicate_rate=args.duplicate_rate,
+                      outlier_rate=args.outlier_rate)
+    return folder
+
+
+# ============================================================
+# ONE DATASET (runs inside its own process so peak RSS is per size)
+# ============================================================
+def run_once(data_folder, output_folder):
+    import_start = time.perf_counter()
+    import main as pipeline
+    import_seconds = time.perf_counter() - import_start
+
+    devnull = open(os.devnull, "w")
+    with contextlib.redirect_stdout(devnull):
+        config = pipeline.load_config(str(BASE_DIR / "config.json"))
+    config["folders"].update({
+        "data": str(data_folder),
+        "output": str(output_folder),
+        "artifacts": str(Path(output_folder) / "artifacts"),
+    })
+    config["settings"].update({"use_cache": False, "execution_mode": "in_memory",
+                               "run_mode": "fit_transform", "anomaly_mode": "fit"})
+    config["parameters"].update({"persist_isolation_forest": False, "memory_budget_mb": 0})
+    folders = config["folders"]
+    os.makedirs(folders["output"], exist_ok=True)
+
+    summary = {"missing_values": 0, "duplicates_removed": 0, "anomalies_detected": 0}
+
+    def save_stage(df):
+        # save_result returns the summary path; the stage passes the frame on
+        pipeline.save_result(df, folders, summary, config.get("output"))
+        return df
+
+    stages = [
+        ("load", lambda df: pipeline.load_files(config, folders)),
+        ("missing", lambda df: pipeline.handle_missing(df, config)),
+        ("duplicates", lambda df: pipeline.handle_duplicates(df, config)[0]),
+        ("outliers_iforest", lambda df: pipeline.detect_outliers_and_anomalies(df, config)),
+        ("normalize", lambda df: pipeline.convert_and_normalize(df, config)),
+        ("save", lambda df: save_stage(df)),
+    ]
+
+    results, df = [], None
+    for name, fn in stages:
+        rows_in = 0 if df is None else len(df)
+        wall, cpu = time.perf_counter(), time.process_time()
+        with contextlib.redirect_stdout(devnull):
+            df = fn(df)
+        results.append({
+            "stage": name,
+            "seconds": round(time.perf_counter() - wall, 4),
+            "cpu_seconds": round(time.process_time() - cpu, 4),
+            "rows_in": rows_in,
+            "rows_out": len(df),
+            "peak_rss_mb": peak_rss_mb(),
+        })
+    devnull.close()
+
+    return {"import_seconds": round(import_seconds, 4), "stages": results,
+            "total_seconds": round(sum(stage["seconds"] for stage in results), 4),
+            "peak_rss_mb": peak_rss_mb()}
+
+
+# ============================================================
+# DRIVER
+# ============================================================
+def environment_info():
+    import numpy, pandas, sklearn
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"git_commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+            "cpu_count": os.cpu_count(), "numpy": numpy.__version__, "pandas": pandas.__version__,
+            "sklearn": sklearn.__version__}
+
+
+def compare(result, baseline_path):
+    with open(baseline_path) as file:
+        baseline = {run["rows"]: run for run in json.load(file)["runs"]}
+    print(f"\nComparison with {baseline_path}")
+    for run in result["runs"]:
+        base = baseline.get(run["rows"])
+        if base is None:
+            continue
+        base_stages = {stage["stage"]: stage for stage in base["stages"]}
+        for stage in run["stages"]:
+            old = base_stages.get(stage["stage"])
+            if old and old["seconds"] > 0:
+                print(f"{run['rows']:>12} {stage['stage']:<18} {old['seconds']:>9.3f}s -> {stage['seconds']:>9.3f}s "
+                      f"({stage['seconds'] / old['seconds']:.2f}x)")
+
+
+def run(args):
+    result = {
+        "created_at": time.strftime("%Y-%m-%d_%H.%M.%S"),
+        "environment": environment_info(),
+        "dataset": {"files": args.files, "seed": args.seed, "missing_rate": args.missing_rate,
+                    "duplicate_rate": args.duplicate_rate, "outlier_rate": args.outlier_rate},
+        "runs": [],
+    }
+    for rows in args.rows:
+        data_folder = generate(args, rows)
+        output_folder = BENCH_DIR / "output" / f"rows{rows}"
+        shutil.rmtree(output_folder, ignore_errors=True)
+        completed = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), "_run-once", str(data_folder), str(output_folder)],
+            cwd=BASE_DIR, capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            print(completed.stderr)
+            raise SystemExit(f"Benchmark failed for {rows} rows")
+        run_result = {"rows": rows, **json.loads(completed.stdout.strip().splitlines()[-1])}
+        result["runs"].append(run_result)
+
+        print(f"\n{rows} rows (peak RSS {run_result['peak_rss_mb']} MB)")
+        for stage in run_result["stages"]:
+            print(f"  {stage['stage']:<18} {stage['seconds']:>9.3f}s  cpu {stage['cpu_seconds']:>9.3f}s  "
+                  f"rows {stage['rows_in']:>10} -> {stage['rows_out']:<10} peak {stage['peak_rss_mb']} MB")
+
+    results_dir = BENCH_DIR / "results"
+    results_dir.mkdir(parents=True, exist_ok=True)
+    result_path = results_dir / f"benchmark_{result['created_at']}.json"
+    with open(result_path, "w") as file:
+        json.dump(result, file, indent=2)
+    print(f"\nSaved benchmark results to {result_path}")
+
+    if args.baseline:
+        compare(result, args.baseline)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic data generator and stage benchmark for the production pipeline")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("generate", "run"):
+        sub = subparsers.add_parser(name)
+        sub.add_argument("--rows", type=lambda value: int(float(value)), nargs="+", default=[100_000, 1_000_000],
+                         help="Dataset sizes, e.g. 1e5 1e6 1e7 1e8")
+        sub.add_argument("--files", type=int, default=4)
+        sub.add_argument("--seed", type=int, default=42)
+        sub.add_argument("--missing-rate", type=float, default=0.01)
+        sub.add_argument("--duplicate-rate", type=float, default=0.01)
+        sub.add_argument("--outlier-rate", type=float, default=0.005)
+        if name == "run":
+            sub.add_argument("--baseline", default=None, help="Earlier benchmark JSON to compare against")
+
+    once = subparsers.add_parser("_run-once")
+    once.add_argument("data_folder")
+    once.add_argument("output_folder")
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        for rows in args.rows:
+            generate(args, rows)
+    elif args.command == "run":
+        run(args)
+    else:
+        print(json.dumps(run_once(args.data_folder, args.output_folder)))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,30 @@
 # Author: Arul
 # ============================================================
 
+import time
+IMPORT_START = time.perf_counter()
+
 import os
+import sys
+import glob
 import json
+import argparse
 import pandas as pd
 import numpy as np
 import logging
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import MinMaxScaler, StandardScaler
+from src.log_info import log_info
+from src.loader import find_valid_files, read_files_parallel, concat_frames, column_footprint, estimate_footprint, log_footprint
+from src.chunked import run_chunked_pipeline
+from src.capping import cap_outliers, StreamingIQR
+from src.stage_cache import run_stages, file_fingerprints, code_version
+from src.anomaly import fit_isolation_forest, score_in_chunks, save_forest, load_forest
+from src.writer import write_output
+from src.profiling import StageProfiler
+from src.fingerprint_store import open_fingerprint_store, filter_seen
+from src.fitting import fit_statistics, transform_frame, save_artifact, load_artifact
+
+# sklearn and joblib are imported inside the stages that use them, so disabled stages cost nothing at startup
+IMPORT_SECONDS = time.perf_counter() - IMPORT_START
 
 # ============================================================
 # 1. SETUP ENVIRONMENT
@@ -20,30 +37,30 @@ def setup_environment(config) :
     os.makedirs(folders["output"], exist_ok=True)
     os.makedirs(folders["logs"], exist_ok=True)
 
+    # load_config's log_info already triggered logging's implicit stderr setup, so force the file handler
+    # (unless a caller such as batch_run.py installed its own log file)
     log_path = os.path.join(folders["logs"], "pipeline.log.txt")
-    logging.basicConfig(
-        filename=log_path,
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
+    if not any(isinstance(handler, logging.FileHandler) for handler in logging.getLogger().handlers):
+        logging.basicConfig(
+            filename=log_path,
+            level=logging.INFO,
+            format="%(asctime)s - %(levelname)s - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+            force=True,
+        )
 
     console = logging.StreamHandler()
     console.setLevel(logging.INFO)
-    formatter = logging.Formatter("%[(levelname)s] - %(message)s")
+    formatter = logging.Formatter("[%(levelname)s] - %(message)s")
     console.setFormatter(formatter)
     logging.getLogger().addHandler(console)
 
     logging.info("==== Pipeline Initialized ====")
     log_info(f"Environment setup complete.")
+    logging.info(f"Module imports took {IMPORT_SECONDS:.3f}s")
 
     return folders
 
-def log_info(message):
-    print(f"\033[94m[INFO]\033[0m {message}")
-    logging.info(message)
-
-
 def load_config(config_path = "config.json"):
     try :
         with open(config_path, 'r') as file:
@@ -60,30 +77,18 @@ def load_config(config_path = "config.json"):
 # ============================================================
 def load_files (config, folders):
     try:
-        data_folder = folders["data"]
-        all_files = [file for file in os.listdir(data_folder) if file.endswith(".csv")]
-        if not all_files:
-            raise FileNotFoundError("No CSV files found in data folder")
-        
-        dataframes = []
-        for file in all_files:
-            file_path = os.path.join(data_folder, file)
-            log_info(f"Loading {file}")
-            logging.info(f"Loading {file}")
-            df = pd.read_csv(file_path)
-
-            required_cols = ["Date", "Product", "Price", "Quantity", "Revenue"]
-            missing = [col for col in required_cols if col not in df.columns]
-            if missing:
-                log_info(f"Skipping {file} (missing columns: {missing})")
-                logging.warning(f"Skipping {file} (missing columns: {missing})")
-                continue
-
-            dataframes.append(df)
-            
-        df = pd.concat(dataframes, ignore_index=True)
+        files = find_valid_files(folders["data"])
+        if not files:
+            raise FileNotFoundError("No CSV files with the required columns found in data folder")
+
+        workers = int(config["parameters"].get("load_workers", 0))
+        min_parallel_mb = float(config["parameters"].get("load_parallel_min_mb", 64))
+        dataframes = read_files_parallel(files, workers, config.get("dtype_plan"), min_parallel_mb)
+
+        df = concat_frames(dataframes)
         log_info(f"Total merged rows: {len(df)}")
         logging.info(f"Total merged rows: {len(df)}")
+        log_footprint(column_footprint(df), "Loaded")
         return df
     
     except Exception as error:
@@ -103,7 +108,7 @@ def handle_missing(df, config):
 
         before_handle = df.isna().sum().sum()
         for col in df.columns:
-            if df[col].dtype == "object":
+            if not pd.api.types.is_numeric_dtype(df[col]):
                 mode_val = df[col].mode()[0]
                 df[col] = df[col].fillna(mode_val)
             else:
@@ -142,6 +147,15 @@ def handle_duplicates (df, config) :
         logging.info(f"Error handling duplicates: {error}")      
         exit()
 
+
+# --- Drop rows delivered in earlier runs; fingerprints are taken on the raw rows, before any filling ---
+def filter_delivered(df, history):
+    before_handle = len(df)
+    df, history_removed = filter_seen(df, history)
+    log_info(f"Rows already delivered in earlier runs: {history_removed} of {before_handle}")
+    logging.info(f"Rows already delivered in earlier runs: {history_removed} of {before_handle}")
+    return df, history_removed
+
 # ============================================================
 # 4. DETECT AOUTLIERS AND ANOMALIES - ISOLATION FOREST
 # ============================================================
@@ -153,33 +167,41 @@ def detect_outliers_and_anomalies(df, config):
             return df
         
         num_col = df.select_dtypes(include = ['int64', 'float64', 'int32', 'float32']).columns
-        
-        for col in num_col:
-            Q1 = df[col].quantile(0.25)
-            Q3 = df[col].quantile(0.75)
-
-            IQR = Q3 - Q1
-
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-
-            df[col] = np.where(df[col] < lower_bound, lower_bound, np.where(df[col] > upper_bound, upper_bound, df[col]))
-
-            outliers = df[(df[col] < lower_bound) | (df[col] > upper_bound)]
-
-            if len(outliers) > 0 :
-                log_info(f"Outliers detected in column {col} : {len(outliers)} rows")
-                logging.info(f"Outliers detected in column {col} : {len(outliers)} rows")
+        params = config["parameters"]
+        factor = float(params.get("iqr_factor", 1.5))
+
+        # Quartiles for all columns at once: exact (one nanquantile call) or streaming sketch
+        lower_bound, upper_bound = None, None
+        if params.get("quantile_mode", "exact") == "sketch" and len(num_col) > 0:
+            chunk_size = int(params.get("chunk_size", 100_000))
+            iqr = StreamingIQR(num_col, error=float(params.get("quantile_error", 0.01)))
+            for start in range(0, len(df), chunk_size):
+                iqr.update(df.iloc[start:start + chunk_size])
+            lower_bound, upper_bound = iqr.bounds(factor)
+
+        df, lower_bound, upper_bound, outliers = cap_outliers(df, num_col, lower_bound, upper_bound, factor)
+
+        for col, n_out in zip(num_col, outliers):
+            if n_out > 0 :
+                log_info(f"Outliers detected in column {col} : {n_out} rows")
+                logging.info(f"Outliers detected in column {col} : {n_out} rows")
             else :
                 log_info(f"No outliers detected in column {col}")
                 logging.info(f"No outliers detected in column {col}")
 
         if len(num_col) > 0:
-            contamination = float(config["parameters"]["isolation_forest_contamination"])
-            random_state = config["parameters"]["random_state"]
+            artifact_folder = config["folders"].get("artifacts", "artifacts")
+            chunk_size = int(params.get("chunk_size", 100_000))
+
+            if config["settings"].get("anomaly_mode", "fit") == "score_only":
+                iso, feature_cols = load_forest(params, artifact_folder)
+                num_col = pd.Index(feature_cols)
+            else:
+                iso = fit_isolation_forest(df[num_col].to_numpy(), params)
+                if params.get("persist_isolation_forest", True):
+                    save_forest(iso, num_col, artifact_folder)
 
-            iso = IsolationForest(contamination = contamination, random_state= random_state)
-            df['anomaly_flag'] = iso.fit_predict(df[num_col])
+            df['anomaly_flag'] = score_in_chunks(iso, df[num_col].to_numpy(), chunk_size)
             anomalies = (df["anomaly_flag"] == -1).sum()
 
             log_info(f"Anomalies detected: {anomalies} rows")
@@ -196,22 +218,25 @@ def detect_outliers_and_anomalies(df, config):
 # ============================================================
 def convert_and_normalize(df, config):
     try:
+        from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
         norm_method = config["settings"]["normalization"]
         scaler = MinMaxScaler() if norm_method == "minmax" else StandardScaler()
     
-        # --- Date Time ---     
-        if "Date" in df.columns:
+        # --- Date Time (already parsed at read time when listed in dtype_plan) ---
+        if "Date" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["Date"]):
             df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
         
         # --- Numeric Cols ---
         for col in ["Price", "Quantity", "Revenue"]:
-            if col in df.columns:
+            if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
                 df[col] = pd.to_numeric(df[col], errors="coerce")
                 
         log_info("Normalizing numeric columns ...")
         logging.info("Normalizing numeric columns...")
 
-        num_cols = df.select_dtypes(include = ['int64', 'float64', 'int32', 'float32']).columns
+        # anomaly_flag stays -1/1, as in the chunked and fit/apply paths (src.fitting.transform_batch)
+        num_cols = df.select_dtypes(include = ['int64', 'float64', 'int32', 'float32']).columns.drop("anomaly_flag", errors="ignore")
         df[num_cols] = scaler.fit_transform(df[num_cols])       
         log_info(f"Normalization complete using {norm_method}")
         logging.info(f"Normalization complete using {norm_method}")
@@ -226,58 +251,253 @@ def convert_and_normalize(df, config):
 # ============================================================
 # 6.  SAVE OUTPUT AND SUMMARY
 # ============================================================
-def save_result(df, folders, summary):
+def save_result(df, folders, summary, output_config=None):
     try:
         timestamp = pd.Timestamp.now().strftime("%Y-%m-%d_%H.%M.%S")
-        output_path = os.path.join(folders["output"], f"final_cleaned_{timestamp}.csv")
         summary_path = os.path.join(folders["output"], f"final_summary_{timestamp}.txt")
-        df.to_csv(output_path, index =False)
+        written = write_output(df, folders["output"], timestamp, output_config)
+        output_path = written["path"]
 
         with open(summary_path, "w") as file:
             file.write(f"Total rows final: {len(df)}\n")
             file.write(f"Missing values: {summary['missing_values']}\n")
             file.write(f"Duplicates removed: {summary['duplicates_removed']}\n")
+            file.write(f"Duplicates from earlier runs: {summary.get('history_duplicates', 0)}\n")
             file.write(f"Anomalies detected: {summary['anomalies_detected']}\n")
+            file.write(f"Output: {output_path} ({len(written['files'])} files)\n")
+            file.write(f"Bytes written: {written['bytes_written']}\n")
+            file.write(f"Write throughput: {written['write_mb_per_sec']:.2f} MB/s in {written['write_seconds']:.2f}s\n")
             file.write("Normalization: Complete\nPipeline Status: SUCCESS\n")
 
         log_info(f"Saved cleaned data to {output_path}")
         logging.info(f"Saved cleaned data to {output_path}")
+        log_info(f"Wrote {written['bytes_written'] / 1024 ** 2:.2f} MB at {written['write_mb_per_sec']:.2f} MB/s")
+        logging.info(f"Wrote {written['bytes_written'] / 1024 ** 2:.2f} MB at {written['write_mb_per_sec']:.2f} MB/s")
         log_info(f"Saved summary to {summary_path}")
         logging.info(f"Saved summary to {summary_path}")
+        return summary_path
     except Exception as error:
         log_info(f"Error saving results: {error}")
         logging.info(f"Error saving results: {error}")
 
 # ============================================================
-# 6.  MAIN PIPELINE
+# 6.  STAGE LIST AND CACHE KEYS
 # ============================================================
-def main ():
-    config = load_config("config.json")
+def pipeline_stages(config, folders, profiler=None, history=None):
+    settings, params = config["settings"], config["parameters"]
+    outlier_params = {key: value for key, value in params.items()
+                      if key.startswith(("isolation_forest", "quantile", "iqr")) or key in ("random_state", "chunk_size")}
+    outlier_slice = {
+        "enabled": settings["detect_outliers_and_anomalies"],
+        "anomaly_mode": settings.get("anomaly_mode", "fit"),
+        "parameters": outlier_params,
+    }
+    if outlier_slice["anomaly_mode"] == "score_only":
+        outlier_slice["forest"] = file_fingerprints(folders.get("artifacts", "artifacts"), "isolation_forest_*.joblib")
+
+    def duplicates_stage(df):
+        df, duplicates_removed = handle_duplicates(df, config)
+        return df, {"duplicates_removed": int(duplicates_removed)}
+
+    def delivered_stage(df):
+        df, history_removed = filter_delivered(df, history)
+        return df, {"history_duplicates": int(history_removed)}
+
+    stages = [
+        ("load_files", {"data": folders["data"], "dtype_plan": config.get("dtype_plan")}, lambda _: (load_files(config, folders), {})),
+        ("handle_missing", {"enabled": settings["handle_missing"]}, lambda df: (handle_missing(df, config), {})),
+        ("handle_duplicates", {"enabled": settings["handle_duplicates"]}, duplicates_stage),
+        ("detect_outliers_and_anomalies", outlier_slice, lambda df: (detect_outliers_and_anomalies(df, config), {})),
+        ("convert_and_normalize", {"normalization": settings["normalization"]}, lambda df: (convert_and_normalize(df, config), {})),
+    ]
+    if history is not None:
+        # any commit to the history store changes which rows survive, so its files are part of the key
+        stages.insert(1, ("filter_delivered", {"history": file_fingerprints(history.folder, "*.u64")}, delivered_stage))
+    if profiler is not None:
+        stages = [(name, config_slice, profiler.wrap(name, fn)) for name, config_slice, fn in stages]
+    return stages
+
+
+def cache_base_payload(config, folders):
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    sources = [os.path.join(base_dir, "main.py")] + glob.glob(os.path.join(base_dir, "src", "*.py"))
+    return {
+        "inputs": file_fingerprints(folders["data"]),
+        "code_version": code_version(sources),
+    }
+
+# ============================================================
+# 7.  MEMORY BUDGET GUARD
+# ============================================================
+def check_memory_budget(config, folders):
+    budget_mb = float(config["parameters"].get("memory_budget_mb", 0))
+    if budget_mb <= 0 or config["settings"].get("execution_mode", "in_memory") != "in_memory":
+        return
+
+    footprint = estimate_footprint(find_valid_files(folders["data"]), config.get("dtype_plan"))
+    log_footprint(footprint, "Estimated")
+    estimated_mb = footprint.sum() / 1024 ** 2
+    if estimated_mb > budget_mb:
+        log_info(f"Estimated frame size {estimated_mb:.2f} MB exceeds memory budget {budget_mb:.2f} MB, switching to chunked mode")
+        logging.warning(f"Estimated frame size {estimated_mb:.2f} MB exceeds memory budget {budget_mb:.2f} MB, switching to chunked mode")
+        config["settings"]["execution_mode"] = "chunked"
+
+# --- Persist this run's new row fingerprints only once its output is saved ---
+def commit_history(history, summary_path):
+    if history is None or not summary_path:
+        return
+    committed = history.commit()
+    log_info(f"Committed {committed} new row fingerprints to {history.folder}")
+    logging.info(f"Committed {committed} new row fingerprints to {history.folder}")
+
+# ============================================================
+# 8.  CONFIG VALIDATION AND DRY RUN
+#   Neither creates folders, writes logs nor imports sklearn.
+# ============================================================
+CONFIG_CHOICES = {
+    ("settings", "normalization"): ("minmax", "standard"),
+    ("settings", "execution_mode"): ("in_memory", "chunked"),
+    ("settings", "run_mode"): ("fit_transform", "fit", "apply"),
+    ("settings", "anomaly_mode"): ("fit", "score_only"),
+    ("parameters", "quantile_mode"): ("exact", "sketch"),
+    ("output", "format"): ("csv", "parquet", "feather"),
+}
+
+
+def validate_config(config):
+    problems = []
+    for section, keys in (("folders", ("data", "logs", "output")),
+                          ("settings", ("handle_missing", "handle_duplicates", "detect_outliers_and_anomalies", "normalization")),
+                          ("parameters", ("isolation_forest_contamination", "random_state"))):
+        if not isinstance(config.get(section), dict):
+            problems.append(f"missing section '{section}'")
+            continue
+        problems += [f"missing {section}.{key}" for key in keys if key not in config[section]]
+
+    for (section, key), choices in CONFIG_CHOICES.items():
+        value = config.get(section, {}).get(key)
+        if value is not None and value not in choices:
+            problems.append(f"{section}.{key} is '{value}', expected one of {list(choices)}")
+
+    try:
+        contamination = float(config.get("parameters", {}).get("isolation_forest_contamination", 0.02))
+        if not 0 < contamination <= 0.5:
+            problems.append("parameters.isolation_forest_contamination must be in (0, 0.5]")
+    except (TypeError, ValueError):
+        problems.append("parameters.isolation_forest_contamination is not a number")
+    return problems
+
+
+# --- Validate, then list the input files and stages a real run would use ---
+def dry_run(config, list_stages=True):
+    problems = validate_config(config)
+    valid_files = []
+    if not problems and list_stages:
+        try:
+            valid_files = find_valid_files(config["folders"]["data"])
+        except (FileNotFoundError, OSError) as error:
+            problems.append(str(error))
+
+    for problem in problems:
+        print(f"[CONFIG ERROR] {problem}")
+    if problems:
+        return False
+
+    log_info("Config is valid.")
+    if list_stages:
+        settings = config["settings"]
+        log_info(f"{len(valid_files)} input file(s): {', '.join(os.path.basename(path) for path in valid_files)}")
+        log_info(f"Execution mode: {settings.get('execution_mode', 'in_memory')}, run mode: {settings.get('run_mode', 'fit_transform')}")
+        stages = [("filter_delivered", settings.get("cross_run_dedup", False)),
+                  ("handle_missing", settings["handle_missing"]),
+                  ("handle_duplicates", settings["handle_duplicates"]),
+                  ("detect_outliers_and_anomalies", settings["detect_outliers_and_anomalies"]),
+                  ("convert_and_normalize", True)]
+        log_info("Stages: load_files -> " + " -> ".join(name for name, enabled in stages if enabled) + " -> save_result")
+    log_info(f"Module imports took {IMPORT_SECONDS:.3f}s, dry run finished in {time.perf_counter() - IMPORT_START:.3f}s")
+    return True
+
+# ============================================================
+# 9.  MAIN PIPELINE
+# ============================================================
+def main (config_path="config.json"):
+    config = load_config(config_path)
     folders = setup_environment(config)
+    profiler = StageProfiler(cprofile=config["settings"].get("profile", False),
+                             profile_folder=os.path.join(folders["logs"], "profiles"))
 
     try :
-        df = load_files(config, folders)
-        if df.empty:
+        with profiler.stage("memory_budget"):
+            check_memory_budget(config, folders)
+
+        if config["settings"].get("execution_mode", "in_memory") == "chunked":
+            log_info("Running in chunked (two-pass, out-of-core) mode")
+            logging.info("Running in chunked (two-pass, out-of-core) mode")
+            summary_path = run_chunked_pipeline(config, folders, profiler)
+            profiler.write_report(summary_path)
+            log_info("Pipeline completed successfully!")
+            logging.info("Pipeline completed successfully!")
+            return {"summary_path": summary_path, "stages": profiler.records}
+
+        run_mode = config["settings"].get("run_mode", "fit_transform")
+        if run_mode in ("fit", "apply"):
+            df = profiler.wrap("load_files", lambda _: load_files(config, folders))()
+            if df.empty:
+                log_info("No data found in input folder.")
+                logging.info("No data found in input folder.")
+                return
+
+            artifact_folder = folders.get("artifacts", "artifacts")
+            with profiler.stage(f"{run_mode}_statistics", df):
+                if run_mode == "fit":
+                    fitted = fit_statistics(df, config)
+                    save_artifact(fitted, config, artifact_folder)
+                else:
+                    fitted = load_artifact(config, artifact_folder)
+
+            history = open_fingerprint_store(config, folders)
+            df, counters = profiler.wrap("transform_frame", transform_frame)(df, fitted, config, history)
+            with profiler.stage("save_result", df) as record:
+                summary_path = save_result(df, folders, counters, config.get("output"))
+                record["rows_out"] = len(df)
+            commit_history(history, summary_path)
+            profiler.write_report(summary_path)
+            log_info("Pipeline completed successfully!")
+            logging.info("Pipeline completed successfully!")
+            return {"summary_path": summary_path, "stages": profiler.records}
+
+        history = open_fingerprint_store(config, folders)
+        df, meta = run_stages(
+            pipeline_stages(config, folders, profiler, history),
+            cache_base_payload(config, folders),
+            folders.get("cache", "cache"),
+            use_cache=config["settings"].get("use_cache", False),
+        )
+        if df is None or df.empty:
+            if meta.get("history_duplicates"):
+                log_info("Every row was already delivered in an earlier run. Nothing to save.")
+                logging.info("Every row was already delivered in an earlier run. Nothing to save.")
+                return
             log_info("No data found in input folder.")
             logging.info("No data found in input folder.")
             return
-        
-
-        df = handle_missing(df, config)
-        df, duplicates_removed = handle_duplicates(df, config)
-        df = detect_outliers_and_anomalies(df, config)
-        df = convert_and_normalize(df, config)
 
         summary = {
             "missing_values" : df.isna().sum().sum(),
-            "duplicates_removed" : duplicates_removed,
+            "duplicates_removed" : meta.get("duplicates_removed", 0),
+            "history_duplicates" : meta.get("history_duplicates", 0),
             "anomalies_detected" : int((df["anomaly_flag"] == -1).sum() if "anomaly_flag" in df.columns else 0)
         }
 
-        save_result(df, folders, summary)
+        with profiler.stage("save_result", df) as record:
+            summary_path = save_result(df, folders, summary, config.get("output"))
+            record["rows_out"] = len(df)
+        commit_history(history, summary_path)
+        profiler.write_report(summary_path)
 
         log_info("Pipeline completed successfully!")
         logging.info("Pipeline completed successfully!")
+        return {"summary_path": summary_path, "stages": profiler.records}
 
     except Exception as error:
         log_info(f"Error running pipeline: {error}")
@@ -286,4 +506,14 @@ def main ():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Production-ready cleaning pipeline")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--validate-config", action="store_true", help="Check the config and exit")
+    parser.add_argument("--dry-run", action="store_true", help="Check the config and input files, list the stages, and exit")
+    args = parser.parse_args()
+
+    if args.validate_config or args.dry_run:
+        with open(args.config) as file:
+            config = json.load(file)
+        sys.exit(0 if dry_run(config, list_stages=args.dry_run) else 1)
+    main(args.config)
\ No newline at end of file
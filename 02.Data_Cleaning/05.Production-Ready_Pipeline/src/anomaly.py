@@ -0,0 +1,82 @@
+# ============================================================
+# Scalable IsolationForest stage
+#   fit        : subsample rows, fit in parallel (n_jobs), persist the forest
+#   score_only : load the persisted forest and flag anomalies chunk by chunk
+# ============================================================
+import os
+import glob
+import logging
+import numpy as np
+import pandas as pd
+from src.log_info import log_info
+
+
+def _max_samples(value):
+    if value in (None, "", "auto"):
+        return "auto"
+    value = float(value)
+    return value if value <= 1.0 else int(value)
+
+
+# --- Build the forest from config["parameters"] ---
+def build_isolation_forest(params):
+    from sklearn.ensemble import IsolationForest   # lazy: sklearn only loads when the stage runs
+
+    return IsolationForest(
+        contamination=float(params["isolation_forest_contamination"]),
+        random_state=params["random_state"],
+        max_samples=_max_samples(params.get("isolation_forest_max_samples", "auto")),
+        n_estimators=int(params.get("isolation_forest_n_estimators", 100)),
+        n_jobs=params.get("isolation_forest_n_jobs", None),
+    )
+
+
+# --- Fit on a uniform row subsample (fit_sample <= 0 means all rows) ---
+def fit_isolation_forest(values, params):
+    values = np.nan_to_num(np.asarray(values, dtype="float64"))
+    fit_sample = int(params.get("isolation_forest_fit_sample", 0))
+    if 0 < fit_sample < len(values):
+        rng = np.random.default_rng(params["random_state"])
+        values = values[rng.choice(len(values), size=fit_sample, replace=False)]
+    return build_isolation_forest(params).fit(values)
+
+
+# --- Flag anomalies (-1) with decision_function, one chunk at a time ---
+def score_in_chunks(iso, values, chunk_size=100_000):
+    values = np.asarray(values, dtype="float64")
+    flags = np.ones(len(values), dtype=int)
+    for start in range(0, len(values), chunk_size):
+        block = np.nan_to_num(values[start:start + chunk_size])
+        flags[start:start + chunk_size] = np.where(iso.decision_function(block) < 0, -1, 1)
+    return flags
+
+
+# ============================================================
+# PERSISTENCE
+# ============================================================
+def save_forest(iso, feature_cols, artifact_folder):
+    import joblib
+
+    os.makedirs(artifact_folder, exist_ok=True)
+    version = pd.Timestamp.now().strftime("%Y-%m-%d_%H.%M.%S")
+    forest_path = os.path.join(artifact_folder, f"isolation_forest_{version}.joblib")
+    joblib.dump({"created_at": version, "feature_cols": list(feature_cols), "model": iso}, forest_path)
+    log_info(f"Saved IsolationForest to {forest_path}")
+    logging.info(f"Saved IsolationForest to {forest_path}")
+    return forest_path
+
+
+def load_forest(params, artifact_folder):
+    import joblib
+
+    forest_path = params.get("isolation_forest_path")
+    if not forest_path:
+        candidates = sorted(glob.glob(os.path.join(artifact_folder, "isolation_forest_*.joblib")))
+        if not candidates:
+            raise FileNotFoundError(f"No isolation_forest_*.joblib found in {artifact_folder}")
+        forest_path = candidates[-1]
+
+    payload = joblib.load(forest_path)
+    log_info(f"Loaded IsolationForest from {forest_path} (created {payload['created_at']})")
+    logging.info(f"Loaded IsolationForest from {forest_path} (created {payload['created_at']})")
+    return payload["model"], payload["feature_cols"]
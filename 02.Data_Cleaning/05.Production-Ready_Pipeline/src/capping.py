@@ -0,0 +1,63 @@
+# ============================================================
+# Multi-column IQR capping engine
+#   exact  : one np.nanquantile call on the 2-D array, np.clip in place
+#   sketch : mergeable per-column quantile sketches for chunked data
+# ============================================================
+import numpy as np
+from src.sketches import QuantileSketch
+
+
+# --- Sketch size for a target rank error (empirically ~1.7 / k) ---
+def sketch_k_for_error(error):
+    return max(8, int(np.ceil(1.7 / float(error))))
+
+
+# --- Lower/upper bounds for every column from quartiles (arrays, one per column) ---
+def bounds_from_quartiles(q1, q3, factor=1.5):
+    iqr = q3 - q1
+    return q1 - factor * iqr, q3 + factor * iqr
+
+
+def iqr_bounds(values, factor=1.5):
+    q1, q3 = np.nanquantile(values, [0.25, 0.75], axis=0)
+    return bounds_from_quartiles(q1, q3, factor)
+
+
+# --- Clip every column at once; returns (capped frame, lower, upper, outliers per column) ---
+def cap_outliers(df, cols, lower=None, upper=None, factor=1.5):
+    cols = list(cols)
+    values = df[cols].to_numpy(dtype="float64", copy=True)
+    if lower is None or upper is None:
+        lower, upper = iqr_bounds(values, factor)
+    outliers = ((values < lower) | (values > upper)).sum(axis=0)
+    np.clip(values, lower, upper, out=values)
+    df[cols] = values
+    return df, lower, upper, outliers
+
+
+# --- Streaming quartiles for chunked data with a configurable rank-error bound ---
+class StreamingIQR:
+    def __init__(self, cols, error=0.01, seed=42):
+        self.cols = list(cols)
+        k = sketch_k_for_error(error)
+        self.sketches = {col: QuantileSketch(k=k, seed=seed) for col in self.cols}
+
+    def update(self, df):
+        for col in self.cols:
+            if col in df.columns:
+                self.sketches[col].update(df[col].to_numpy(dtype="float64", na_value=np.nan))
+        return self
+
+    def merge(self, other):
+        for col in self.cols:
+            self.sketches[col].merge(other.sketches[col])
+        return self
+
+    def quartiles(self, cols=None):
+        cols = self.cols if cols is None else list(cols)
+        q = np.array([self.sketches[col].quantile([0.25, 0.75]) for col in cols]).reshape(-1, 2)
+        return q[:, 0], q[:, 1]
+
+    def bounds(self, factor=1.5, cols=None):
+        q1, q3 = self.quartiles(cols)
+        return bounds_from_quartiles(q1, q3, factor)
@@ -0,0 +1,261 @@
+# ============================================================
+# Out-of-core two-pass execution mode
+#   Pass 1: stream chunks -> fill values, quantiles, exact min/max and moments, IForest sample
+#           (standard scaling reads the files once more if clipping changes any value)
+#   Pass 2: stream chunks again -> apply transforms -> src.writer.StreamingWriter (config["output"])
+# ============================================================
+import os
+import logging
+import numpy as np
+import pandas as pd
+from src.log_info import log_info
+from src.loader import REQUIRED_COLS, find_valid_files, read_options, coerce_dates
+from src.sketches import FrequentItems, HashIndex, RunningMoments, bottom_k_sample, hash_rows
+from src.capping import StreamingIQR
+from src.anomaly import fit_isolation_forest
+from src.profiling import StageProfiler
+from src.fingerprint_store import open_fingerprint_store
+from src.writer import StreamingWriter
+from src.fitting import transform_batch, new_counters, log_outlier_counts, save_artifact, load_artifact
+
+
+# --- File discovery (header only) ---
+def accepted_files(data_folder):
+    return find_valid_files(data_folder), list(REQUIRED_COLS)
+
+
+def iter_chunks(files, chunk_size, plan=None):
+    # Only the date part of the dtype plan applies to chunks; per-chunk categories would not line up.
+    options = read_options(plan)
+    date_options = {key: options[key] for key in ("parse_dates", "date_format") if key in options}
+    for file_path in files:
+        for chunk in pd.read_csv(file_path, usecols=REQUIRED_COLS, chunksize=chunk_size, **date_options):
+            yield coerce_dates(chunk, plan)
+
+
+# --- Rows of a chunk not seen before (in this chunk or earlier ones); all rows when dedup is off ---
+def distinct_rows(chunk, columns, seen, dedup):
+    if not dedup:
+        return np.ones(len(chunk), dtype=bool)
+    hashes = hash_rows(chunk.reindex(columns=columns))
+    distinct = ~pd.Series(hashes).duplicated().to_numpy() & ~seen.contains(hashes)
+    seen.add(hashes[distinct])
+    return distinct
+
+
+# ============================================================
+# PASS 1 - COLLECT STATISTICS
+# ============================================================
+def collect_statistics(files, columns, config):
+    params = config["parameters"]
+    chunk_size = int(params.get("chunk_size", 100_000))
+    sample_size = int(params.get("sample_size", 100_000))
+    quantile_error = float(params.get("quantile_error", 0.01))
+    rng = np.random.default_rng(params.get("random_state", 42))
+
+    object_cols = set()
+    null_counts = {col: 0 for col in columns}
+    sums = {col: 0.0 for col in columns}
+    counts = {col: 0 for col in columns}
+    mins, maxs = {}, {}
+    moments = {col: RunningMoments() for col in columns}
+    modes = {col: FrequentItems() for col in columns}
+    quantiles = StreamingIQR(columns, error=quantile_error, seed=params.get("random_state", 42))
+    sample = None
+    total_rows = 0
+    # Like the in-memory path, fill values come from all rows, while quartiles, min/max, moments and
+    # the IForest sample are taken after duplicates are dropped.
+    dedup = config["settings"]["handle_duplicates"]
+    seen = HashIndex()
+
+    for chunk in iter_chunks(files, chunk_size, config.get("dtype_plan")):
+        total_rows += len(chunk)
+        distinct = distinct_rows(chunk, columns, seen, dedup)
+
+        for col in columns:
+            if col not in chunk.columns:
+                null_counts[col] += int(distinct.sum())
+                continue
+            series = chunk[col]
+            null_counts[col] += int(series[distinct].isna().sum())
+            if pd.api.types.is_numeric_dtype(series):
+                values = series.dropna()
+                if values.empty:
+                    continue
+                sums[col] += float(values.sum())
+                counts[col] += len(values)
+                values = series[distinct].dropna()
+                if values.empty:
+                    continue
+                mins[col] = min(mins.get(col, np.inf), float(values.min()))
+                maxs[col] = max(maxs.get(col, -np.inf), float(values.max()))
+                quantiles.sketches[col].update(values.to_numpy())
+                moments[col].update(values.to_numpy())
+            else:
+                object_cols.add(col)
+                modes[col].update(series)
+
+        numeric_in_chunk = [col for col in columns if col in chunk.columns and col not in object_cols
+                            and pd.api.types.is_numeric_dtype(chunk[col])]
+        sample = bottom_k_sample(sample, chunk.loc[distinct, numeric_in_chunk].reindex(columns=columns), sample_size, rng)
+
+    numeric_cols = [col for col in columns if col not in object_cols]
+    means = {col: sums[col] / counts[col] if counts[col] else np.nan for col in numeric_cols}
+
+    log_info(f"Pass 1 complete: {total_rows} rows scanned")
+    logging.info(f"Pass 1 complete: {total_rows} rows scanned")
+
+    return {
+        "columns": columns,
+        "numeric_cols": numeric_cols,
+        "object_cols": [col for col in columns if col in object_cols],
+        "total_rows": total_rows,
+        "null_counts": null_counts,
+        "means": means,
+        "modes": {col: modes[col].mode() for col in object_cols},
+        "mins": mins,
+        "maxs": maxs,
+        "moments": {col: moments[col] for col in numeric_cols},
+        "quantiles": quantiles,
+        "sample": sample[numeric_cols] if sample is not None else pd.DataFrame(columns=numeric_cols),
+    }
+
+
+# --- Exact moments of the filled, de-duplicated, clipped values (one extra read of the files) ---
+def clipped_moments(files, stats, fill_values, lower, upper, config):
+    numeric_cols = stats["numeric_cols"]
+    chunk_size = int(config["parameters"].get("chunk_size", 100_000))
+    moments = {col: RunningMoments() for col in numeric_cols}
+    seen = HashIndex()
+    for chunk in iter_chunks(files, chunk_size, config.get("dtype_plan")):
+        distinct = distinct_rows(chunk, stats["columns"], seen, config["settings"]["handle_duplicates"])
+        values = chunk.loc[distinct].reindex(columns=numeric_cols).astype("float64").fillna(fill_values)
+        values = values.clip(lower=lower, upper=upper, axis=1)
+        for col in numeric_cols:
+            moments[col].update(values[col].to_numpy())
+    return moments
+
+
+# --- Derive fill values, IQR bounds, scaler stats and IForest from pass 1 ---
+def fit_from_statistics(stats, config, files=None):
+    settings, params = config["settings"], config["parameters"]
+    numeric_cols = stats["numeric_cols"]
+
+    fill_values = {}
+    if settings["handle_missing"]:
+        fill_values.update({col: stats["means"][col] for col in numeric_cols})
+        fill_values.update({col: stats["modes"][col] for col in stats["object_cols"]})
+        # filled rows take the mean, so they also count towards the quartiles and moments
+        for col in numeric_cols:
+            nulls, mean = stats["null_counts"][col], stats["means"][col]
+            for start in range(0, nulls, 1_000_000):
+                stats["quantiles"].sketches[col].update(np.full(min(1_000_000, nulls - start), mean))
+            if nulls and not np.isnan(mean):
+                stats["moments"][col].update_constant(mean, nulls)
+
+    lower = pd.Series(-np.inf, index=numeric_cols)
+    upper = pd.Series(np.inf, index=numeric_cols)
+    iso = None
+    if settings["detect_outliers_and_anomalies"] and numeric_cols:
+        lower[:], upper[:] = stats["quantiles"].bounds(float(params.get("iqr_factor", 1.5)), numeric_cols)
+
+        sample = stats["sample"].fillna(stats["means"]).fillna(0)
+        sample = sample.clip(lower=lower, upper=upper, axis=1)
+        iso = fit_isolation_forest(sample.to_numpy(), params)
+
+    # Clipping is monotone, so clipped min/max follow directly from raw min/max.
+    if settings["normalization"] == "minmax":
+        offset = pd.Series({col: np.clip(stats["mins"].get(col, 0.0), lower[col], upper[col]) for col in numeric_cols})
+        top = pd.Series({col: np.clip(stats["maxs"].get(col, 0.0), lower[col], upper[col]) for col in numeric_cols})
+        scale = top - offset
+    else:
+        # Standard scaler stats are exact: pass 1 moments, unless clipping changes some value, in
+        # which case the moments of the clipped values take one more read of the files.
+        moments = stats["moments"]
+        clipped = [col for col in numeric_cols
+                   if stats["mins"].get(col, 0.0) < lower[col] or stats["maxs"].get(col, 0.0) > upper[col]]
+        if clipped:
+            log_info(f"Values outside the IQR bounds in {clipped}; rescanning for exact scaler stats")
+            logging.info(f"Values outside the IQR bounds in {clipped}; rescanning for exact scaler stats")
+            moments = clipped_moments(files, stats, fill_values, lower, upper, config)
+        offset = pd.Series({col: moments[col].mean if moments[col].count else 0.0 for col in numeric_cols}, dtype="float64")
+        scale = pd.Series({col: moments[col].std() for col in numeric_cols}, dtype="float64")
+    scale[scale == 0] = 1.0
+
+    return {
+        "columns": stats["columns"],
+        "numeric_cols": numeric_cols,
+        "fill_values": fill_values,
+        "lower": lower,
+        "upper": upper,
+        "iso": iso,
+        "offset": offset,
+        "scale": scale,
+    }
+
+
+# ============================================================
+# PASS 2 - APPLY TRANSFORMS (src.fitting.transform_batch) AND STREAM OUTPUT
+# ============================================================
+def run_chunked_pipeline(config, folders, profiler=None):
+    profiler = profiler or StageProfiler()
+    files, columns = accepted_files(folders["data"])
+    if not files:
+        log_info("No valid CSV files found in data folder.")
+        logging.info("No valid CSV files found in data folder.")
+        return
+
+    run_mode = config["settings"].get("run_mode", "fit_transform")
+    artifact_folder = folders.get("artifacts", "artifacts")
+    if run_mode == "apply":
+        with profiler.stage("load_artifact"):
+            fitted = load_artifact(config, artifact_folder)
+    else:
+        with profiler.stage("pass1_collect_statistics") as record:
+            stats = collect_statistics(files, columns, config)
+            record["rows_out"] = stats["total_rows"]
+        with profiler.stage("fit_from_statistics"):
+            fitted = fit_from_statistics(stats, config, files)
+            if run_mode == "fit":
+                save_artifact(fitted, config, artifact_folder)
+
+    timestamp = pd.Timestamp.now().strftime("%Y-%m-%d_%H.%M.%S")
+    summary_path = os.path.join(folders["output"], f"final_summary_{timestamp}.txt")
+
+    chunk_size = int(config["parameters"].get("chunk_size", 100_000))
+    seen = HashIndex()
+    history = open_fingerprint_store(config, folders)
+    counters = new_counters(fitted["numeric_cols"])
+
+    with profiler.stage("pass2_transform_and_write") as record:
+        writer = StreamingWriter(folders["output"], timestamp, config.get("output"))
+        try:
+            for chunk in iter_chunks(files, chunk_size, config.get("dtype_plan")):
+                writer.write(transform_batch(chunk, fitted, config, seen, counters, history))
+        finally:
+            written = writer.close()
+        record["rows_out"] = counters["rows"]
+    if history is not None:
+        log_info(f"Committed {history.commit()} new row fingerprints to {history.folder}")
+
+    log_outlier_counts(fitted["numeric_cols"], counters)
+
+    with open(summary_path, "w") as file:
+        file.write(f"Total rows final: {counters['rows']}\n")
+        file.write(f"Missing values: {counters['missing_values']}\n")
+        file.write(f"Duplicates removed: {counters['duplicates_removed']}\n")
+        file.write(f"Duplicates from earlier runs: {counters['history_duplicates']}\n")
+        file.write(f"Anomalies detected: {counters['anomalies_detected']}\n")
+        file.write(f"Output: {written['path']} ({len(written['files'])} files)\n")
+        file.write(f"Bytes written: {written['bytes_written']}\n")
+        file.write(f"Write throughput: {written['write_mb_per_sec']:.2f} MB/s in {written['write_seconds']:.2f}s\n")
+        file.write(f"Execution mode: chunked (two-pass), run mode: {run_mode}\n")
+        file.write("Normalization: Complete\nPipeline Status: SUCCESS\n")
+
+    log_info(f"Saved cleaned data to {written['path']}")
+    logging.info(f"Saved cleaned data to {written['path']}")
+    log_info(f"Wrote {written['bytes_written'] / 1024 ** 2:.2f} MB at {written['write_mb_per_sec']:.2f} MB/s")
+    logging.info(f"Wrote {written['bytes_written'] / 1024 ** 2:.2f} MB at {written['write_mb_per_sec']:.2f} MB/s")
+    log_info(f"Saved summary to {summary_path}")
+    logging.info(f"Saved summary to {summary_path}")
+    return summary_path
@@ -0,0 +1,223 @@
+# ============================================================
+# Persistent cross-run duplicate filter
+#   Store of 64-bit row hashes (fingerprint_rows) on disk:
+#     base.u64          sorted, memory-mapped, rewritten only by compaction
+#     segment_*.u64     sorted batches committed by later runs
+#     bloom.bits        optional Bloom filter in front of the lookups
+#   Every file is written to a temp file and swapped in with os.replace,
+#   so a crash never leaves a half-written store behind.
+# ============================================================
+import os
+import glob
+import json
+import time
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from src.sketches import hash_rows
+
+try:
+    import fcntl
+except ImportError:  # Windows: lock with msvcrt instead
+    fcntl = None
+    import msvcrt
+
+BLOCK_SIZE = 1_000_000
+
+
+def _write_atomic(path, array):
+    tmp_path = f"{path}.tmp"
+    np.ascontiguousarray(array).tofile(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _sorted_contains(sorted_hashes, hashes):
+    if len(sorted_hashes) == 0 or len(hashes) == 0:
+        return np.zeros(len(hashes), dtype=bool)
+    idx = np.searchsorted(sorted_hashes, hashes)
+    idx[idx == len(sorted_hashes)] = len(sorted_hashes) - 1
+    return np.asarray(sorted_hashes[idx] == hashes)
+
+
+class FingerprintStore:
+    def __init__(self, folder, use_bloom=True, bits_per_item=10, n_hashes=7, max_segments=8):
+        self.folder = folder
+        self.use_bloom = use_bloom
+        self.bits_per_item = int(bits_per_item)
+        self.n_hashes = int(n_hashes)
+        self.max_segments = int(max_segments)
+        self.pending = []
+        os.makedirs(folder, exist_ok=True)
+        self._load()
+
+    def _path(self, name):
+        return os.path.join(self.folder, name)
+
+    def _load(self):
+        base_path = self._path("base.u64")
+        if os.path.exists(base_path) and os.path.getsize(base_path) > 0:
+            self.base = np.memmap(base_path, dtype=np.uint64, mode="r")
+        else:
+            self.base = np.empty(0, dtype=np.uint64)
+        self.segment_paths = sorted(glob.glob(self._path("segment_*.u64")))
+        self.segments = [np.fromfile(path, dtype=np.uint64) for path in self.segment_paths]
+
+        self.bloom, self.bloom_bits = None, 0
+        meta_path = self._path("store.json")
+        if self.use_bloom and os.path.exists(meta_path) and os.path.exists(self._path("bloom.bits")):
+            with open(meta_path) as file:
+                meta = json.load(file)
+            self.bloom_bits, self.n_hashes = meta["bloom_bits"], meta["bloom_hashes"]
+            self.bloom = np.memmap(self._path("bloom.bits"), dtype=np.uint8, mode="r")
+
+    def __len__(self):
+        return len(self.base) + sum(len(segment) for segment in self.segments)
+
+    @contextmanager
+    def _lock(self):
+        # one writer at a time when several runs share the same history folder
+        with open(self._path(".lock"), "w") as lock_file:
+            if fcntl is None:
+                # locks the first byte of the lock file (retries for ~10 s before raising OSError)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                try:
+                    yield
+                finally:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+                return
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # ============================================================
+    # BLOOM FILTER (double hashing on the two 32-bit halves of each row hash)
+    # ============================================================
+    def _bloom_positions(self, hashes, bloom_bits):
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        steps = np.arange(self.n_hashes, dtype=np.uint64)
+        return (h1[:, None] + steps[None, :] * h2[:, None]) % np.uint64(bloom_bits)
+
+    def _bloom_maybe(self, hashes):
+        maybe = np.ones(len(hashes), dtype=bool)
+        if self.bloom is None:
+            return maybe
+        for start in range(0, len(hashes), BLOCK_SIZE):
+            positions = self._bloom_positions(hashes[start:start + BLOCK_SIZE], self.bloom_bits)
+            bits = (self.bloom[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+            maybe[start:start + BLOCK_SIZE] = bits.all(axis=1)
+        return maybe
+
+    def _set_bloom_bits(self, bloom, bloom_bits, hashes):
+        for start in range(0, len(hashes), BLOCK_SIZE):
+            positions = self._bloom_positions(hashes[start:start + BLOCK_SIZE], bloom_bits).ravel()
+            np.bitwise_or.at(bloom, positions >> np.uint64(3), (1 << (positions & np.uint64(7))).astype(np.uint8))
+
+    def _write_bloom(self, new_hashes):
+        total = len(self) + len(new_hashes)
+        if self.bloom is not None and total * self.bits_per_item <= self.bloom_bits:
+            bloom, bloom_bits = np.array(self.bloom), self.bloom_bits
+            self._set_bloom_bits(bloom, bloom_bits, new_hashes)
+        else:
+            # first build or over capacity: rebuild for twice the current size
+            bloom_bits = max(8 * 1024, 2 * total * self.bits_per_item)
+            bloom = np.zeros((bloom_bits + 7) // 8, dtype=np.uint8)
+            for existing in [self.base] + self.segments + [new_hashes]:
+                self._set_bloom_bits(bloom, bloom_bits, np.asarray(existing))
+
+        _write_atomic(self._path("bloom.bits"), bloom)
+        tmp_meta = self._path("store.json.tmp")
+        with open(tmp_meta, "w") as file:
+            json.dump({"bloom_bits": int(bloom_bits), "bloom_hashes": self.n_hashes}, file)
+        os.replace(tmp_meta, self._path("store.json"))
+
+    # ============================================================
+    # LOOKUP / APPEND
+    # ============================================================
+    def contains(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        found = np.zeros(len(hashes), dtype=bool)
+        maybe = self._bloom_maybe(hashes)
+        # sorted queries walk each sorted file in order (random probes are ~30x slower)
+        order = np.argsort(hashes[maybe], kind="stable")
+        candidates = hashes[maybe][order]
+        hit = np.zeros(len(candidates), dtype=bool)
+        for sorted_hashes in [self.base] + self.segments:
+            hit |= _sorted_contains(sorted_hashes, candidates)
+        unsorted_hit = np.empty(len(candidates), dtype=bool)
+        unsorted_hit[order] = hit
+        found[maybe] = unsorted_hit
+        return found
+
+    # --- Hashes are held until commit(), so a failed run never marks its rows as seen ---
+    def stage(self, hashes):
+        self.pending.append(np.asarray(hashes, dtype=np.uint64))
+
+    def commit(self):
+        if not self.pending:
+            return 0
+        with self._lock():
+            self._load()
+            new_hashes = np.unique(np.concatenate(self.pending))
+            new_hashes = new_hashes[~self.contains(new_hashes)]
+            self.pending = []
+            if len(new_hashes) == 0:
+                return 0
+
+            # Bloom first: extra bits only cost a lookup, missing bits would let duplicates through
+            if self.use_bloom:
+                self._write_bloom(new_hashes)
+            elif os.path.exists(self._path("store.json")):
+                # a writer without the Bloom filter invalidates it instead of leaving it stale
+                os.remove(self._path("store.json"))
+            segment_path = self._path(f"segment_{time.strftime('%Y%m%d%H%M%S')}_{os.getpid()}_{len(self.segments):04d}.u64")
+            _write_atomic(segment_path, new_hashes)
+
+            self._load()
+            if len(self.segments) > self.max_segments:
+                self._compact()
+        return len(new_hashes)
+
+    # --- Merge every segment into base.u64 (LSM-style) ---
+    def _compact(self):
+        merged = np.unique(np.concatenate([np.asarray(self.base)] + self.segments))
+        base_path = self._path("base.u64")
+        self.base = np.empty(0, dtype=np.uint64)   # release the memmap before replacing the file
+        _write_atomic(base_path, merged)
+        for path in self.segment_paths:
+            os.remove(path)
+        self._load()
+
+
+# ============================================================
+# PIPELINE HELPERS
+# ============================================================
+def open_fingerprint_store(config, folders):
+    if not config["settings"].get("cross_run_dedup", False):
+        return None
+    params = config["parameters"]
+    return FingerprintStore(
+        folders.get("history", "history"),
+        use_bloom=params.get("dedup_bloom", True),
+        bits_per_item=params.get("dedup_bloom_bits_per_item", 10),
+        n_hashes=params.get("dedup_bloom_hashes", 7),
+        max_segments=params.get("dedup_max_segments", 8),
+    )
+
+
+# --- Numeric columns hashed as float64, so dtype plans and chunked/in-memory reads give the same fingerprint ---
+def fingerprint_rows(df):
+    numeric = {col: "float64" for col in df.columns
+               if pd.api.types.is_numeric_dtype(df[col]) and df[col].dtype != "float64"}
+    return hash_rows(df.astype(numeric) if numeric else df)
+
+
+# --- Drop rows already delivered in earlier runs; their hashes wait in store.pending until commit() ---
+def filter_seen(df, store):
+    hashes = fingerprint_rows(df)
+    seen = store.contains(hashes)
+    store.stage(hashes[~seen])
+    return df[~seen], int(seen.sum())
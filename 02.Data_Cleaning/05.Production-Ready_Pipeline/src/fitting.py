@@ -0,0 +1,182 @@
+# ============================================================
+# Fit / transform split with persisted cleaning statistics
+#   fit   : learn fill values, IQR bounds, IsolationForest and scaler stats
+#   apply : transform new batches with a saved artifact (no refitting)
+# ============================================================
+import os
+import glob
+import logging
+import numpy as np
+import pandas as pd
+from src.log_info import log_info
+from src.sketches import HashIndex, hash_rows
+from src.capping import iqr_bounds, cap_outliers
+from src.anomaly import fit_isolation_forest, score_in_chunks
+from src.fingerprint_store import filter_seen
+
+ARTIFACT_VERSION = 1
+
+
+# --- Learn every statistic the cleaning stages need from an in-memory frame ---
+def fit_statistics(df, config):
+    settings, params = config["settings"], config["parameters"]
+    columns = list(df.columns)
+    numeric_cols = [col for col in columns if pd.api.types.is_numeric_dtype(df[col])]
+    object_cols = [col for col in columns if col not in numeric_cols]
+
+    fill_values = {}
+    if settings["handle_missing"]:
+        for col in object_cols:
+            mode = df[col].mode(dropna=True)
+            if len(mode):
+                fill_values[col] = mode.iloc[0]
+        fill_values.update(df[numeric_cols].mean().to_dict())
+        df = df.fillna(fill_values)
+
+    if settings["handle_duplicates"]:
+        df = df.drop_duplicates()
+
+    lower = pd.Series(-np.inf, index=numeric_cols)
+    upper = pd.Series(np.inf, index=numeric_cols)
+    iso = None
+    values = df[numeric_cols].to_numpy(dtype="float64")
+    if settings["detect_outliers_and_anomalies"] and numeric_cols:
+        lower[:], upper[:] = iqr_bounds(values, float(params.get("iqr_factor", 1.5)))
+        np.clip(values, lower.to_numpy(), upper.to_numpy(), out=values)
+        iso = fit_isolation_forest(values, params)
+
+    if settings["normalization"] == "minmax":
+        offset = pd.Series(np.nanmin(values, axis=0), index=numeric_cols)
+        scale = pd.Series(np.nanmax(values, axis=0), index=numeric_cols) - offset
+    else:
+        offset = pd.Series(np.nanmean(values, axis=0), index=numeric_cols)
+        scale = pd.Series(np.nanstd(values, axis=0), index=numeric_cols)
+    scale[scale == 0] = 1.0
+
+    return {
+        "columns": columns,
+        "numeric_cols": numeric_cols,
+        "fill_values": fill_values,
+        "lower": lower,
+        "upper": upper,
+        "iso": iso,
+        "offset": offset,
+        "scale": scale,
+    }
+
+
+def new_counters(numeric_cols):
+    return {"rows": 0, "duplicates_removed": 0, "history_duplicates": 0, "anomalies_detected": 0, "missing_values": 0,
+            "outliers": np.zeros(len(numeric_cols), dtype=int)}
+
+
+# --- Apply fitted statistics to one batch/chunk in a single vectorized pass ---
+def transform_batch(df, fitted, config, seen, counters, history=None):
+    settings = config["settings"]
+    numeric_cols = fitted["numeric_cols"]
+
+    df = df.reindex(columns=fitted["columns"])
+    for col in numeric_cols:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+
+    # rows delivered in earlier runs, fingerprinted before any filling
+    if history is not None:
+        df, history_removed = filter_seen(df, history)
+        counters["history_duplicates"] += history_removed
+
+    if settings["handle_missing"]:
+        df = df.fillna(fitted["fill_values"])
+
+    if settings["handle_duplicates"]:
+        hashes = hash_rows(df)
+        keep = ~pd.Series(hashes).duplicated().to_numpy() & ~seen.contains(hashes)
+        seen.add(hashes[keep])
+        counters["duplicates_removed"] += int((~keep).sum())
+        df = df[keep]
+
+    if settings["detect_outliers_and_anomalies"] and numeric_cols:
+        df, _, _, outliers = cap_outliers(df, numeric_cols, fitted["lower"].to_numpy(), fitted["upper"].to_numpy())
+        counters["outliers"] += outliers
+        if len(df) and fitted["iso"] is not None:
+            chunk_size = int(config["parameters"].get("chunk_size", 100_000))
+            flags = score_in_chunks(fitted["iso"], df[numeric_cols].to_numpy(), chunk_size)
+        else:
+            flags = np.ones(len(df), dtype=int)
+        df["anomaly_flag"] = flags
+        counters["anomalies_detected"] += int((flags == -1).sum())
+
+    if "Date" in df.columns:
+        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    df[numeric_cols] = (df[numeric_cols] - fitted["offset"]) / fitted["scale"]
+
+    counters["rows"] += len(df)
+    counters["missing_values"] += int(df.isna().sum().sum())
+    return df
+
+
+# --- Transform a whole in-memory frame (fit or apply mode) ---
+def transform_frame(df, fitted, config, history=None):
+    counters = new_counters(fitted["numeric_cols"])
+    df = transform_batch(df, fitted, config, HashIndex(), counters, history)
+    log_outlier_counts(fitted["numeric_cols"], counters)
+    return df, counters
+
+
+def log_outlier_counts(numeric_cols, counters):
+    for col, n_out in zip(numeric_cols, counters["outliers"]):
+        if n_out > 0:
+            log_info(f"Outliers detected in column {col} : {n_out} rows")
+            logging.info(f"Outliers detected in column {col} : {n_out} rows")
+    log_info(f"Duplicated removed: {counters['duplicates_removed']} rows")
+    log_info(f"Anomalies detected: {counters['anomalies_detected']} rows")
+    logging.info(f"Duplicated removed: {counters['duplicates_removed']} rows")
+    if counters["history_duplicates"]:
+        log_info(f"Rows already delivered in earlier runs: {counters['history_duplicates']}")
+        logging.info(f"Rows already delivered in earlier runs: {counters['history_duplicates']}")
+    logging.info(f"Anomalies detected: {counters['anomalies_detected']} rows")
+
+
+# ============================================================
+# ARTIFACT PERSISTENCE
+# ============================================================
+def save_artifact(fitted, config, artifact_folder):
+    import joblib
+    import sklearn
+
+    os.makedirs(artifact_folder, exist_ok=True)
+    version = pd.Timestamp.now().strftime("%Y-%m-%d_%H.%M.%S")
+    artifact_path = os.path.join(artifact_folder, f"cleaning_stats_{version}.joblib")
+    payload = {
+        "artifact_version": ARTIFACT_VERSION,
+        "created_at": version,
+        "sklearn_version": sklearn.__version__,
+        "pandas_version": pd.__version__,
+        "settings": config["settings"],
+        "fitted": fitted,
+    }
+    joblib.dump(payload, artifact_path)
+    log_info(f"Saved fitted cleaning statistics to {artifact_path}")
+    logging.info(f"Saved fitted cleaning statistics to {artifact_path}")
+    return artifact_path
+
+
+def load_artifact(config, artifact_folder):
+    import joblib
+
+    artifact_path = config["parameters"].get("artifact_path")
+    if not artifact_path:
+        candidates = sorted(glob.glob(os.path.join(artifact_folder, "cleaning_stats_*.joblib")))
+        if not candidates:
+            raise FileNotFoundError(f"No cleaning_stats_*.joblib artifact found in {artifact_folder}")
+        artifact_path = candidates[-1]
+
+    payload = joblib.load(artifact_path)
+    if payload.get("artifact_version") != ARTIFACT_VERSION:
+        raise ValueError(f"Unsupported artifact version {payload.get('artifact_version')} in {artifact_path}")
+    if payload["settings"]["normalization"] != config["settings"]["normalization"]:
+        log_info("Warning: normalization in config differs from the artifact; using the artifact scaler")
+        logging.warning("Normalization in config differs from the artifact; using the artifact scaler")
+
+    log_info(f"Loaded fitted cleaning statistics from {artifact_path} (created {payload['created_at']})")
+    logging.info(f"Loaded fitted cleaning statistics from {artifact_path} (created {payload['created_at']})")
+    return payload["fitted"]
@@ -0,0 +1,134 @@
+# ============================================================
+# Header-prevalidated, parallel CSV loading
+#   dtype plan : config["dtype_plan"] -> categoricals, downcast numerics,
+#                dates parsed once at read time
+#   footprint  : per-column memory estimate from a parsed head sample
+# ============================================================
+import os
+import logging
+from itertools import islice
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from src.log_info import log_info
+
+REQUIRED_COLS = ["Date", "Product", "Price", "Quantity", "Revenue"]
+NUMERIC_COLS = ["Price", "Quantity", "Revenue"]
+DTYPES = {"Date": "object", "Product": "object", "Price": "float64", "Quantity": "float64", "Revenue": "float64"}
+
+
+# --- Read only the header of each CSV and keep the files that have every required column ---
+def find_valid_files(data_folder):
+    all_files = [file for file in os.listdir(data_folder) if file.endswith(".csv")]
+    if not all_files:
+        raise FileNotFoundError("No CSV files found in data folder")
+
+    valid_files = []
+    for file in all_files:
+        file_path = os.path.join(data_folder, file)
+        header = pd.read_csv(file_path, nrows=0).columns
+        missing = [col for col in REQUIRED_COLS if col not in header]
+        if missing:
+            log_info(f"Skipping {file} (missing columns: {missing})")
+            logging.warning(f"Skipping {file} (missing columns: {missing})")
+            continue
+        valid_files.append(file_path)
+    return valid_files
+
+
+# --- dtype plan -> read_csv keyword arguments ---
+#   {"dtypes": {"Product": "category", "Price": "float32"}, "parse_dates": ["Date"], "date_format": "%Y-%m-%d"}
+def read_options(plan=None):
+    plan = plan or {}
+    dates = [col for col in plan.get("parse_dates", []) if col in REQUIRED_COLS]
+    dtypes = {**DTYPES, **plan.get("dtypes", {})}
+    options = {"usecols": REQUIRED_COLS, "dtype": {col: dtype for col, dtype in dtypes.items() if col not in dates}}
+    if dates:
+        options["parse_dates"] = dates
+        options["date_format"] = plan.get("date_format")
+    return options
+
+
+def coerce_dates(df, plan):
+    # rows that do not match the format leave an object column; coerce once here, not downstream
+    plan = plan or {}
+    for col in plan.get("parse_dates", []):
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors="coerce", format=plan.get("date_format"))
+    return df
+
+
+# --- Parse one file with the dtype plan; fall back to coercion if a numeric column has bad values ---
+def read_csv_file(file_path, plan=None, nrows=None):
+    options = read_options(plan)
+    try:
+        df = pd.read_csv(file_path, nrows=nrows, **options)
+    except ValueError:
+        dtypes = options["dtype"]
+        options["dtype"] = {col: dtype for col, dtype in dtypes.items() if col not in NUMERIC_COLS}
+        df = pd.read_csv(file_path, nrows=nrows, **options)
+        for col in NUMERIC_COLS:
+            # integer plans cannot hold the NaNs coercion produces
+            dtype = dtypes.get(col, "float64")
+            dtype = dtype if pd.api.types.is_float_dtype(pd.api.types.pandas_dtype(dtype)) else "float64"
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+    return coerce_dates(df, plan)
+
+
+# --- Parse the accepted files in a worker pool (workers <= 0 means one per CPU core) ---
+#   Inputs smaller than min_parallel_mb in total are read serially: starting the pool costs more than it saves.
+def read_files_parallel(files, workers=0, plan=None, min_parallel_mb=64):
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    workers = min(workers, len(files))
+    if sum(os.path.getsize(file_path) for file_path in files) < min_parallel_mb * 1024 ** 2:
+        workers = 1
+    for file_path in files:
+        log_info(f"Loading {os.path.basename(file_path)}")
+
+    if workers <= 1:
+        return [read_csv_file(file_path, plan) for file_path in files]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(partial(read_csv_file, plan=plan), files))
+
+
+# --- Concatenate per-file frames; union categories first so category columns do not fall back to object ---
+def concat_frames(dataframes):
+    for col in dataframes[0].columns:
+        if all(isinstance(df[col].dtype, pd.CategoricalDtype) for df in dataframes):
+            categories = dataframes[0][col].cat.categories
+            for df in dataframes[1:]:
+                categories = categories.union(df[col].cat.categories)
+            for df in dataframes:
+                df[col] = df[col].cat.set_categories(categories)
+    return pd.concat(dataframes, ignore_index=True)
+
+
+# ============================================================
+# MEMORY FOOTPRINT
+# ============================================================
+def column_footprint(df):
+    return df.memory_usage(deep=True, index=False)
+
+
+# --- Parse the head of every file with the plan and scale bytes/row by the file size ---
+def estimate_footprint(files, plan=None, sample_rows=10_000):
+    footprint = pd.Series(0.0, index=REQUIRED_COLS)
+    for file_path in files:
+        with open(file_path, "rb") as file:
+            header_bytes = len(file.readline())
+            sample_bytes = [len(line) for line in islice(file, sample_rows)]
+        if not sample_bytes:
+            continue
+        sample = read_csv_file(file_path, plan, nrows=len(sample_bytes))
+        rows = (os.path.getsize(file_path) - header_bytes) / (sum(sample_bytes) / len(sample_bytes))
+        footprint += column_footprint(sample).reindex(REQUIRED_COLS, fill_value=0) / max(len(sample), 1) * rows
+    return footprint
+
+
+def log_footprint(footprint, label):
+    for col, size in footprint.items():
+        log_info(f"{label} footprint {col}: {size / 1024 ** 2:.2f} MB")
+        logging.info(f"{label} footprint {col}: {size / 1024 ** 2:.2f} MB")
+    log_info(f"{label} footprint total: {footprint.sum() / 1024 ** 2:.2f} MB")
+    logging.info(f"{label} footprint total: {footprint.sum() / 1024 ** 2:.2f} MB")
@@ -0,0 +1,6 @@
+import logging
+
+
+def log_info(message):
+    print(f"\033[94m[INFO]\033[0m {message}")
+    logging.info(message)
@@ -0,0 +1,132 @@
+# ============================================================
+# Per-stage profiling hooks
+#   wall / CPU time, rows in/out and peak RSS growth for every stage;
+#   optional cProfile dump (.prof + top-N .txt) per stage when settings.profile is true.
+#   The run's timing table is appended to final_summary_<ts>.txt and
+#   saved as final_profile_<ts>.json.
+# ============================================================
+import os
+import io
+import sys
+import json
+import time
+import pstats
+import cProfile
+import logging
+from contextlib import contextmanager
+from functools import wraps
+from src.log_info import log_info
+
+try:
+    import resource
+except ImportError:  # not available on Windows; peak RSS is reported as unavailable
+    resource = None
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def _mb(value):
+    return "n/a" if value is None else f"{value:.1f}"
+
+
+def _rows(value):
+    # stage results are frames or (frame, extra) tuples; anything else has no row count
+    if isinstance(value, tuple) and value:
+        value = value[0]
+    shape = getattr(value, "shape", None)
+    return int(shape[0]) if shape else None
+
+
+class StageProfiler:
+    def __init__(self, cprofile=False, profile_folder="logs/profiles", top_n=15):
+        self.cprofile = cprofile
+        self.profile_folder = profile_folder
+        self.top_n = top_n
+        self.records = []
+        self.run_id = time.strftime("%Y-%m-%d_%H.%M.%S")
+
+    # --- with profiler.stage("load", df) as record: ... record["rows_out"] = len(df) ---
+    @contextmanager
+    def stage(self, name, df_in=None):
+        record = {"stage": name, "rows_in": _rows(df_in), "rows_out": None}
+        profile = cProfile.Profile() if self.cprofile else None
+        rss_before = peak_rss_mb()
+        wall, cpu = time.perf_counter(), time.process_time()
+        if profile:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile:
+                profile.disable()
+            record["wall_seconds"] = round(time.perf_counter() - wall, 4)
+            record["cpu_seconds"] = round(time.process_time() - cpu, 4)
+            record["peak_rss_mb"] = peak_rss_mb()
+            record["peak_rss_delta_mb"] = (None if rss_before is None
+                                           else round(max(0.0, record["peak_rss_mb"] - rss_before), 1))
+            if profile:
+                record["profile_path"] = self._dump(name, profile)
+            self.records.append(record)
+
+            log_info(f"Stage {name}: {record['wall_seconds']:.3f}s wall, {record['cpu_seconds']:.3f}s cpu, "
+                     f"rows {record['rows_in']} -> {record['rows_out']}, peak RSS +{_mb(record['peak_rss_delta_mb'])} MB")
+            logging.info(f"Stage {name}: {record['wall_seconds']:.3f}s wall, {record['cpu_seconds']:.3f}s cpu, "
+                         f"rows {record['rows_in']} -> {record['rows_out']}, peak RSS +{_mb(record['peak_rss_delta_mb'])} MB")
+
+    # --- Decorator form for stage functions fn(df, ...) ---
+    def wrap(self, name, fn):
+        @wraps(fn)
+        def wrapper(df=None, *args, **kwargs):
+            with self.stage(name, df) as record:
+                result = fn(df, *args, **kwargs)
+                record["rows_out"] = _rows(result)
+            return result
+        return wrapper
+
+    def _dump(self, name, profile):
+        os.makedirs(self.profile_folder, exist_ok=True)
+        profile_path = os.path.join(self.profile_folder, f"{self.run_id}_{name}.prof")
+        profile.dump_stats(profile_path)
+
+        # readable top-N summary next to the binary dump (open the .prof with snakeviz/pstats for more)
+        text = io.StringIO()
+        pstats.Stats(profile, stream=text).sort_stats("cumulative").print_stats(self.top_n)
+        with open(profile_path.replace(".prof", ".txt"), "w") as file:
+            file.write(text.getvalue())
+        return profile_path
+
+    # ============================================================
+    # REPORTING
+    # ============================================================
+    def table(self):
+        header = f"{'Stage':<30} {'Wall s':>9} {'CPU s':>9} {'Rows in':>11} {'Rows out':>11} {'Peak RSS +MB':>13}"
+        lines = [header, "-" * len(header)]
+        for record in self.records:
+            lines.append(f"{record['stage']:<30} {record['wall_seconds']:>9.3f} {record['cpu_seconds']:>9.3f} "
+                         f"{str(record['rows_in']):>11} {str(record['rows_out']):>11} {_mb(record['peak_rss_delta_mb']):>13}")
+        total = sum(record["wall_seconds"] for record in self.records)
+        lines.append(f"{'Total':<30} {total:>9.3f}")
+        return "\n".join(lines)
+
+    # --- Append the table to final_summary_<ts>.txt and write final_profile_<ts>.json next to it ---
+    def write_report(self, summary_path):
+        if not summary_path:
+            return None
+        with open(summary_path, "a") as file:
+            file.write("\nStage timings:\n")
+            file.write(self.table() + "\n")
+
+        folder, name = os.path.split(summary_path)
+        json_path = os.path.join(folder, name.replace("final_summary", "final_profile").rsplit(".", 1)[0] + ".json")
+        with open(json_path, "w") as file:
+            json.dump({"run_id": self.run_id, "peak_rss_mb": peak_rss_mb(), "stages": self.records},
+                      file, indent=2)
+        log_info(f"Saved stage timings to {json_path}")
+        logging.info(f"Saved stage timings to {json_path}")
+        return json_path
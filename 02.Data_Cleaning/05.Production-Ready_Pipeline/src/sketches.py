@@ -0,0 +1,178 @@
+# ============================================================
+# Mergeable sketches for out-of-core statistics
+# ============================================================
+import numpy as np
+import pandas as pd
+
+
+# --- Quantile sketch (KLL-style compactors) ---
+class QuantileSketch:
+    # Approximate quantiles in bounded memory; rank error is roughly 1.7 / k.
+    def __init__(self, k=200, seed=42):
+        self.k = int(k)
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                buffer = np.sort(self.levels[level])
+                # keep one item behind when the buffer is odd so weights stay exact
+                leftover = buffer[-1:] if len(buffer) % 2 else buffer[:0]
+                buffer = buffer[: len(buffer) - len(leftover)]
+                offset = int(self._rng.integers(2))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], buffer[offset::2]])
+                self.levels[level] = leftover
+            level += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.count += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def weighted_items(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items_), 2.0 ** level) for level, items_ in enumerate(self.levels)])
+        order = np.argsort(items, kind="mergesort")
+        return items[order], weights[order]
+
+    def quantile(self, q):
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        items, weights = self.weighted_items()
+        # same "linear" convention as pandas: position = q * (n - 1)
+        positions = np.cumsum(weights) - weights / 2
+        positions = (positions - positions[0]) / max(positions[-1] - positions[0], 1e-12)
+        return np.interp(q, positions, items)
+
+
+# --- Frequent items (Misra-Gries) for mode ---
+class FrequentItems:
+    # Exact counts while distinct values <= capacity, heavy-hitter summary beyond that.
+    def __init__(self, capacity=100_000):
+        self.capacity = int(capacity)
+        self.counts = {}
+
+    def _prune(self):
+        if len(self.counts) <= self.capacity:
+            return
+        threshold = sorted(self.counts.values(), reverse=True)[self.capacity]
+        self.counts = {value: count - threshold for value, count in self.counts.items() if count > threshold}
+
+    def update(self, series):
+        for value, count in series.dropna().value_counts().items():
+            self.counts[value] = self.counts.get(value, 0) + int(count)
+        self._prune()
+        return self
+
+    def merge(self, other):
+        for value, count in other.counts.items():
+            self.counts[value] = self.counts.get(value, 0) + count
+        self._prune()
+        return self
+
+    def mode(self):
+        if not self.counts:
+            return None
+        top = max(self.counts.values())
+        # pandas .mode()[0] returns the smallest value among ties
+        return min(value for value, count in self.counts.items() if count == top)
+
+
+# --- Exact running mean / variance (Chan et al. merge of count, mean, M2) ---
+class RunningMoments:
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def _merge(self, count, mean, m2):
+        if count == 0:
+            return self
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        return self
+
+    def update(self, values):
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        mean = float(values.mean())
+        return self._merge(values.size, mean, float(((values - mean) ** 2).sum()))
+
+    def update_constant(self, value, count):
+        return self._merge(int(count), float(value), 0.0)
+
+    def merge(self, other):
+        return self._merge(other.count, other.mean, other.m2)
+
+    def std(self):
+        # population std (ddof=0), as StandardScaler and np.nanstd
+        return float(np.sqrt(self.m2 / self.count)) if self.count else 0.0
+
+
+# --- Set of 64-bit row hashes (sorted segments, merged like an LSM tree) ---
+class HashIndex:
+    def __init__(self):
+        self.segments = []
+
+    def __len__(self):
+        return sum(len(segment) for segment in self.segments)
+
+    def contains(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        found = np.zeros(len(hashes), dtype=bool)
+        for segment in self.segments:
+            if len(segment) == 0:
+                continue
+            idx = np.searchsorted(segment, hashes)
+            idx[idx == len(segment)] = len(segment) - 1
+            found |= segment[idx] == hashes
+        return found
+
+    def add(self, hashes):
+        self.segments.append(np.unique(np.asarray(hashes, dtype=np.uint64)))
+        while len(self.segments) > 1 and len(self.segments[-1]) >= len(self.segments[-2]):
+            newest = self.segments.pop()
+            self.segments[-1] = np.union1d(self.segments[-1], newest)
+        return self
+
+
+# --- Row hashing and bottom-k sampling ---
+def hash_rows(df):
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def bottom_k_sample(sample, chunk, size, rng):
+    # Uniform sample without replacement: keep the rows with the smallest random keys.
+    chunk = chunk.assign(_sample_key=rng.random(len(chunk)))
+    combined = chunk if sample is None else pd.concat([sample, chunk], ignore_index=True)
+    if len(combined) > size:
+        combined = combined.nsmallest(size, "_sample_key").reset_index(drop=True)
+    return combined
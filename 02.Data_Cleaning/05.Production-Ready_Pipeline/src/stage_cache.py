@@ -0,0 +1,112 @@
+# ============================================================
+# Stage-level result cache
+#   key(stage) = hash(key(previous stage), stage name, stage config slice, code version)
+#   key(load)  = hash(input file fingerprints, load config slice, code version)
+# Reruns resume from the deepest stage whose cached output still matches its key.
+# Opt-in (settings.use_cache, off by default); each stage keeps only its latest entry.
+# ============================================================
+import os
+import json
+import glob
+import hashlib
+import logging
+import pandas as pd
+from src.log_info import log_info
+
+
+def _digest(payload):
+    text = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+# --- (name, size, mtime) of every input file ---
+def file_fingerprints(data_folder, pattern="*.csv"):
+    fingerprints = []
+    for file_path in sorted(glob.glob(os.path.join(data_folder, pattern))):
+        stat = os.stat(file_path)
+        fingerprints.append([os.path.basename(file_path), stat.st_size, stat.st_mtime_ns])
+    return fingerprints
+
+
+# --- Hash of the pipeline source files, so code changes invalidate the cache ---
+def code_version(paths):
+    sha = hashlib.sha256()
+    for path in sorted(paths):
+        with open(path, "rb") as file:
+            sha.update(file.read())
+    return sha.hexdigest()[:16]
+
+
+def stage_keys(base_payload, stages):
+    keys, key = [], _digest(base_payload)
+    for name, config_slice, _ in stages:
+        key = _digest({"parent": key, "stage": name, "config": config_slice})
+        keys.append(key)
+    return keys
+
+
+def _paths(cache_folder, index, name, key):
+    stem = os.path.join(cache_folder, f"{index:02d}_{name}_{key}")
+    return stem + ".parquet", stem + ".pkl", stem + ".json"
+
+
+def save_stage(cache_folder, index, name, key, df, meta):
+    os.makedirs(cache_folder, exist_ok=True)
+    parquet_path, pickle_path, meta_path = _paths(cache_folder, index, name, key)
+
+    # keep one entry per stage: drop outputs cached under older keys
+    for old_path in glob.glob(os.path.join(cache_folder, f"{index:02d}_{name}_*")):
+        if key not in os.path.basename(old_path):
+            os.remove(old_path)
+
+    try:
+        df.to_parquet(parquet_path, index=False)
+    except Exception as error:
+        # pyarrow/fastparquet missing or a column parquet cannot store
+        logging.info(f"Parquet cache unavailable for {name} ({error}); using pickle")
+        df.to_pickle(pickle_path)
+    with open(meta_path, "w") as file:
+        json.dump(meta, file, default=str)
+
+
+def load_stage(cache_folder, index, name, key):
+    parquet_path, pickle_path, meta_path = _paths(cache_folder, index, name, key)
+    if not os.path.exists(meta_path):
+        return None
+    if os.path.exists(parquet_path):
+        df = pd.read_parquet(parquet_path)
+    elif os.path.exists(pickle_path):
+        df = pd.read_pickle(pickle_path)
+    else:
+        return None
+    with open(meta_path) as file:
+        return df, json.load(file)
+
+
+# --- Run stages in order, resuming from the deepest valid cached stage ---
+#   stages: list of (name, config_slice, fn) where fn(df) -> (df, meta_update);
+#   the first stage is the loader and ignores its input.
+def run_stages(stages, base_payload, cache_folder, use_cache=False):
+    keys = stage_keys(base_payload, stages)
+    df, meta, start = None, {}, 0
+
+    if use_cache:
+        for index in reversed(range(len(stages))):
+            cached = load_stage(cache_folder, index, stages[index][0], keys[index])
+            if cached is not None:
+                df, meta = cached
+                start = index + 1
+                log_info(f"Resuming from cached stage '{stages[index][0]}' ({keys[index]})")
+                logging.info(f"Resuming from cached stage '{stages[index][0]}' ({keys[index]})")
+                break
+
+    for index in range(start, len(stages)):
+        name, _, fn = stages[index]
+        df, meta_update = fn(df)
+        meta.update(meta_update)
+        if df is None or (isinstance(df, pd.DataFrame) and df.empty):
+            return df, meta
+        if use_cache:
+            save_stage(cache_folder, index, name, keys[index], df, meta)
+
+    return df, meta
@@ -0,0 +1,70 @@
+# ============================================================
+# Seeded synthetic sales generator (Date, Product, Price, Quantity, Revenue)
+#   Rows are produced block by block, so 1e8 rows never sit in memory at once.
+#   Every block has its own seed derived from (seed, block index): the same
+#   arguments always give the same files.
+# ============================================================
+import os
+import numpy as np
+import pandas as pd
+
+PRODUCTS = {"Shirt": 125000, "Jeans": 250000, "Hat": 80000, "Shoes": 400000, "Jacket": 550000}
+
+
+# --- One block of clean rows with outliers, missing cells and duplicates injected at the given rates ---
+def generate_block(rows, rng, start_date="2024-01-01", days=365,
+                   missing_rate=0.01, duplicate_rate=0.01, outlier_rate=0.005):
+    unique_rows = max(1, int(round(rows * (1 - duplicate_rate))))
+    names = np.array(list(PRODUCTS))
+    base_prices = np.array(list(PRODUCTS.values()), dtype="float64")
+
+    product_idx = rng.integers(0, len(names), unique_rows)
+    # cent-level prices keep accidental duplicates rare, so duplicate_rate controls them
+    price = np.round(base_prices[product_idx] * rng.normal(1.0, 0.08, unique_rows), 2)
+    quantity = rng.integers(1, 13, unique_rows).astype("float64")
+    dates = pd.Timestamp(start_date) + pd.to_timedelta(rng.integers(0, days, unique_rows), unit="D")
+
+    df = pd.DataFrame({
+        "Date": dates.strftime("%Y-%m-%d"),
+        "Product": names[product_idx],
+        "Price": price,
+        "Quantity": quantity,
+        "Revenue": np.round(price * quantity, 2),
+    })
+
+    # outliers: numeric cells scaled far outside the normal range
+    for col in ["Price", "Quantity", "Revenue"]:
+        mask = rng.random(unique_rows) < outlier_rate
+        df.loc[mask, col] = df.loc[mask, col] * rng.uniform(20, 100, int(mask.sum()))
+
+    # missing: blank cells in every column
+    for col in df.columns:
+        mask = rng.random(unique_rows) < missing_rate
+        df.loc[mask, col] = None
+
+    # duplicates: exact copies of random rows, taken after injection so they stay exact
+    extra = rows - unique_rows
+    if extra > 0:
+        df = pd.concat([df, df.iloc[rng.integers(0, unique_rows, extra)]], ignore_index=True)
+        df = df.iloc[rng.permutation(len(df))].reset_index(drop=True)
+    return df
+
+
+# --- Write `rows` rows across `files` CSV files, `block_rows` rows at a time ---
+def write_sales_files(output_folder, rows, files=1, seed=42, block_rows=1_000_000, prefix="sales_synthetic", **rates):
+    os.makedirs(output_folder, exist_ok=True)
+    paths = []
+    per_file = [rows // files + (1 if index < rows % files else 0) for index in range(files)]
+
+    block_index = 0
+    for file_index, file_rows in enumerate(per_file):
+        path = os.path.join(output_folder, f"{prefix}_{file_index:03d}.csv")
+        write_header = True
+        for start in range(0, file_rows, block_rows):
+            rng = np.random.default_rng([seed, block_index])
+            block = generate_block(min(block_rows, file_rows - start), rng, **rates)
+            block.to_csv(path, mode="w" if write_header else "a", header=write_header, index=False)
+            write_header = False
+            block_index += 1
+        paths.append(path)
+    return paths
@@ -0,0 +1,211 @@
+# ============================================================
+# Output writer
+#   format      : csv | parquet | feather (config["output"]["format"])
+#   compression : gzip/bz2/xz/zstd for csv, snappy/zstd/gzip for parquet, zstd/lz4 for feather
+#   partition   : Hive-style folders (<col>_<freq>=<key>) written in parallel
+#   StreamingWriter writes the same layouts chunk by chunk for the chunked mode.
+# ============================================================
+import io
+import os
+import bz2
+import gzip
+import lzma
+import time
+import zipfile
+from contextlib import ExitStack, contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+CSV_EXTENSIONS = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz", "zstd": ".zst", "zip": ".zip"}
+DATE_FREQS = {"year": "Y", "month": "M", "day": "D"}
+DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def output_extension(output_config):
+    file_format = output_config.get("format", "csv")
+    if file_format == "csv":
+        return ".csv" + CSV_EXTENSIONS.get(output_config.get("compression") or "", "")
+    return "." + file_format
+
+
+# --- Write one frame to one file; returns bytes on disk ---
+def write_frame(df, path, output_config):
+    file_format = output_config.get("format", "csv")
+    compression = output_config.get("compression") or None
+
+    if file_format == "parquet":
+        df.to_parquet(path, index=False, compression=compression)
+    elif file_format == "feather":
+        df.reset_index(drop=True).to_feather(path, compression=compression or "uncompressed")
+    elif file_format == "csv":
+        df.to_csv(path, index=False, compression=compression)
+    else:
+        raise ValueError(f"Invalid output format: {file_format}")
+    return os.path.getsize(path)
+
+
+# --- Partition keys: date periods for year/month/day (integer-backed, no per-row strftime), raw values otherwise ---
+#   freq defaults to "month" for datetime columns and "value" for anything else
+def partition_keys(df, partition_by, freq=None):
+    freq = freq or ("month" if pd.api.types.is_datetime64_any_dtype(df[partition_by]) else "value")
+    if freq in DATE_FREQS:
+        dates = df[partition_by]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors="coerce")
+        return f"{partition_by}_{freq}", dates.dt.to_period(DATE_FREQS[freq])
+    return partition_by, df[partition_by]
+
+
+# --- One (part frame, file path) job per partition key; raw-value partition columns live in the folder name ---
+def partition_jobs(df, output_path, output_config, part_name="part-0"):
+    extension = output_extension(output_config)
+    partition_by = output_config["partition_by"]
+    name, keys = partition_keys(df, partition_by, output_config.get("partition_freq"))
+
+    jobs = []
+    for key, part in df.groupby(keys, sort=True, dropna=False, observed=True):
+        key = DEFAULT_PARTITION if pd.isna(key) else key
+        if name == partition_by:
+            # Hive convention: a raw-value partition column lives only in the folder name
+            part = part.drop(columns=partition_by)
+        folder = os.path.join(output_path, f"{name}={key}")
+        os.makedirs(folder, exist_ok=True)
+        jobs.append((part, os.path.join(folder, f"{part_name}{extension}")))
+    return jobs
+
+
+# --- pyarrow and the compressors release the GIL, so threads write partitions concurrently ---
+def write_jobs(jobs, output_config):
+    if not jobs:
+        return []
+    workers = int(output_config.get("write_workers", 0)) or (os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as pool:
+        return list(pool.map(lambda job: write_frame(job[0], job[1], output_config), jobs))
+
+
+def write_stats(output_path, files, bytes_written, seconds):
+    return {
+        "path": output_path,
+        "files": files,
+        "bytes_written": bytes_written,
+        "write_seconds": seconds,
+        "write_mb_per_sec": bytes_written / 1024 ** 2 / seconds if seconds > 0 else 0.0,
+    }
+
+
+# --- Write the cleaned frame (single file or partitioned folder) and time it ---
+def write_output(df, output_folder, timestamp, output_config=None):
+    output_config = output_config or {}
+    extension = output_extension(output_config)
+    start = time.perf_counter()
+
+    if not output_config.get("partition_by"):
+        output_path = os.path.join(output_folder, f"final_cleaned_{timestamp}{extension}")
+        files = [output_path]
+        bytes_written = write_frame(df, output_path, output_config)
+    else:
+        output_path = os.path.join(output_folder, f"final_cleaned_{timestamp}")
+        jobs = partition_jobs(df, output_path, output_config)
+        bytes_written = sum(write_jobs(jobs, output_config))
+        files = [path for _, path in jobs]
+
+    return write_stats(output_path, files, bytes_written, time.perf_counter() - start)
+
+
+# ============================================================
+# Streaming output for chunked mode
+#   csv      : one text stream per file (a single gzip/bz2/xz/zstd/zip stream), header once
+#   parquet  : one row group per chunk
+#   feather  : one record batch per chunk in a single Arrow IPC file
+#   partition: part-<chunk>.<ext> in every Hive folder the chunk touches
+# ============================================================
+@contextmanager
+def _zip_text_stream(path):
+    # same archive layout as pandas: one member named after the file without .zip
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        with archive.open(os.path.basename(path)[:-len(".zip")], "w", force_zip64=True) as member:
+            with io.TextIOWrapper(member, newline="") as stream:
+                yield stream
+
+
+def open_csv_stream(path, compression=None):
+    if compression == "gzip":
+        return gzip.open(path, "wt", newline="")
+    if compression == "bz2":
+        return bz2.open(path, "wt", newline="")
+    if compression == "xz":
+        return lzma.open(path, "wt", newline="")
+    if compression == "zstd":
+        import zstandard
+        return zstandard.open(path, "wt", newline="")
+    if compression == "zip":
+        return _zip_text_stream(path)
+    if compression:
+        raise ValueError(f"Invalid csv compression: {compression}")
+    return open(path, "w", newline="")
+
+
+class StreamingWriter:
+    def __init__(self, output_folder, timestamp, output_config=None):
+        self.output_config = output_config or {}
+        self.file_format = self.output_config.get("format", "csv")
+        self.compression = self.output_config.get("compression") or None
+        self.partitioned = bool(self.output_config.get("partition_by"))
+        if self.file_format not in ("csv", "parquet", "feather"):
+            raise ValueError(f"Invalid output format: {self.file_format}")
+
+        if self.partitioned:
+            self.path = os.path.join(output_folder, f"final_cleaned_{timestamp}")
+            self.files = []
+        else:
+            self.path = os.path.join(output_folder, f"final_cleaned_{timestamp}{output_extension(self.output_config)}")
+            self.files = [self.path]
+        self.bytes_written = 0
+        self.seconds = 0.0
+        self.chunks = 0
+        self._stack = ExitStack()
+        self._stream = None
+        self._schema = None
+
+    def write(self, df):
+        start = time.perf_counter()
+        if self.partitioned:
+            jobs = partition_jobs(df, self.path, self.output_config, f"part-{self.chunks}")
+            self.bytes_written += sum(write_jobs(jobs, self.output_config))
+            self.files += [path for _, path in jobs]
+        elif self.file_format == "csv":
+            if self._stream is None:
+                self._stream = self._stack.enter_context(open_csv_stream(self.path, self.compression))
+            df.to_csv(self._stream, index=False, header=self.chunks == 0)
+        else:
+            self._write_arrow(df)
+        self.chunks += 1
+        self.seconds += time.perf_counter() - start
+
+    def _write_arrow(self, df):
+        import pyarrow as pa
+
+        if self._stream is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self._schema = table.schema
+            if self.file_format == "parquet":
+                import pyarrow.parquet as pq
+                self._stream = pq.ParquetWriter(self.path, self._schema, compression=self.compression or "none")
+            else:
+                import pyarrow.ipc as ipc
+                options = ipc.IpcWriteOptions(compression=None if self.compression in (None, "uncompressed") else self.compression)
+                self._stream = ipc.new_file(self.path, self._schema, options=options)
+            self._stack.callback(self._stream.close)
+        else:
+            # later chunks follow the first chunk's schema (e.g. a column that is all-null in this chunk)
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        self._stream.write_table(table)
+
+    # --- Flush and close the output; returns the same fields as write_output ---
+    def close(self):
+        start = time.perf_counter()
+        self._stack.close()
+        self.seconds += time.perf_counter() - start
+        if not self.partitioned:
+            self.bytes_written = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return write_stats(self.path, self.files, self.bytes_written, self.seconds)
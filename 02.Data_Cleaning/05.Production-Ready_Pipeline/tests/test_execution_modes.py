@@ -0,0 +1,89 @@
+# In-memory, chunked and fit/apply runs of the same input must produce the same cleaned output.
+import copy
+import json
+import shutil
+import sys
+from pathlib import Path
+import pandas as pd
+import pytest
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_DIR))
+
+import main  # noqa: E402
+
+
+def read_output(path):
+    # single csv(.gz)/parquet/feather file, or a folder of Hive partitions
+    if path.is_dir() or path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    if path.suffix == ".feather":
+        return pd.read_feather(path)
+    return pd.read_csv(path)
+
+
+def run_mode(tmp_path, name, execution_mode, run_mode="fit_transform", normalization="minmax", output=None):
+    config = copy.deepcopy(json.loads((PROJECT_DIR / "config.json").read_text()))
+    config["folders"] = {key: str(tmp_path / f"{key}_{name}") for key in config["folders"]}
+    config["folders"]["data"] = str(tmp_path / "data")
+    config["settings"].update(execution_mode=execution_mode, run_mode=run_mode, use_cache=False, profile=False,
+                              normalization=normalization)
+    if output is not None:
+        config["output"].update(output)
+    config_path = tmp_path / f"config_{name}.json"
+    config_path.write_text(json.dumps(config))
+
+    result = main.main(str(config_path))
+    assert result and result["summary_path"]
+    assert "Bytes written" in Path(result["summary_path"]).read_text()
+    return read_output(sorted(Path(config["folders"]["output"]).glob("final_cleaned_*"))[-1])
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    shutil.copytree(PROJECT_DIR / "data", tmp_path / "data")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.parametrize("name, execution_mode, run, normalization", [
+    ("chunked", "chunked", "fit_transform", "minmax"),
+    ("fit", "in_memory", "fit", "minmax"),
+    ("chunked_standard", "chunked", "fit_transform", "standard"),
+])
+def test_modes_match_in_memory(workdir, name, execution_mode, run, normalization):
+    expected = run_mode(workdir, f"in_memory_{normalization}", "in_memory", normalization=normalization)
+    actual = run_mode(workdir, name, execution_mode, run, normalization)
+
+    # anomaly_flag keeps its -1/1 meaning in every mode (never scaled)
+    assert set(expected["anomaly_flag"].unique()) <= {-1, 1}
+    assert expected["anomaly_flag"].tolist() == actual["anomaly_flag"].tolist()
+    # float32 dtype plan (in-memory) vs float64 chunks: compare within float32 precision
+    pd.testing.assert_frame_equal(expected, actual, check_dtype=False, rtol=1e-5, atol=1e-6)
+
+
+def sorted_rows(df, columns):
+    df = df.reindex(columns=columns)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(str)
+    return df.sort_values(list(columns)).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("name, output, pattern", [
+    ("csv_gzip", {"format": "csv", "compression": "gzip"}, "final_cleaned_*.csv.gz"),
+    ("parquet_partitioned", {"format": "parquet", "compression": "snappy", "partition_by": "Product"},
+     "final_cleaned_*/Product=*/part-*.parquet"),
+    ("feather_lz4", {"format": "feather", "compression": "lz4"}, "final_cleaned_*.feather"),
+])
+def test_chunked_honours_output_config(workdir, name, output, pattern):
+    expected = run_mode(workdir, f"in_memory_{name}", "in_memory", output=output)
+    actual = run_mode(workdir, f"chunked_{name}", "chunked", output=output)
+
+    assert list((workdir / f"output_chunked_{name}").glob(pattern))
+    if output["compression"] == "gzip":
+        output_file = next((workdir / f"output_chunked_{name}").glob(pattern))
+        assert output_file.read_bytes()[:2] == b"\x1f\x8b"
+    # partitions come back in folder order, so compare sorted rows
+    pd.testing.assert_frame_equal(sorted_rows(expected, expected.columns), sorted_rows(actual, expected.columns),
+                                  check_dtype=False, rtol=1e-5, atol=1e-6)
@@ -3,11 +3,13 @@
 # Author: Arul
 # ============================================================
 import json
+import hashlib
 from pathlib import Path
 from src.data_loader import load_data
 from src.utils import setup_logging
 from src.data_cleaning import clean_data, detect_outliers_and_anomalies, convert_and_normalize
 from src.feature_engineering import create_features
+from src.geo_features import add_geo_features
 from src.analysis import generate_report
 
 def main():
@@ -20,7 +22,7 @@ def main():
     logger.info("==== Pipeline Initialized ====")
 
     # 3) Load
-    df = load_data(config["raw_data_path"], config["merge_key"])
+    df = load_data(config["raw_data_path"], config["merge_key"], config.get("join_mode", "merge"))
     logger.info(f"Data loaded: {df.shape}")
 
     # 4) Clean
@@ -32,9 +34,15 @@ def main():
     logger.info("Outlier & anomaly handling complete")
 
     # 6) Feature engineering (sebelum normalisasi)
-    df = create_features(df)
+    df = create_features(df, config.get("features"))
     logger.info("Feature engineering complete")
 
+    # 6b) Geo features per store (nearest competitor, density, city cluster)
+    geo_config = config.get("geo_features", {})
+    if geo_config.get("enabled", False):
+        df = add_geo_features(df, str(Path(config["raw_data_path"]) / "store_info.csv"), config["merge_key"], geo_config)
+        logger.info("Geo features complete")
+
     # 7) Normalisasi kolom numerik terpilih
     df = convert_and_normalize(df, config["parameters"])
     logger.info("Normalization complete")
@@ -46,7 +54,16 @@ def main():
 
     # 9) Report
     Path(config["report_output_path"]).parent.mkdir(parents=True, exist_ok=True)
-    generate_report(df, config["report_output_path"])
+    report_config = config.get("report", {})
+    source_files = sorted(str(f) for f in Path(config["raw_data_path"]).glob("sales_*.csv"))
+    partials = None
+    if report_config.get("incremental", False):
+        # a month's partial depends only on its own file and the feature spec (see src/analysis.py)
+        partials = {
+            "folder": report_config.get("partials_path", "output/reports/partials"),
+            "settings_digest": hashlib.sha256(json.dumps(config.get("features"), sort_keys=True).encode()).hexdigest(),
+        }
+    generate_report(config["report_output_path"], source_files, config.get("features"), partials)
     logger.info(f"Report saved to {config['report_output_path']}")
 
     logger.info("==== Pipeline Completed ====")
@@ -1,12 +1,86 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
 import pandas as pd
+from src.feature_engineering import create_features
+from src.log_info import log_info
 
-def generate_report(df: pd.DataFrame, output_path: str) -> None:
-    report = (
+def generate_report(output_path: str, source_files: List[str], feature_spec: Optional[Dict] = None,
+                    partials: Optional[Dict] = None) -> pd.DataFrame:
+    # Same definition in both modes: per-month partials merged by kategori.
+    # Full mode builds every partial fresh; incremental mode reuses the stored ones.
+    if partials is None:
+        report = merge_partials([build_partial(Path(source), feature_spec) for source in source_files])
+    else:
+        report = merge_partials(update_partials(partials["folder"], source_files, feature_spec,
+                                                partials.get("settings_digest", "")))
+    report.to_csv(output_path, index=False)
+    return report
+
+# ============================================================
+# Report partials (config report.incremental, off by default)
+#   The report is defined per sales_<month>.csv: that file's raw rows
+#   (duplicates within the file dropped, features from config["features"])
+#   aggregated to sums and counts per kategori, then merged across months.
+#   Values are taken before mean filling, IQR capping and scaling, so the
+#   totals stay in the original units.
+#   With report.incremental on, each partial is stored in <folder>/<file stem>.csv
+#   and listed in manifest.json with the fingerprint of the source file +
+#   feature settings; only new or changed months are read and re-aggregated.
+#   Both modes give the same summary_sales_report.csv.
+# ============================================================
+def month_partial(df: pd.DataFrame) -> pd.DataFrame:
+    return (
         df.groupby("kategori", dropna=False)
-          .agg(total_sales=("total_sales", "sum"),
-               avg_laba=("total_laba", "mean"),
-               total_jumlah=("jumlah", "sum"))
+          .agg(total_sales_sum=("total_sales", "sum"),
+               total_laba_sum=("total_laba", "sum"),
+               total_laba_count=("total_laba", "count"),
+               jumlah_sum=("jumlah", "sum"))
           .reset_index()
     )
-    report.to_csv(output_path, index=False)
 
+def build_partial(source: Path, feature_spec: Optional[Dict] = None) -> pd.DataFrame:
+    return month_partial(create_features(pd.read_csv(source).drop_duplicates(), feature_spec))
+
+def merge_partials(partials: List[pd.DataFrame]) -> pd.DataFrame:
+    merged = pd.concat(partials, ignore_index=True).groupby("kategori", dropna=False).sum().reset_index()
+    return pd.DataFrame({
+        "kategori": merged["kategori"],
+        "total_sales": merged["total_sales_sum"],
+        "avg_laba": merged["total_laba_sum"] / merged["total_laba_count"],
+        "total_jumlah": merged["jumlah_sum"],
+    })
+
+def file_fingerprint(path: Path, settings_digest: str = "") -> str:
+    digest = hashlib.sha256(settings_digest.encode())
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def update_partials(folder: str, source_files: List[str], feature_spec: Optional[Dict] = None,
+                    settings_digest: str = "") -> List[pd.DataFrame]:
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    manifest_path = folder / "manifest.json"
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+
+    partials, reused, aggregated = [], [], []
+    for source in map(Path, source_files):
+        fingerprint = file_fingerprint(source, settings_digest)
+        partial_path = folder / f"{source.stem}.csv"
+        if manifest.get(source.name) == fingerprint and partial_path.exists():
+            partials.append(pd.read_csv(partial_path, float_precision="round_trip"))
+            reused.append(source.name)
+            continue
+
+        partial = build_partial(source, feature_spec)
+        partial.to_csv(partial_path, index=False)
+        manifest[source.name] = fingerprint
+        partials.append(partial)
+        aggregated.append(source.name)
+
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    log_info(f"Report partials: {len(aggregated)} aggregated {aggregated}, {len(reused)} reused")
+    return partials
@@ -1,8 +1,6 @@
 import pandas as pd
 import numpy as np
 from src.log_info import log_info
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import MinMaxScaler, StandardScaler
 from typing import Dict
 
 _EXCLUDE_OUTLIER = {"id_transaksi", "latitude", "longitude"}
@@ -12,13 +10,14 @@ def clean_data(df: pd.DataFrame, missing_strategy: str = "mean") -> pd.DataFrame
     df = df.drop_duplicates().copy()
 
     for col in df.columns:
-        if df[col].dtype == "object":
+        # text and categorical columns (broadcast join keys) take the mode
+        if pd.api.types.is_numeric_dtype(df[col]):
+            val = df[col].median() if missing_strategy == "median" else df[col].mean()
+            df[col] = df[col].fillna(val)
+        else:
             mode = df[col].mode(dropna=True)
             if len(mode):
                 df[col] = df[col].fillna(mode[0])
-        else:
-            val = df[col].median() if missing_strategy == "median" else df[col].mean()
-            df[col] = df[col].fillna(val)
 
     if "tanggal_transaksi" in df.columns:
         df["tanggal_transaksi"] = pd.to_datetime(df["tanggal_transaksi"], errors="coerce")
@@ -46,6 +45,7 @@ def detect_outliers_and_anomalies(df: pd.DataFrame, parameters: Dict) -> pd.Data
         if bool(parameters.get("enable_isolation_forest", True)) and len(numeric_cols) > 0:
             contamination = float(parameters.get("isolation_forest_contamination", 0.02))
             random_state = int(parameters.get("random_state", 42))
+            from sklearn.ensemble import IsolationForest
             iso = IsolationForest(contamination=contamination, random_state=random_state)
             df["anomaly_flag"] = iso.fit_predict(df[numeric_cols])
             log_info(f"Anomalies detected: {(df['anomaly_flag'] == -1).sum()} rows")
@@ -68,6 +68,7 @@ def convert_and_normalize(df: pd.DataFrame, parameters: Dict) -> pd.DataFrame:
                 df[col] = pd.to_numeric(df[col], errors="coerce")
 
         method = parameters.get("normalization", "minmax")
+        from sklearn.preprocessing import MinMaxScaler, StandardScaler
         scaler = MinMaxScaler() if method == "minmax" else StandardScaler()
         cols_to_scale = [c for c in _SCALE_COLS if c in df.columns]
 
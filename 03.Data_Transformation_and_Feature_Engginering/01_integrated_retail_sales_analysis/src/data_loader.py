@@ -1,14 +1,78 @@
 from pathlib import Path
+import numpy as np
 import pandas as pd
+from src.log_info import log_info
+
+def load_data(path: str, merge_key: str, join_mode: str = "merge") -> pd.DataFrame:
 
-def load_data(path: str, merge_key: str) -> pd.DataFrame:
-    
     # Load sales_*.csv then merge with store_info.csv.
     p = Path(path)
     sales_files = sorted(p.glob("sales_*.csv"))
     if not sales_files:
         raise FileNotFoundError(f"No sales_*.csv found in {p.resolve()}")
 
-    df_sales = pd.concat([pd.read_csv(f) for f in sales_files], ignore_index=True)
     df_store = pd.read_csv(p / "store_info.csv")
+    if join_mode == "broadcast":
+        return broadcast_join(sales_files, df_store, merge_key)
+    if join_mode != "merge":
+        raise ValueError(f"Invalid join_mode: {join_mode}")
+
+    df_sales = pd.concat([pd.read_csv(f) for f in sales_files], ignore_index=True)
     return df_sales.merge(df_store, on=merge_key, how="left")
+
+def broadcast_join(sales_files, df_store: pd.DataFrame, merge_key: str) -> pd.DataFrame:
+    # store_info is small: index it once, then attach its columns to every sales file by array lookup.
+    # Key codes: 0..n_store-1 are store rows, n_store.. are keys missing from store_info.
+    if df_store[merge_key].duplicated().any():
+        log_info(f"store_info has duplicate {merge_key} values, keeping the first row of each")
+        df_store = df_store.drop_duplicates(merge_key)
+    store_index = pd.Index(df_store[merge_key])
+    n_store = len(store_index)
+    unmatched_keys, unmatched_rows = {}, 0
+
+    # store-level lookup arrays, built once; text columns stay categorical with shared categories
+    store_columns = {}
+    for col in df_store.columns.drop(merge_key):
+        values = df_store[col]
+        if pd.api.types.is_numeric_dtype(values):
+            store_columns[col] = (values.to_numpy(dtype="float64"), None)
+        else:
+            store_codes, categories = pd.factorize(values)
+            store_columns[col] = (store_codes, categories)
+
+    parts, key_codes = [], []
+    for f in sales_files:
+        df = pd.read_csv(f)
+        codes = store_index.get_indexer(df[merge_key])
+
+        missing = codes == -1
+        if missing.any():
+            unmatched_rows += int(missing.sum())
+            inverse, extra = pd.factorize(df.loc[missing, merge_key])
+            for key in extra:
+                unmatched_keys.setdefault(key, n_store + len(unmatched_keys))
+            extra_codes = np.array([unmatched_keys[key] for key in extra] + [-1], dtype=codes.dtype)
+            codes[missing] = extra_codes[inverse]   # a blank key stays -1 (missing)
+
+        # join this file before appending it; store columns follow the sales columns as merge() would order them
+        matched = (codes >= 0) & (codes < n_store)
+        store_row = np.where(matched, codes, 0)
+        for col, (lookup, categories) in store_columns.items():
+            if categories is None:
+                df[col] = np.where(matched, lookup[store_row], np.nan)
+            else:
+                df[col] = pd.Categorical.from_codes(np.where(matched, lookup[store_row], -1), categories=categories)
+
+        parts.append(df)
+        key_codes.append(codes)
+
+    df = pd.concat(parts, ignore_index=True)
+
+    # merge_key keeps its column position; its categories are complete only once every file was seen
+    df[merge_key] = pd.Categorical.from_codes(
+        np.concatenate(key_codes), categories=list(store_index) + list(unmatched_keys))
+
+    log_info(f"Broadcast join on {merge_key}: {len(df)} rows, {n_store} stores")
+    if unmatched_rows:
+        log_info(f"Unmatched {merge_key}: {unmatched_rows} rows, keys {sorted(map(str, unmatched_keys))}")
+    return df
@@ -1,24 +1,131 @@
+import ast
+import numpy as np
 import pandas as pd
+from typing import Dict, Optional
 
-def create_features(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+# Feature spec (config["features"]), evaluated in order; later features may use earlier ones by name.
+#   {"expr": "jumlah * harga_satuan"}                         arithmetic on numeric columns
+#   {"bucket": "jumlah", "bins": [8, 15], "labels": [...]}     label i for bins[i-1] <= x < bins[i]
+#   {"date_part": "month", "column": "tanggal_transaksi"}     any Series.dt attribute
+#   "keep": false                                              intermediate only, not added to the frame
+DEFAULT_FEATURES = {
+    # Total sales (using raw data before scaling)
+    "total_sales": {"expr": "jumlah * (harga_satuan * (1 - diskon))"},
+    # Transaction month
+    "month": {"date_part": "month", "column": "tanggal_transaksi"},
+    # Popularity category
+    "popularity_category": {"bucket": "jumlah", "bins": [8, 15],
+                            "labels": ["Low Seller", "Medium Seller", "Best Seller"]},
+    # Margin & laba
+    "margin_profit": {"expr": "harga_satuan * (1 - diskon) - harga_satuan * 0.6"},
+    "total_laba": {"expr": "margin_profit * jumlah"},
+}
 
-    if "tanggal_transaksi" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["tanggal_transaksi"]):
-        df["tanggal_transaksi"] = pd.to_datetime(df["tanggal_transaksi"], errors="coerce")
+_BINARY_OPS = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply,
+               ast.Div: np.true_divide, ast.Pow: np.power, ast.Mod: np.mod}
+_FUNCTIONS = {"abs": np.abs, "sqrt": np.sqrt, "log": np.log, "log1p": np.log1p, "exp": np.exp,
+              "minimum": np.minimum, "maximum": np.maximum}
 
-    # Total sales (using raw data before scaling)
-    df["total_sales"] = df["jumlah"] * df["harga_satuan"] * (1 - df["diskon"])
 
-    # Transaction month
-    df["month"] = df["tanggal_transaksi"].dt.month
+def _compile_expr(name: str, expr: str) -> ast.AST:
+    tree = ast.parse(expr, mode="eval").body
+    for node in ast.walk(tree):
+        allowed = (ast.BinOp, ast.UnaryOp, ast.Name, ast.Constant, ast.Call, ast.Load, ast.USub, ast.UAdd,
+                   *_BINARY_OPS)
+        if not isinstance(node, allowed):
+            raise ValueError(f"Feature {name}: unsupported syntax {type(node).__name__} in '{expr}'")
+        if isinstance(node, ast.Call) and (not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS):
+            raise ValueError(f"Feature {name}: unknown function in '{expr}' (allowed: {sorted(_FUNCTIONS)})")
+    return tree
 
-    # Popularity category
-    df["popularity_category"] = df["jumlah"].apply(
-        lambda x: "Best Seller" if x >= 15 else ("Medium Seller" if x >= 8 else "Low Seller")
-    )
 
-    # Margin & laba
-    df["margin_profit"] = (df["harga_satuan"] * (1 - df["diskon"])) - (df["harga_satuan"] * 0.6)
-    df["total_laba"] = df["margin_profit"] * df["jumlah"]
+class _Evaluator:
+    # Whole-column NumPy evaluation. Subtrees that occur more than once across the spec
+    # (e.g. harga_satuan * (1 - diskon)) are computed once; other temporaries are freed right away.
+    def __init__(self, df: pd.DataFrame, shared: set):
+        self.df = df
+        self.shared = shared
+        self.values = {}
+        self.memo = {}
+
+    def column(self, name: str) -> np.ndarray:
+        if name not in self.values:
+            if name not in self.df.columns:
+                raise KeyError(f"Unknown column or feature '{name}'")
+            self.values[name] = self.df[name].to_numpy(dtype="float64", na_value=np.nan)
+        return self.values[name]
+
+    def set(self, name: str, values) -> None:
+        if name in self.values or name in self.df.columns:
+            self.memo.clear()   # a feature shadowing a column invalidates cached subexpressions
+        self.values[name] = values
+
+    def eval(self, node: ast.AST):
+        key = ast.dump(node)
+        if key in self.memo:
+            return self.memo[key]
+        if isinstance(node, ast.Name):
+            return self.column(node.id)
+
+        if isinstance(node, ast.Constant):
+            result = float(node.value)
+        elif isinstance(node, ast.UnaryOp):
+            operand = self.eval(node.operand)
+            result = np.negative(operand) if isinstance(node.op, ast.USub) else operand
+        elif isinstance(node, ast.BinOp):
+            result = _BINARY_OPS[type(node.op)](self.eval(node.left), self.eval(node.right))
+        else:
+            result = _FUNCTIONS[node.func.id](*[self.eval(arg) for arg in node.args])
+
+        if key in self.shared:
+            self.memo[key] = result
+        return result
+
+
+def compile_features(spec: Dict):
+    # Validate and parse the spec once; returns [(name, kind, definition)] and the shared subtree keys.
+    compiled, counts = [], {}
+    for name, definition in spec.items():
+        if "expr" in definition:
+            tree = _compile_expr(name, definition["expr"])
+            for node in ast.walk(tree):
+                if isinstance(node, (ast.BinOp, ast.UnaryOp, ast.Call)):
+                    key = ast.dump(node)
+                    counts[key] = counts.get(key, 0) + 1
+            compiled.append((name, "expr", {**definition, "tree": tree}))
+        elif "bucket" in definition:
+            bins, labels = definition["bins"], definition["labels"]
+            if len(labels) != len(bins) + 1 or list(bins) != sorted(bins):
+                raise ValueError(f"Feature {name}: bins must be sorted and labels must be one longer than bins")
+            compiled.append((name, "bucket", definition))
+        elif "date_part" in definition:
+            compiled.append((name, "date_part", definition))
+        else:
+            raise ValueError(f"Feature {name}: expected one of 'expr', 'bucket' or 'date_part'")
+    return compiled, {key for key, count in counts.items() if count > 1}
+
+
+def create_features(df: pd.DataFrame, feature_spec: Optional[Dict] = None) -> pd.DataFrame:
+    if "tanggal_transaksi" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["tanggal_transaksi"]):
+        df["tanggal_transaksi"] = pd.to_datetime(df["tanggal_transaksi"], errors="coerce")
+
+    compiled, shared = compile_features(feature_spec or DEFAULT_FEATURES)
+    evaluator = _Evaluator(df, shared)
+    for name, kind, definition in compiled:
+        if kind == "expr":
+            values = evaluator.eval(definition["tree"])
+            values = np.full(len(df), values) if np.ndim(values) == 0 else values
+            evaluator.set(name, values)
+        elif kind == "bucket":
+            source = evaluator.column(definition["bucket"])
+            codes = np.searchsorted(np.asarray(definition["bins"], dtype="float64"), source, side="right")
+            codes[np.isnan(source)] = 0   # like the old x >= bin comparisons: missing falls in the lowest bucket
+            values = pd.Categorical.from_codes(codes, categories=definition["labels"])
+        else:
+            values = getattr(df[definition["column"]].dt, definition["date_part"])
+            evaluator.set(name, values.to_numpy(dtype="float64", na_value=np.nan))
+
+        if definition.get("keep", True):
+            df[name] = values
 
     return df
@@ -0,0 +1,84 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict
+import numpy as np
+import pandas as pd
+from src.log_info import log_info
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def store_geo_table(df_store: pd.DataFrame, merge_key: str, radius_km: float = 50.0,
+                    cluster_radius_km: float = 25.0, batch_size: int = 10_000) -> pd.DataFrame:
+    # One row per store: distance to the nearest other store, other stores within radius_km,
+    # and a cluster id (stores chained together within cluster_radius_km share an id).
+    from sklearn.neighbors import BallTree
+    from sklearn.cluster import DBSCAN
+
+    stores = df_store.dropna(subset=["latitude", "longitude"]).drop_duplicates(merge_key)
+    coords = np.radians(stores[["latitude", "longitude"]].to_numpy(dtype="float64"))
+    table = pd.DataFrame({merge_key: stores[merge_key].to_numpy()})
+    if len(stores) == 0:
+        return table.assign(nearest_store_km=np.nan, stores_within_radius=0, geo_cluster=-1)
+
+    tree = BallTree(coords, metric="haversine")
+    nearest = np.full(len(stores), np.nan)
+    within = np.zeros(len(stores), dtype="int64")
+    k = min(2, len(stores))
+    for start in range(0, len(stores), batch_size):
+        batch = coords[start:start + batch_size]
+        distances, _ = tree.query(batch, k=k)
+        if k == 2:
+            nearest[start:start + batch_size] = distances[:, 1] * EARTH_RADIUS_KM   # column 0 is the store itself
+        within[start:start + batch_size] = tree.query_radius(batch, r=radius_km / EARTH_RADIUS_KM, count_only=True) - 1
+
+    table["nearest_store_km"] = nearest
+    table["stores_within_radius"] = within
+    table["geo_cluster"] = DBSCAN(eps=cluster_radius_km / EARTH_RADIUS_KM, min_samples=1,
+                                  metric="haversine", algorithm="ball_tree").fit_predict(coords)
+    return table
+
+
+def _cache_key(df_store: pd.DataFrame, merge_key: str, params: Dict) -> str:
+    payload = df_store[[merge_key, "latitude", "longitude"]].to_csv(index=False) + json.dumps(params, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def load_store_geo_table(store_path: str, merge_key: str, geo_config: Dict) -> pd.DataFrame:
+    # Per-store results are cached on disk and reused while store_info and the parameters are unchanged.
+    df_store = pd.read_csv(store_path)
+    params = {"radius_km": float(geo_config.get("radius_km", 50)),
+              "cluster_radius_km": float(geo_config.get("cluster_radius_km", 25))}
+    key = _cache_key(df_store, merge_key, params)
+
+    cache_path = geo_config.get("cache_path")
+    if cache_path and Path(cache_path).exists():
+        cached = pd.read_csv(cache_path, dtype={merge_key: str})
+        if len(cached) and (cached["cache_key"] == key).all():
+            log_info(f"Store geo features loaded from cache {cache_path}")
+            return cached.drop(columns="cache_key")
+
+    table = store_geo_table(df_store, merge_key, batch_size=int(geo_config.get("query_batch", 10_000)), **params)
+    if cache_path:
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        table.assign(cache_key=key).to_csv(cache_path, index=False)
+    log_info(f"Store geo features computed for {len(table)} stores "
+             f"(radius {params['radius_km']} km, cluster radius {params['cluster_radius_km']} km)")
+    return table
+
+
+def add_geo_features(df: pd.DataFrame, store_path: str, merge_key: str, geo_config: Dict) -> pd.DataFrame:
+    table = load_store_geo_table(store_path, merge_key, geo_config)
+
+    if table.empty:
+        return df.assign(nearest_store_km=np.nan, stores_within_radius=0, geo_cluster=-1)
+
+    # rows pick up their store's values by index; transactions of unknown stores get NaN / 0 / -1
+    rows = pd.Index(table[merge_key].astype(str)).get_indexer(df[merge_key].astype(str))
+    known = rows >= 0
+    take = np.where(known, rows, 0)
+    df["nearest_store_km"] = np.where(known, table["nearest_store_km"].to_numpy()[take], np.nan)
+    df["stores_within_radius"] = np.where(known, table["stores_within_radius"].to_numpy()[take], 0)
+    df["geo_cluster"] = np.where(known, table["geo_cluster"].to_numpy()[take], -1)
+    return df
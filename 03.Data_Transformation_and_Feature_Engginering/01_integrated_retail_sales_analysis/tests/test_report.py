@@ -0,0 +1,40 @@
+# The category report has one definition: full and incremental runs must write the same summary_sales_report.csv.
+import json
+import shutil
+import sys
+from pathlib import Path
+import pandas as pd
+import pytest
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_DIR))
+
+import main  # noqa: E402
+
+
+def run_pipeline(workdir, incremental):
+    settings_path = workdir / "config" / "settings.json"
+    config = json.loads(settings_path.read_text())
+    config["report"]["incremental"] = incremental
+    config["report_output_path"] = f"output/reports/summary_{'incremental' if incremental else 'full'}.csv"
+    settings_path.write_text(json.dumps(config))
+    main.main()
+    return pd.read_csv(workdir / config["report_output_path"])
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    shutil.copytree(PROJECT_DIR / "config", tmp_path / "config")
+    shutil.copytree(PROJECT_DIR / "data" / "raw", tmp_path / "data" / "raw")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_incremental_report_matches_full_report(workdir):
+    full = run_pipeline(workdir, incremental=False)
+    first = run_pipeline(workdir, incremental=True)       # builds and stores the partials
+    reused = run_pipeline(workdir, incremental=True)      # reuses every stored partial
+
+    assert (workdir / "output" / "reports" / "partials" / "manifest.json").exists()
+    pd.testing.assert_frame_equal(full, first)
+    pd.testing.assert_frame_equal(full, reused)
@@ -10,6 +10,9 @@ from src.utils import setup_logging
 from src.data_cleaning import clean_data, detect_outliers_and_anomalies, normalize_data
 from src.feature_engineering import create_features
 from src.analysis import generate_report
+from src.scoring import save_state
+from src.partitioned import run_partitioned
+from src.analysis import generate_partition_report
 
 def main ():
     # === Load Data ===
@@ -26,25 +29,36 @@ def main ():
     df = load_data(config["raw_data_path"])
     logger.info(f"Data loaded: {df.shape}")
 
-    # === Clean Data & Anomaly Detection ===
+    partition_key = config.get("partition_key")
+    if partition_key:
+        # === Clean, anomaly detection, normalization and features per partition (process pool) ===
+        df, state = run_partitioned(df, config, partition_key, int(config.get("partition_workers", 0)))
+        logger.info(f"Partitioned processing on '{partition_key}' complete")
+    else:
+        # === Clean Data & Anomaly Detection ===
+        # every stage records what it fitted in `state`, which the scoring API replays per record
+        state = {}
 
-    # Handle Missing Value
-    df = clean_data(df, config.get("missing_value_strategy", "mean"))
-    logger.info("Cleaning complete")
+        # Handle Missing Value
+        df = clean_data(df, config.get("missing_value_strategy", "mean"), state)
+        logger.info("Cleaning complete")
 
-    # Handle Outlier and Anomaly
-    df = detect_outliers_and_anomalies(df, config.get("parameters", {}))
-    logger.info("Outlier & anomaly handling complete")
+        # Handle Outlier and Anomaly
+        df = detect_outliers_and_anomalies(df, config.get("parameters", {}), state)
+        logger.info("Outlier & anomaly handling complete")
 
-    # Normalization
-    df = normalize_data(df, config.get("parameters", {}))
-    logger.info("Normalization complete")
+        # Normalization
+        df = normalize_data(df, config.get("parameters", {}), state)
+        logger.info("Normalization complete")
 
-    # === Feature engineering ====
+        # === Feature engineering ====
 
-    # Create Features
-    df = create_features(df)
-    logger.info("Feature engineering complete")
+        # Create Features
+        df = create_features(df, state)
+        logger.info("Feature engineering complete")
+
+    # === Save fitted state for single-record scoring (src/scoring.py, serve.py) ===
+    save_state(state, config.get("state_path", "models/employee_state.joblib"))
 
     # === Save processed ===
     processed_file_path = Path (config["processed_data_path"]) / "employee_cleaned.csv"
@@ -57,6 +71,10 @@ def main ():
     report_file.parent.mkdir(parents=True, exist_ok=True)
     generate_report(df, str(report_file))
     logger.info(f"Report saved to {report_file}")
+    if partition_key:
+        partition_report_file = Path(config["report_output_path"]) / f"report_by_{partition_key}.csv"
+        generate_partition_report(df, partition_key, str(partition_report_file))
+        logger.info(f"Partition report saved to {partition_report_file}")
 
     logger.info("==== Pipeline Completed ====")
 
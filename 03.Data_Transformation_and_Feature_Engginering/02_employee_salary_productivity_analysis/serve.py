@@ -0,0 +1,90 @@
+# ============================================================
+# Local scoring endpoint for the employee productivity features
+#   python serve.py [--port 8008]
+#   POST /score           {"salary": 8500000, "working_hours": 45, ...}  or a list of records
+#   POST /score?anomaly=1 adds anomaly_flag from the persisted IsolationForest
+#   GET  /health
+# Uses the fitted state written by main.py (config "state_path").
+# ============================================================
+import json
+import asyncio
+import argparse
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+from src.scoring import load_state, score_records
+from src.log_info import log_info
+
+MAX_BODY_BYTES = 1 << 20
+
+
+def _response(status: str, payload) -> bytes:
+    body = json.dumps(payload).encode()
+    head = (f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n")
+    return head.encode() + body
+
+
+def handle_request(method: str, target: str, body: bytes, state) -> bytes:
+    url = urlsplit(target)
+    if method == "GET" and url.path == "/health":
+        return _response("200 OK", {"status": "ok"})
+    if method != "POST" or url.path != "/score":
+        return _response("404 Not Found", {"error": f"{method} {url.path} not found"})
+
+    try:
+        payload = json.loads(body or b"null")
+        records = payload if isinstance(payload, list) else [payload]
+        if not all(isinstance(record, dict) for record in records):
+            raise ValueError("expected a JSON object or a list of objects")
+        with_anomaly = parse_qs(url.query).get("anomaly", ["0"])[0] in ("1", "true")
+        results = score_records(records, state, with_anomaly)
+    except (ValueError, TypeError, KeyError) as error:
+        return _response("400 Bad Request", {"error": str(error)})
+    return _response("200 OK", results if isinstance(payload, list) else results[0])
+
+
+async def serve_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, state) -> None:
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get("content-length", 0))
+            if length > MAX_BODY_BYTES:
+                writer.write(_response("413 Payload Too Large", {"error": "body too large"}))
+                break
+            body = await reader.readexactly(length) if length else b""
+
+            writer.write(handle_request(method, target, body, state))
+            await writer.drain()
+            if headers.get("connection", "").lower() == "close":
+                break
+    except (ValueError, asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+
+async def main(host: str, port: int, state_path: str) -> None:
+    state = load_state(state_path)
+    server = await asyncio.start_server(lambda r, w: serve_connection(r, w, state), host, port)
+    log_info(f"Scoring endpoint on http://{host}:{port}/score (state {state_path})")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    config = json.loads(Path("config/settings.json").read_text())
+    parser = argparse.ArgumentParser(description="Local scoring endpoint for employee features")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8008)
+    parser.add_argument("--state", default=config.get("state_path", "models/employee_state.joblib"))
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port, args.state))
@@ -14,4 +14,18 @@ def generate_report (df:pd.DataFrame, output_path:str) -> None:
     report = report.reset_index()
 
     report.to_csv(output_path, index=False)
-    log_info(f"Report saved to {output_path}")
\ No newline at end of file
+    log_info(f"Report saved to {output_path}")
+
+def generate_partition_report(df:pd.DataFrame, partition_key:str, output_path:str) -> None:
+    # Same aggregates per partition (e.g. department) and salary category.
+    report = df.groupby([partition_key, "category_salary"], dropna=False, observed=True).agg(
+        employees=("efficiency_score", "size"),
+        efficiency_score_mean=("efficiency_score", "mean"),
+        working_hours_mean=("working_hours", "mean"),
+        salary_mean=("salary", "mean"),
+        salary_max=("salary", "max"),
+        anomalies=("anomaly_flag", lambda flags: int((flags == -1).sum())),
+    ).reset_index()
+
+    report.to_csv(output_path, index=False)
+    log_info(f"Partition report saved to {output_path}")
\ No newline at end of file
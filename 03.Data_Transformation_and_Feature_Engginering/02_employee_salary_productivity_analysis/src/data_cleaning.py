@@ -1,8 +1,6 @@
 import pandas as pd
 import numpy as np
-from typing import Dict
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import MinMaxScaler, StandardScaler
+from typing import Dict, Optional
 from .log_info import log_info
 
 # columns NOT used for outlier/anomaly detection
@@ -10,27 +8,34 @@ _EXCLUDE_OUTLIER = {"employee_id"}
 # columns to be scaled
 _SCALE_COLS = ("salary", "working_hours", "projects_done", "performance_score")
 
-def clean_data (df:pd.DataFrame, missing_value_strategy: str = "mean") -> pd.DataFrame:
+def clean_data (df:pd.DataFrame, missing_value_strategy: str = "mean", state: Optional[Dict] = None) -> pd.DataFrame:
     # Drop duplicates, fill in missing values ​​(mean/median for numeric, mode for categorical)
+    # When a state dict is passed, the fitted fill values are recorded in it (see src/scoring.py).
     df = df.drop_duplicates().copy()
+    fill_values = {}
 
     for col in df.columns:
-        if df[col].dtype == "object":
+        if pd.api.types.is_numeric_dtype(df[col]):
+            filler = df[col].mean() if missing_value_strategy == "mean"  else df[col].median()
+            df[col] = df[col].fillna(filler)
+            fill_values[col] = float(filler)
+        else:
             mode = df[col].mode(dropna=True)
             if not mode.empty:
                 df[col] = df[col].fillna(mode.iloc[0])
-        else:
-            filler = df[col].mean() if missing_value_strategy == "mean"  else df[col].median()
-            df[col] = df[col].fillna(filler)
+                fill_values[col] = mode.iloc[0]
 
+    if state is not None:
+        state["fill_values"] = fill_values
     return df
 
-def detect_outliers_and_anomalies(df:pd.DataFrame, parameters:Dict) -> pd.DataFrame:
+def detect_outliers_and_anomalies(df:pd.DataFrame, parameters:Dict, state: Optional[Dict] = None) -> pd.DataFrame:
     # Clip outliers via IQR, then detect anomalies using IsolationForest (optional).
     try:
         numeric_cols = df.select_dtypes(include=[np.number]).columns.difference(list(_EXCLUDE_OUTLIER))
 
         # IQR clipping
+        bounds = {}
         for col in numeric_cols:
             Q1, Q3 = df[col].quantile(0.25), df[col].quantile(0.75)
             IQR = Q3 - Q1
@@ -39,6 +44,10 @@ def detect_outliers_and_anomalies(df:pd.DataFrame, parameters:Dict) -> pd.DataFr
             if n_out:
                 log_info(f"Outliers in '{col}': {n_out} rows clipped")
             df[col] = np.clip(df[col], lower, upper)
+            bounds[col] = (float(lower), float(upper))
+        if state is not None:
+            state["iqr_bounds"] = bounds
+            state["isolation_forest"] = None
 
         # Isolation Forest
         enable_iforest = parameters.get("enable_isolation_forest", True)
@@ -48,9 +57,12 @@ def detect_outliers_and_anomalies(df:pd.DataFrame, parameters:Dict) -> pd.DataFr
         if enable_iforest and len(numeric_cols) > 0:
             contamination = float(parameters.get("isolation_forest_contamination", 0.02))
             random_state = int(parameters.get("random_state", 42))
+            from sklearn.ensemble import IsolationForest
             iso = IsolationForest(contamination=contamination, random_state=random_state)
             df['anomaly_flag'] = iso.fit_predict(df[numeric_cols])
             log_info(f"Anomalies detected: {(df['anomaly_flag'] == -1).sum()} rows")
+            if state is not None:
+                state["isolation_forest"] = {"model": iso, "columns": list(numeric_cols)}
 
         else:
             df["anomaly_flag"] = 1
@@ -61,7 +73,7 @@ def detect_outliers_and_anomalies(df:pd.DataFrame, parameters:Dict) -> pd.DataFr
         log_info(f"Error in detect_outliers_and_anomalies: {error}")
         return df
     
-def normalize_data(df:pd.DataFrame, parameters:Dict) -> pd.DataFrame:
+def normalize_data(df:pd.DataFrame, parameters:Dict, state: Optional[Dict] = None) -> pd.DataFrame:
     # Scale the selected numeric column with the MinMax/Standard scaler.
     try:
         # make sure it's numeric
@@ -70,12 +82,22 @@ def normalize_data(df:pd.DataFrame, parameters:Dict) -> pd.DataFrame:
                 df[col] = pd.to_numeric(df[col], errors="coerce")
         
         method = str(parameters.get("normalization", "minmax")).lower()
+        from sklearn.preprocessing import MinMaxScaler, StandardScaler
         scaler = MinMaxScaler() if method == "minmax" else StandardScaler()
 
         cols_to_scale = [col for col in _SCALE_COLS if col in df.columns]
         if cols_to_scale:
             df[cols_to_scale] = scaler.fit_transform(df[cols_to_scale])
             log_info(f"Normalization complete on {cols_to_scale} using '{method}'")
+            if state is not None:
+                # x * scale + offset, the same arithmetic the fitted scaler's transform() applies
+                if method == "minmax":
+                    scale, offset = scaler.scale_, scaler.min_
+                    state["scaler"] = {"method": method, "columns": cols_to_scale,
+                                       "scale": scale.tolist(), "offset": offset.tolist()}
+                else:
+                    state["scaler"] = {"method": method, "columns": cols_to_scale,
+                                       "mean": scaler.mean_.tolist(), "std": scaler.scale_.tolist()}
 
         return df
     
@@ -1,7 +1,11 @@
 import numpy as np
 import pandas as pd
+from typing import Dict, Optional
 
-def create_features(df:pd.DataFrame) -> pd.DataFrame:
+SALARY_BINS = [0, 0.33, 0.66, 1.0]
+SALARY_LABELS = ["Low", "Medium", "High"]
+
+def create_features(df:pd.DataFrame, state: Optional[Dict] = None) -> pd.DataFrame:
     # Create derived features and salary categorization (two versions: label & quantile).
     df = df.copy()
 
@@ -11,16 +15,20 @@ def create_features(df:pd.DataFrame) -> pd.DataFrame:
     # Efficiency score (avoid inf + chained assignment warning)
     eff = df["performance_score"] / (df["working_hours"] + 1e-6)
     eff = eff.replace([np.inf, -np.inf], np.nan)
-    df["efficiency_score"] = eff.fillna(eff.median())
+    eff_median = eff.median()
+    df["efficiency_score"] = eff.fillna(eff_median)
 
     # Manual threshold based salary categories (labels "Low/Medium/High")
     df["category_salary"] = pd.cut(
-        df["salary"], bins = [0, 0.33, 0.66, 1.0],
-        labels=["Low", "Medium", "High"],
+        df["salary"], bins = SALARY_BINS,
+        labels=SALARY_LABELS,
         include_lowest=True
     )
 
     # Quantile version for alternative analysis (use name 'salary_range')
-    df['salary_range'] = pd.qcut(df['salary'], q=3, labels=["Low", "Medium", "High"])
+    df['salary_range'], edges = pd.qcut(df['salary'], q=3, labels=SALARY_LABELS, retbins=True)
 
+    if state is not None:
+        state["efficiency_median"] = float(eff_median)
+        state["salary_range_edges"] = [float(edge) for edge in edges]
     return df
\ No newline at end of file
@@ -0,0 +1,74 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Tuple
+import numpy as np
+import pandas as pd
+from .data_cleaning import clean_data, detect_outliers_and_anomalies, normalize_data
+from .feature_engineering import create_features
+from .log_info import log_info
+
+# Partitioned run (config "partition_key", e.g. "department"):
+#   rows are grouped by the key, the numeric columns go into one shared-memory block,
+#   and every partition runs clean -> outliers/IsolationForest -> normalize -> features
+#   in its own worker process with its own fitted state (one forest per partition).
+
+def process_frame(df: pd.DataFrame, config: Dict, state: Dict) -> pd.DataFrame:
+    # The same stage sequence as main.py, applied to one partition.
+    parameters = config.get("parameters", {})
+    df = clean_data(df, config.get("missing_value_strategy", "mean"), state)
+    df = detect_outliers_and_anomalies(df, parameters, state)
+    df = normalize_data(df, parameters, state)
+    return create_features(df, state)
+
+def _run_partition(task: Tuple) -> Tuple[str, pd.DataFrame, Dict]:
+    name, shm_name, shape, start, stop, numeric_dtypes, text_part, columns, config = task
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        block = np.ndarray(shape, dtype="float64", buffer=shm.buf)[start:stop]
+        numeric = pd.DataFrame(block.copy(), columns=list(numeric_dtypes), index=text_part.index)
+    finally:
+        shm.close()
+
+    part = pd.concat([text_part, numeric.astype(numeric_dtypes)], axis=1)[columns]
+    state = {}
+    part = process_frame(part, config, state)
+    log_info(f"Partition {name}: {len(part)} rows processed (pid {os.getpid()})")
+    return name, part, state
+
+def run_partitioned(df: pd.DataFrame, config: Dict, partition_key: str, workers: int = 0) -> Tuple[pd.DataFrame, Dict]:
+    if partition_key not in df.columns:
+        raise KeyError(f"Partition key '{partition_key}' not found in data")
+
+    # contiguous partitions: stable sort on the key codes (missing keys form their own partition)
+    codes, uniques = pd.factorize(df[partition_key], use_na_sentinel=False)
+    order = np.argsort(codes, kind="stable")
+    df = df.iloc[order]
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+
+    numeric_cols = list(df.select_dtypes(include=[np.number]).columns)
+    text_cols = [col for col in df.columns if col not in numeric_cols]
+    numeric_dtypes = {col: df[col].dtype for col in numeric_cols}
+
+    shape = (len(df), len(numeric_cols))
+    shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * 8))
+    try:
+        np.ndarray(shape, dtype="float64", buffer=shm.buf)[:] = df[numeric_cols].to_numpy(dtype="float64")
+        tasks = [
+            (str(uniques[i]), shm.name, shape, int(bounds[i]), int(bounds[i + 1]), numeric_dtypes,
+             df[text_cols].iloc[bounds[i]:bounds[i + 1]], list(df.columns), config)
+            for i in range(len(uniques))
+        ]
+        workers = workers or min(len(tasks), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+            results = list(pool.map(_run_partition, tasks))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # back to the input row order (clean_data keeps the original index)
+    out = pd.concat([part for _, part, _ in results]).sort_index()
+
+    state = {"partition_key": partition_key, "partitions": {name: part_state for name, _, part_state in results}}
+    log_info(f"Partitioned run on '{partition_key}': {len(results)} partitions, {workers} worker(s)")
+    return out, state
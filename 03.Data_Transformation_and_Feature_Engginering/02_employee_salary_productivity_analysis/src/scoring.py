@@ -0,0 +1,106 @@
+import math
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional
+import pandas as pd
+from .feature_engineering import SALARY_BINS, SALARY_LABELS
+from .log_info import log_info
+
+# Fitted state recorded by the batch stages (clean_data, detect_outliers_and_anomalies,
+# normalize_data, create_features when given a state dict):
+#   fill_values, iqr_bounds, isolation_forest, scaler, efficiency_median, salary_range_edges
+# score_record() replays the same arithmetic on one plain dict, without pandas, so a single
+# employee is scored in microseconds and matches the batch output row for row.
+
+def save_state(state: Dict, path: str) -> None:
+    import joblib
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(state, path)
+    log_info(f"Fitted state saved to {path}")
+
+def load_state(path: str) -> Dict:
+    import joblib
+    return joblib.load(path)
+
+def _number(value) -> Optional[float]:
+    # None, "" and NaN count as missing
+    if value is None or value == "":
+        return None
+    value = float(value)
+    return None if math.isnan(value) else value
+
+def _bucket(value: float, inner_edges: List[float]) -> str:
+    # right-closed intervals, like pd.cut / pd.qcut
+    return SALARY_LABELS[bisect_left(inner_edges, value)]
+
+def prepare_record(record: Dict, state: Dict) -> Dict:
+    # fill -> IQR clip, i.e. the values the IsolationForest sees
+    values = {}
+    for col, (lower, upper) in state["iqr_bounds"].items():
+        value = _number(record.get(col))
+        if value is None:
+            value = state["fill_values"][col]
+        values[col] = min(max(value, lower), upper)
+    return values
+
+def score_prepared(values: Dict, state: Dict) -> Dict:
+    scaled = dict(values)
+    scaler = state["scaler"]
+    if scaler["method"] == "minmax":
+        for col, scale, offset in zip(scaler["columns"], scaler["scale"], scaler["offset"]):
+            scaled[col] = values[col] * scale + offset
+    else:
+        for col, mean, std in zip(scaler["columns"], scaler["mean"], scaler["std"]):
+            scaled[col] = (values[col] - mean) / std
+
+    efficiency = scaled["performance_score"] / (scaled["working_hours"] + 1e-6)
+    if not math.isfinite(efficiency):
+        efficiency = state["efficiency_median"]
+
+    salary = scaled["salary"]
+    edges = state["salary_range_edges"]
+    return {
+        "efficiency_score": efficiency,
+        # fixed bins cover [0, 1]; anything outside is unlabeled, as in pd.cut
+        "category_salary": _bucket(salary, SALARY_BINS[1:-1]) if SALARY_BINS[0] <= salary <= SALARY_BINS[-1] else None,
+        # quantile edges from the batch run; values beyond the fitted range fall in the outer buckets
+        "salary_range": _bucket(salary, edges[1:-1]),
+    }
+
+def score_record(record: Dict, state: Dict, with_anomaly: bool = False) -> Dict:
+    return score_records([record], state, with_anomaly)[0]
+
+def score_records(records: List[Dict], state: Dict, with_anomaly: bool = False) -> List[Dict]:
+    if "partitions" in state:
+        return _score_partitioned(records, state, with_anomaly)
+
+    prepared = [prepare_record(record, state) for record in records]
+    results = [score_prepared(values, state) for values in prepared]
+
+    # the forest is the only slow part (~ms per call), so it runs once per micro-batch and only on request
+    if with_anomaly:
+        forest = state.get("isolation_forest")
+        if forest is None:
+            flags = [1] * len(records)
+        else:
+            flags = forest["model"].predict(pd.DataFrame(prepared, columns=forest["columns"])).tolist()
+        for result, flag in zip(results, flags):
+            result["anomaly_flag"] = int(flag)
+    return results
+
+def _score_partitioned(records: List[Dict], state: Dict, with_anomaly: bool) -> List[Dict]:
+    # state from a partitioned run: each record is scored with its own partition's fitted state
+    key, partitions = state["partition_key"], state["partitions"]
+    groups = {}
+    for position, record in enumerate(records):
+        name = str(record.get(key))
+        if name not in partitions:
+            raise KeyError(f"Unknown {key} '{record.get(key)}' (fitted: {sorted(partitions)})")
+        groups.setdefault(name, []).append(position)
+
+    results = [None] * len(records)
+    for name, positions in groups.items():
+        scored = score_records([records[position] for position in positions], partitions[name], with_anomaly)
+        for position, result in zip(positions, scored):
+            results[position] = result
+    return results
@@ -3,8 +3,10 @@ from pathlib import Path
 from src.data_loader import load_data
 from src.utils import setup_logging
 from src.data_cleaning import clean_data, detect_outliers_and_anomalies, normalize_data
-from src.analysis import generate_report
+from src.analysis import generate_report, wait_for_figures
+from src.correlation import streaming_correlation
 from src.feature_engineering import create_features
+from src.knn_features import add_knn_features
 
 
 
@@ -35,6 +37,12 @@ def main():
     df = create_features(df)
     logger.info("Feature engineering complete")
 
+    # Comparable-listing features (before normalization, on the original units)
+    knn_config = config.get("knn_features", {})
+    if knn_config.get("enabled"):
+        df = add_knn_features(df, knn_config)
+        logger.info("kNN comparable features complete")
+
     # === Normalization ===
     df = normalize_data(df, config["parameters"])
     logger.info("Normalization complete")
@@ -46,16 +54,30 @@ def main():
     logger.info(f"Data saved to {config["processed_data_path"]}")
 
     #  === Generate Report ===
+    # Streaming correlation reads the processed CSV(s) chunk by chunk instead of df.corr()
+    corr_config = config.get("correlation", {})
+    corr_matrix = None
+    if corr_config.get("streaming"):
+        corr_matrix = streaming_correlation(
+            corr_config.get("source", str(processed_data_path)),
+            chunksize=int(corr_config.get("chunksize", 200_000)),
+            workers=int(corr_config.get("workers", 0)),
+        )
+        logger.info("Streaming correlation complete")
+
     report_path = Path(config["report_path"]) / "report.csv"
     report_path.parent.mkdir(parents=True, exist_ok=True)
-    generate_report(df, str(report_path))
+    generate_report(df, str(report_path), corr_matrix=corr_matrix)
     logger.info(f"Report saved to {config["report_path"]}")
 
     fig_path = Path(config["fig_path"])
     fig_path.parent.mkdir(parents=True, exist_ok=True)
-    generate_report(df, output_path="output/reports/report.csv", fig_path=str(fig_path))
-    logger.info(f"Correlation heatmap saved to {fig_path}")
+    generate_report(df, output_path="output/reports/report.csv", fig_path=str(fig_path), corr_matrix=corr_matrix)
+    logger.info(f"Correlation heatmap queued for {fig_path}")
 
+    # figures render in a background worker; join it before finishing
+    for saved_path in wait_for_figures():
+        logger.info(f"Correlation heatmap saved to {saved_path}")
 
     logger.info("=== Pipeline Complete ===")
     
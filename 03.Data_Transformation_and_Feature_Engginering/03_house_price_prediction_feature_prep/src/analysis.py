@@ -1,46 +1,120 @@
+import hashlib
+import json
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Dict, List
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 from .log_info import log_info
 from pathlib import Path
 
-def generate_report(df:pd.DataFrame, output_path:str, fig_path:str = None) -> None:
+# ============================================================
+# Artifact cache
+#   Analysis results are stored under sha256(name + frame fingerprint + parameters), so a
+#   second report/figure request on the same data reuses the summary and correlation
+#   objects instead of recomputing them, and an unchanged CSV is not rewritten.
+# ============================================================
+_ARTIFACTS: Dict[str, object] = {}
+_WRITTEN: Dict[str, str] = {}
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    digest = hashlib.sha256(json.dumps([list(map(str, df.columns)), list(map(str, df.dtypes))]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def cached_artifact(name: str, fingerprint: str, params: Dict, compute: Callable[[], object]):
+    key = hashlib.sha256(json.dumps([name, fingerprint, params], sort_keys=True).encode()).hexdigest()
+    if key not in _ARTIFACTS:
+        _ARTIFACTS[key] = compute()
+    else:
+        log_info(f"Reusing cached {name} ({key[:12]})")
+    return key, _ARTIFACTS[key]
+
+def _write_csv(artifact: pd.DataFrame, key: str, path: str, **to_csv_kwargs) -> bool:
+    if _WRITTEN.get(path) == key and Path(path).exists():
+        return False
+    artifact.to_csv(path, **to_csv_kwargs)
+    _WRITTEN[path] = key
+    return True
+
+# ============================================================
+# Background figure rendering
+#   Figures are drawn in a worker process (matplotlib/seaborn are imported there only),
+#   so the pipeline continues while they render; wait_for_figures() joins them at the end.
+# ============================================================
+_FIGURE_POOL = None
+_PENDING_FIGURES: List[Future] = []
+
+def _render_heatmap(corr_matrix: pd.DataFrame, fig_path: str) -> str:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    Path(fig_path).parent.mkdir(parents=True, exist_ok=True)
+    plt.figure(figsize=(8, 6))
+    sns.heatmap(corr_matrix, annot=True, cmap="coolwarm", fmt=".2f")
+    plt.title("Feature Correlation Heatmap")
+    plt.tight_layout()
+    plt.savefig(fig_path)
+    plt.close()
+    return fig_path
+
+def render_figure_async(render: Callable, *args) -> Future:
+    global _FIGURE_POOL
+    if _FIGURE_POOL is None:
+        _FIGURE_POOL = ProcessPoolExecutor(max_workers=1)
+    future = _FIGURE_POOL.submit(render, *args)
+    _PENDING_FIGURES.append(future)
+    return future
+
+def wait_for_figures() -> List[str]:
+    global _FIGURE_POOL
+    saved = []
+    while _PENDING_FIGURES:
+        saved.append(_PENDING_FIGURES.pop(0).result())
+    if _FIGURE_POOL is not None:
+        _FIGURE_POOL.shutdown()
+        _FIGURE_POOL = None
+    return saved
+
+def generate_report(df:pd.DataFrame, output_path:str, fig_path:str = None, corr_matrix:pd.DataFrame = None) -> None:
     # Summarize aggregates per salary category and save as CSV (single-level header).
+    fingerprint = frame_fingerprint(df)
 
     # ==== Rata-rata price_per_sqft per city ====
-    summary = (
-        df.groupby("city", dropna=False).agg({
-            "price_per_sqft": "mean",
-            "price": ["mean", "max", "min"],
-            "area_sqft": "mean"
-        }).round(2)
-    )
+    def city_summary() -> pd.DataFrame:
+        summary = (
+            df.groupby("city", dropna=False).agg({
+                "price_per_sqft": "mean",
+                "price": ["mean", "max", "min"],
+                "area_sqft": "mean"
+            }).round(2)
+        )
 
+        # Flatten multi-index columns:
+        summary.columns = ["_".join(col).strip() if isinstance(col, tuple) else col for col in summary.columns]
+        return summary.reset_index()
 
-    # Flatten multi-index columns: 
-    summary.columns = ["_".join(col).strip() if isinstance(col, tuple) else col for col in summary.columns]
-    report = summary.reset_index()
+    summary_key, report = cached_artifact("city_summary", fingerprint, {}, city_summary)
 
     # Save summary results to CSV
-    report.to_csv(output_path, index=False)
-    log_info(f"Report saved to {output_path}")
+    if _write_csv(report, summary_key, output_path, index=False):
+        log_info(f"Report saved to {output_path}")
 
     # === Correlation between numerical features ===
-    numeric_cols = df.select_dtypes(include='number')
-    corr_matrix = numeric_cols.corr().round(2)
+    # corr_matrix may come precomputed from src.correlation.streaming_correlation (same values)
+    if corr_matrix is None:
+        corr_key, corr_matrix = cached_artifact(
+            "correlation", fingerprint, {"round": 2},
+            lambda: df.select_dtypes(include='number').corr().round(2))
+    else:
+        corr_matrix = corr_matrix.round(2)
+        corr_key = hashlib.sha256(pd.util.hash_pandas_object(corr_matrix).to_numpy().tobytes()).hexdigest()
 
     # Also save to CSV file (optional)
     corr_csv_path = output_path.replace(".csv", "_correlation.csv")
-    corr_matrix.to_csv(corr_csv_path)
-    log_info(f"Correlation matrix saved to {corr_csv_path}")
+    if _write_csv(corr_matrix, corr_key, corr_csv_path):
+        log_info(f"Correlation matrix saved to {corr_csv_path}")
 
-    # === (Optional) Correlation heatmap ===
+    # === (Optional) Correlation heatmap, rendered in the background ===
     if fig_path:
-        Path(fig_path).parent.mkdir(parents=True, exist_ok=True)
-        plt.figure(figsize=(8, 6))
-        sns.heatmap(corr_matrix, annot=True, cmap="coolwarm", fmt=".2f")
-        plt.title("Feature Correlation Heatmap")
-        plt.tight_layout()
-        plt.savefig(fig_path)
-        plt.close()
-        log_info(f"Correlation heatmap saved to {fig_path}")
+        render_figure_async(_render_heatmap, corr_matrix, fig_path)
@@ -0,0 +1,121 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+from .log_info import log_info
+
+# ============================================================
+# Streaming correlation (same result as df.select_dtypes("number").corr())
+#   Moments are kept per column PAIR, so missing values are handled pairwise like pandas:
+#     count[i, j]     rows where both i and j are present
+#     mean[i, j]      mean of column i over those rows
+#     m2[i, j]        sum of squared deviations of column i over those rows
+#     comoment[i, j]  sum of (x_i - mean[i, j]) * (x_j - mean[j, i]) over those rows
+#   Chunks and worker results are combined with the Chan et al. merge, so any split of the
+#   rows (chunks, files, processes) gives the same matrix up to float rounding.
+# ============================================================
+
+def empty_moments(columns: List[str]) -> Dict:
+    k = len(columns)
+    return {
+        "columns": list(columns),
+        "rows": 0,
+        "count": np.zeros((k, k)),
+        "mean": np.zeros((k, k)),
+        "m2": np.zeros((k, k)),
+        "comoment": np.zeros((k, k)),
+    }
+
+def moments_from_frame(df: pd.DataFrame) -> Dict:
+    numeric = df.select_dtypes(include="number")
+    values = numeric.to_numpy(dtype="float64")
+    present = ~np.isnan(values)
+    mask = present.astype("float64")
+
+    # shift by the chunk column means first, so the sums below stay small and well conditioned
+    counts = mask.sum(axis=0)
+    shift = np.divide(np.where(present, values, 0.0).sum(axis=0), counts, out=np.zeros(len(counts)), where=counts > 0)
+    centered = np.where(present, values - shift, 0.0)
+
+    count = mask.T @ mask
+    sums = centered.T @ mask                   # sums[i, j]: centered x_i over rows where j is present too
+    squares = (centered ** 2).T @ mask
+    cross = centered.T @ centered
+    safe = np.where(count > 0, count, 1.0)
+
+    moments = empty_moments(list(numeric.columns))
+    moments["rows"] = len(values)
+    moments["count"] = count
+    moments["mean"] = np.where(count > 0, shift[:, None] + sums / safe, 0.0)
+    moments["m2"] = np.where(count > 0, squares - sums ** 2 / safe, 0.0)
+    moments["comoment"] = np.where(count > 0, cross - sums * sums.T / safe, 0.0)
+    return moments
+
+def _align(moments: Dict, columns: List[str]) -> Dict:
+    # pairs involving a column this part never saw get count 0, which the merge ignores
+    if moments["columns"] == columns:
+        return moments
+    aligned = empty_moments(columns)
+    aligned["rows"] = moments["rows"]
+    at = [columns.index(col) for col in moments["columns"]]
+    for name in ("count", "mean", "m2", "comoment"):
+        aligned[name][np.ix_(at, at)] = moments[name]
+    return aligned
+
+def merge_moments(a: Dict, b: Dict) -> Dict:
+    columns = a["columns"] + [col for col in b["columns"] if col not in a["columns"]]
+    a, b = _align(a, columns), _align(b, columns)
+
+    n = a["count"] + b["count"]
+    safe = np.where(n > 0, n, 1.0)
+    delta = b["mean"] - a["mean"]
+    weight = a["count"] * b["count"] / safe
+
+    merged = empty_moments(columns)
+    merged["rows"] = a["rows"] + b["rows"]
+    merged["count"] = n
+    merged["mean"] = a["mean"] + delta * b["count"] / safe
+    merged["m2"] = a["m2"] + b["m2"] + delta ** 2 * weight
+    merged["comoment"] = a["comoment"] + b["comoment"] + delta * delta.T * weight
+    return merged
+
+def correlation_from_moments(moments: Dict) -> pd.DataFrame:
+    denominator = np.sqrt(moments["m2"] * moments["m2"].T)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = np.where((moments["count"] > 1) & (denominator > 0), moments["comoment"] / denominator, np.nan)
+    corr = np.clip(corr, -1.0, 1.0)
+    # a column with any variation correlates 1.0 with itself, as in DataFrame.corr()
+    diagonal = np.diag(corr).copy()
+    np.fill_diagonal(corr, np.where(np.isnan(diagonal), np.nan, 1.0))
+    return pd.DataFrame(corr, index=moments["columns"], columns=moments["columns"])
+
+def file_moments(path: str, chunksize: int = 200_000) -> Dict:
+    # round_trip parsing keeps the values identical to the frame that wrote the CSV
+    moments = None
+    for chunk in pd.read_csv(path, chunksize=chunksize, float_precision="round_trip"):
+        part = moments_from_frame(chunk)
+        moments = part if moments is None else merge_moments(moments, part)
+    return moments if moments is not None else empty_moments([])
+
+def streaming_correlation(source: str, chunksize: int = 200_000, workers: int = 0) -> pd.DataFrame:
+    # source: one CSV or a folder of CSVs; each file is reduced in its own worker, then merged
+    source = Path(source)
+    csv_files = [source] if source.is_file() else sorted(source.glob("*.csv"))
+    if not csv_files:
+        raise FileNotFoundError(f"No *.csv found in {source.resolve()}")
+
+    workers = workers or min(len(csv_files), os.cpu_count() or 1)
+    if workers == 1 or len(csv_files) == 1:
+        parts = [file_moments(str(path), chunksize) for path in csv_files]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(file_moments, map(str, csv_files), [chunksize] * len(csv_files)))
+
+    moments = parts[0]
+    for part in parts[1:]:
+        moments = merge_moments(moments, part)
+    log_info(f"Streaming correlation over {len(csv_files)} file(s), "
+             f"{moments['rows']} rows, chunks of {chunksize}")
+    return correlation_from_moments(moments)
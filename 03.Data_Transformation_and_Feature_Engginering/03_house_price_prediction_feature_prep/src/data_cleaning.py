@@ -2,8 +2,6 @@ import pandas as pd
 import numpy as np
 from typing import Dict 
 from .log_info import log_info
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import MinMaxScaler, StandardScaler
 
 # columns NOT used for outlier/anomaly detection
 _EXCLUDE_OUTLIERS = {"house_id", "location", "year_built,price", "city"}
@@ -51,6 +49,7 @@ def detect_outliers_and_anomalies(df:pd.DataFrame, parameters: Dict) -> pd.DataF
         if enable_isolation_forest and len(numeric_cols) > 0:
             contamination = float(parameters.get("isolation_forest_contamination", 0.02))
             random_state = int(parameters.get("random_state", 42))
+            from sklearn.ensemble import IsolationForest
             iso = IsolationForest(contamination=contamination, random_state=random_state)
             df["anomaly_flag"] = iso.fit_predict(df[numeric_cols])
             log_info(f"Anomalies detected: {(df['anomaly_flag'] == -1).sum()} rows")
@@ -73,6 +72,7 @@ def normalize_data(df:pd.DataFrame, parameters:Dict) -> pd.DataFrame:
                 df[col] = pd.to_numeric(df[col], errors="coerce")
         
         method = str(parameters.get("normalization", "minmax")).lower()
+        from sklearn.preprocessing import MinMaxScaler, StandardScaler
         scaler = MinMaxScaler() if method == "minmax" else StandardScaler()
 
         cols_to_scale = [col for col in _SCALE_COLS if col in df.columns]
@@ -0,0 +1,159 @@
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Tuple
+import numpy as np
+import pandas as pd
+from .log_info import log_info
+
+# ============================================================
+# Comparable listings (k nearest neighbours)
+#   Houses are placed in a space of standardized area_sqft, bedrooms, bathrooms and
+#   distance_to_city_km plus the city code times city_weight (a large weight keeps
+#   neighbours inside the same city unless it has fewer than k listings).
+#   For every house the k most similar OTHER houses (leave-one-out) give:
+#     knn_price_per_sqft_median, knn_price_median, knn_distance_mean
+#   The index is persisted, so newly listed houses are scored with query_new_listings()
+#   and added with add_listings() without rebuilding the tree.
+# ============================================================
+FEATURE_COLUMNS = ["area_sqft", "bedrooms", "bathrooms", "distance_to_city_km"]
+CITY_COLUMN = "city"
+TARGET_COLUMNS = ["price_per_sqft", "price"]
+
+def _build_tree(points: np.ndarray, algorithm: str, leaf_size: int):
+    from sklearn.neighbors import BallTree, KDTree
+    return {"kd_tree": KDTree, "ball_tree": BallTree}[algorithm](points, leaf_size=leaf_size)
+
+def _design_matrix(df: pd.DataFrame, index: Dict) -> np.ndarray:
+    values = df.reindex(columns=FEATURE_COLUMNS).apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64")
+    values = np.where(np.isnan(values), index["mean"], values)       # missing -> fitted mean (scaled 0)
+    scaled = (values - index["mean"]) / index["std"]
+
+    # cities unseen at fit time get their own code after the known ones
+    codes = pd.Categorical(df.get(CITY_COLUMN, pd.Series(index=df.index, dtype="object")).astype("string"),
+                           categories=index["cities"]).codes
+    codes = np.where(codes >= 0, codes, len(index["cities"]))
+    return np.column_stack([scaled, codes * index["city_weight"]])
+
+def _targets(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    return {col: pd.to_numeric(df[col], errors="coerce").to_numpy(dtype="float64") if col in df.columns
+            else np.full(len(df), np.nan) for col in TARGET_COLUMNS}
+
+def build_knn_index(df: pd.DataFrame, knn_config: Dict) -> Dict:
+    values = df.reindex(columns=FEATURE_COLUMNS).apply(pd.to_numeric, errors="coerce")
+    mean = values.mean().fillna(0.0).to_numpy(dtype="float64")
+    std = values.std().fillna(0.0).to_numpy(dtype="float64")
+    index = {
+        "mean": mean,
+        "std": np.where(std > 0, std, 1.0),
+        "cities": sorted(df[CITY_COLUMN].dropna().astype(str).unique()) if CITY_COLUMN in df.columns else [],
+        "city_weight": float(knn_config.get("city_weight", 10.0)),
+        "algorithm": knn_config.get("algorithm", "kd_tree"),
+        "leaf_size": int(knn_config.get("leaf_size", 40)),
+    }
+    index["points"] = _design_matrix(df, index)
+    index["targets"] = _targets(df)
+    index["tree"] = _build_tree(index["points"], index["algorithm"], index["leaf_size"])
+    # listings added after the build are kept in a small buffer and searched by brute force
+    index["pending_points"] = np.empty((0, index["points"].shape[1]))
+    index["pending_targets"] = {col: np.empty(0) for col in TARGET_COLUMNS}
+    return index
+
+def _batched_query(index: Dict, points: np.ndarray, k: int, batch_size: int, workers: int) -> Tuple[np.ndarray, np.ndarray]:
+    # tree queries release the GIL, so batches run in parallel threads over one shared tree;
+    # k may exceed the tree's size when pending listings make up the rest
+    tree_k = min(k, len(index["points"]))
+    pending = index["pending_points"]
+    pending_ids = len(index["points"]) + np.arange(len(pending))     # positions follow the tree's points
+
+    def query_batch(start):
+        batch = points[start:start + batch_size]
+        distances, neighbours = index["tree"].query(batch, k=tree_k)
+        if not len(pending):
+            return distances, neighbours
+        # brute force over the pending listings for this batch only (batch_size x pending in memory)
+        pending_distances = np.sqrt(((batch[:, None, :] - pending[None, :, :]) ** 2).sum(axis=2))
+        distances = np.hstack([distances, pending_distances])
+        neighbours = np.hstack([neighbours, np.broadcast_to(pending_ids, pending_distances.shape)])
+        order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(distances, order, axis=1), np.take_along_axis(neighbours, order, axis=1)
+
+    starts = range(0, len(points), batch_size)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        parts = list(pool.map(query_batch, starts))
+    return np.vstack([part[0] for part in parts]), np.vstack([part[1] for part in parts])
+
+def _aggregate(index: Dict, distances: np.ndarray, neighbours: np.ndarray, row_index: pd.Index) -> pd.DataFrame:
+    features = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)     # all-NaN neighbour targets -> NaN
+        for col in TARGET_COLUMNS:
+            values = np.concatenate([index["targets"][col], index["pending_targets"][col]])
+            features[f"knn_{col}_median"] = np.nanmedian(values[neighbours], axis=1) if neighbours.shape[1] else np.nan
+    features["knn_distance_mean"] = distances.mean(axis=1) if distances.shape[1] else np.nan
+    return pd.DataFrame(features, index=row_index)
+
+def add_knn_features(df: pd.DataFrame, knn_config: Dict) -> pd.DataFrame:
+    # Leave-one-out kNN aggregates for every house, then persist the index for new listings.
+    df = df.copy()
+    index = build_knn_index(df, knn_config)
+    k = min(int(knn_config.get("k", 5)), len(df) - 1)
+    batch_size = int(knn_config.get("batch_size", 10_000))
+    workers = int(knn_config.get("workers", 0))
+
+    if k < 1:
+        features = _aggregate(index, np.empty((len(df), 0)), np.empty((len(df), 0), dtype="int64"), df.index)
+    else:
+        # ask for k + 1 and drop the house itself (or the farthest one if a duplicate displaced it)
+        distances, neighbours = _batched_query(index, index["points"], k + 1, batch_size, workers)
+        is_self = neighbours == np.arange(len(df))[:, None]
+        is_self[~is_self.any(axis=1), -1] = True
+        keep = ~is_self
+        distances = distances[keep].reshape(len(df), k)
+        neighbours = neighbours[keep].reshape(len(df), k)
+        features = _aggregate(index, distances, neighbours, df.index)
+
+    for col in features.columns:
+        df[col] = features[col]
+
+    index_path = knn_config.get("index_path")
+    if index_path:
+        save_knn_index(index, index_path)
+    log_info(f"kNN comparable features: k={k}, {len(df)} houses, {index['algorithm']} index")
+    return df
+
+def save_knn_index(index: Dict, path: str) -> None:
+    import joblib
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(index, path)
+    log_info(f"kNN index saved to {path}")
+
+def load_knn_index(path: str) -> Dict:
+    import joblib
+    return joblib.load(path)
+
+def query_new_listings(df_new: pd.DataFrame, index: Dict, k: int = 5, batch_size: int = 10_000, workers: int = 0) -> pd.DataFrame:
+    # New houses are not in the index, so all k neighbours are real comparables.
+    k = min(k, len(index["points"]) + len(index["pending_points"]))
+    points = _design_matrix(df_new, index)
+    distances, neighbours = _batched_query(index, points, k, batch_size, workers)
+    return _aggregate(index, distances, neighbours, df_new.index)
+
+def add_listings(df_new: pd.DataFrame, index: Dict, rebuild_threshold: int = 1_000) -> Dict:
+    # Append to the brute-force buffer; fold the buffer into a new tree once it grows past the threshold
+    # (scaling stays as fitted, so existing features remain comparable).
+    index["pending_points"] = np.vstack([index["pending_points"], _design_matrix(df_new, index)])
+    new_targets = _targets(df_new)
+    for col in TARGET_COLUMNS:
+        index["pending_targets"][col] = np.concatenate([index["pending_targets"][col], new_targets[col]])
+
+    if len(index["pending_points"]) > rebuild_threshold:
+        index["points"] = np.vstack([index["points"], index["pending_points"]])
+        for col in TARGET_COLUMNS:
+            index["targets"][col] = np.concatenate([index["targets"][col], index["pending_targets"][col]])
+        index["tree"] = _build_tree(index["points"], index["algorithm"], index["leaf_size"])
+        index["pending_points"] = np.empty((0, index["points"].shape[1]))
+        index["pending_targets"] = {col: np.empty(0) for col in TARGET_COLUMNS}
+        log_info(f"kNN index rebuilt with {len(index['points'])} listings")
+    return index
@@ -0,0 +1,54 @@
+# Newly listed houses are scored against the tree plus the pending (not yet rebuilt) listings.
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.knn_features import _design_matrix, add_listings, build_knn_index, query_new_listings  # noqa: E402
+
+
+def houses(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "area_sqft": rng.uniform(500, 3000, n),
+        "bedrooms": rng.integers(1, 6, n),
+        "bathrooms": rng.integers(1, 4, n),
+        "distance_to_city_km": rng.uniform(1, 30, n),
+        "city": rng.choice(["Jakarta", "Bandung"], n),
+        "price_per_sqft": rng.uniform(100, 400, n),
+        "price": rng.uniform(1e5, 1e6, n),
+    })
+
+
+def test_query_k_larger_than_tree_uses_pending_listings():
+    index = build_knn_index(houses(3, seed=1), {"k": 5})
+    add_listings(houses(3, seed=2), index)
+    assert len(index["pending_points"]) == 3            # below the rebuild threshold, tree still has 3
+
+    result = query_new_listings(houses(4, seed=3), index, k=5)
+
+    # same distances as a brute-force search over all 6 listings
+    points = np.vstack([index["points"], index["pending_points"]])
+    query = _design_matrix(houses(4, seed=3), index)
+    expected = np.sort(np.sqrt(((query[:, None, :] - points[None, :, :]) ** 2).sum(axis=2)), axis=1)[:, :5]
+    np.testing.assert_allclose(result["knn_distance_mean"].to_numpy(), expected.mean(axis=1))
+    assert result.notna().all().all()
+
+
+def test_query_k_capped_at_all_listings():
+    index = build_knn_index(houses(3, seed=1), {"k": 5})
+    add_listings(houses(1, seed=2), index)
+
+    result = query_new_listings(houses(2, seed=3), index, k=10)
+    assert len(result) == 2 and result.notna().all().all()
+
+
+def test_pending_merge_is_the_same_for_any_batch_size():
+    index = build_knn_index(houses(20, seed=1), {"k": 5})
+    add_listings(houses(8, seed=2), index)
+
+    one_batch = query_new_listings(houses(9, seed=3), index, k=5, batch_size=100)
+    small_batches = query_new_listings(houses(9, seed=3), index, k=5, batch_size=2)
+    pd.testing.assert_frame_equal(one_batch, small_batches)
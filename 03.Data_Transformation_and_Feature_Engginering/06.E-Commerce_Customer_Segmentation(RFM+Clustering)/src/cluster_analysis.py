@@ -1,8 +1,8 @@
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 from pathlib import Path
 
+# seaborn / matplotlib are imported inside the plotting functions, so loading this module stays cheap
+
 # === 1. Load Clustered Data ===
 
 def load_clustered_data(path: str) -> pd.DataFrame:
@@ -14,6 +14,9 @@ def load_clustered_data(path: str) -> pd.DataFrame:
 
 # === 2. Heatmap RFM Profile per Cluster ===
 def plot_heatmap(df:pd.DataFrame, output_path: Path) -> pd.DataFrame:
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+
     cluster_profile = (
        df.groupby("cluster")[["recency_scaled", "frequency_scaled", "monetary_scaled"]].mean()
     )
@@ -33,6 +36,9 @@ def plot_heatmap(df:pd.DataFrame, output_path: Path) -> pd.DataFrame:
 
 # === 3. Scatter Plot (Frequency vs Monetary) per Cluster ===
 def plot_scatter_frequency_monetary(df:pd.DataFrame, output_path: Path) -> None:
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(8, 6))
     sns.scatterplot(
         data=df,
@@ -57,6 +63,9 @@ def plot_scatter_frequency_monetary(df:pd.DataFrame, output_path: Path) -> None:
 
 # === 4. Scatter Plot (Recency vs Monetary) ===
 def plot_scatter_recency_monetary(df:pd.DataFrame, output_path: Path) -> None:
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(8, 6))
     sns.scatterplot(
         data=df,
@@ -79,6 +88,9 @@ def plot_scatter_recency_monetary(df:pd.DataFrame, output_path: Path) -> None:
 
 #  === 5. Barplot (Average RFM Metrics per Cluster) ===
 def plot_bar_rfm (df:pd.DataFrame, output_path: Path) -> None:
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+
     cluster_profile = (df.groupby("cluster") [["recency_scaled", "frequency_scaled", "monetary_scaled"]].mean().reset_index()
     )
 
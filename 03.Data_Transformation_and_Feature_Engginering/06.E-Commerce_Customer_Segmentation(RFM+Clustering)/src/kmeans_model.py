@@ -1,13 +1,15 @@
-from sklearn.cluster import KMeans
 from pathlib import Path
 from typing import Dict, Any
 from .log_info import log_info, log_error, log_success
 import pandas as pd
-import matplotlib.pyplot as plt
-import joblib
 
 def run_kmeans_clustering(rfm_scaled_df: pd.DataFrame, model_output_path: str | Path, label_output_path: str | Path, summary_output: str | Path, elbow_output: str | Path, parameters: Dict [str, Any],  logger=None) -> pd.DataFrame:
     try:
+        # heavy imports only when clustering actually runs
+        import joblib
+        import matplotlib.pyplot as plt
+        from sklearn.cluster import KMeans
+
         if logger:
             log_info(logger, "Starting KMeans Clustering...")
 
@@ -1,4 +1,3 @@
-from sklearn.preprocessing import MinMaxScaler, StandardScaler
 from pathlib import Path
 from typing import Dict, Any
 from .log_info import log_info
@@ -7,6 +6,8 @@ import pandas as pd
 def scale_rfm_features(rfm_df: pd.DataFrame, output_path: str | Path,  parameters : Dict [str, Any], logger=None) -> pd.DataFrame:
     # Scale RFM features using MinMaxScaler
     try:
+        from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
         if logger:
             log_info(logger, "Starting RFM Scaling...")
 
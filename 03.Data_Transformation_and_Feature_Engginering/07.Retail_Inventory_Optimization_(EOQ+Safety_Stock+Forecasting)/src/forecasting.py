@@ -1,12 +1,12 @@
 import os
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from statsmodels.tsa.holtwinters import SimpleExpSmoothing, Holt
-from statsmodels.tsa.api import SimpleExpSmoothing as SESModel
-from statsmodels.tsa.api import Holt as HoltModel
 
 def forecast_sku(df, sku_id, product_name, output_path="output/forecast", periods=3):
+    # matplotlib / statsmodels are imported here, only when forecasting runs
+    import matplotlib.pyplot as plt
+    from statsmodels.tsa.holtwinters import SimpleExpSmoothing, Holt
+
     os.makedirs(output_path, exist_ok=True)
 
     sku_df = df[df["Product_ID"] == sku_id].copy()
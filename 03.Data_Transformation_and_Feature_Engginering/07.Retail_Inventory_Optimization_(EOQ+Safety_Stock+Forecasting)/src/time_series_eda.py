@@ -1,10 +1,12 @@
 import os
 import pandas as pd
-import matplotlib.pyplot as plt
-from statsmodels.tsa.seasonal import seasonal_decompose
-from statsmodels.graphics.tsaplots import plot_acf, plot_pacf
 
 def run_time_series_eda(df, output_folder="output/eda", decomposition=True):
+    # matplotlib / statsmodels are imported here, only when the EDA stage runs
+    import matplotlib.pyplot as plt
+    from statsmodels.tsa.seasonal import seasonal_decompose
+    from statsmodels.graphics.tsaplots import plot_acf, plot_pacf
+
     os.makedirs(output_folder, exist_ok=True)
 
     for sku_id, sku_df in df.groupby("Product_ID"):